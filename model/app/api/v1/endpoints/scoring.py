@@ -1,7 +1,13 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import Optional
+from typing import List, Optional
+from concurrent.futures.process import BrokenProcessPool
 from app.services.scoring_service import ScoringService
-from app.schemas.scoring import ScoringRequest, ScoringResponse
+from app.schemas.scoring import ScoringRequest, ScoringResponse, PrescreenResponse
+from app.services.upload_intake import UploadRejected
+from app.services.inference_executor import InferenceQueueFull
+from app.services.parse_pool import ParseTimeout
+from app.core.config import settings
+import asyncio
 import uuid
 
 router = APIRouter()
@@ -15,8 +21,11 @@ async def analyze_resume(
     candidate_name: Optional[str] = Form(None),
     candidate_email: Optional[str] = Form(None),
     job_title: Optional[str] = Form(None),
-    target_seniority: Optional[str] = Form(None)
+    target_seniority: Optional[str] = Form(None),
+    model_name: Optional[str] = Form(None)
 ):
+    if model_name and not scoring_service.embedding_service.registry.is_allowed(model_name):
+        raise HTTPException(status_code=400, detail=f"Unknown embedding model: {model_name}")
    
     try:
         # Validate inputs
@@ -40,11 +49,22 @@ async def analyze_resume(
                 "candidate_email": candidate_email,
                 "job_title": job_title,
                 "target_seniority": target_seniority
-            }
+            },
+            model_name=model_name
         )
         
         return result
         
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InferenceQueueFull as e:
+        # Overloaded, not broken: the client should retry shortly
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
+    except ParseTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except BrokenProcessPool as e:
+        # The parse worker died; the pool is restarted for the next request
+        raise HTTPException(status_code=503, detail=f"Parse worker failed: {e}", headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -56,8 +76,12 @@ async def analyze_resume_sync(
     candidate_name: Optional[str] = Form(None),
     candidate_email: Optional[str] = Form(None),
     job_title: Optional[str] = Form(None),
-    target_seniority: Optional[str] = Form(None)
+    target_seniority: Optional[str] = Form(None),
+    model_name: Optional[str] = Form(None)
 ):
+    if model_name and not scoring_service.embedding_service.registry.is_allowed(model_name):
+        raise HTTPException(status_code=400, detail=f"Unknown embedding model: {model_name}")
+    
     try:
         # Validate inputs
         if not jd_file and not jd_text:
@@ -80,14 +104,69 @@ async def analyze_resume_sync(
                 "candidate_email": candidate_email,
                 "job_title": job_title,
                 "target_seniority": target_seniority
-            }
+            },
+            model_name=model_name
         )
         
         return result
         
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InferenceQueueFull as e:
+        # Overloaded, not broken: the client should retry shortly
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
+    except ParseTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except BrokenProcessPool as e:
+        # The parse worker died; the pool is restarted for the next request
+        raise HTTPException(status_code=503, detail=f"Parse worker failed: {e}", headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/prescreen", response_model=PrescreenResponse)
+async def prescreen_resumes(
+    resumes: List[UploadFile] = File(...),
+    jd_file: Optional[UploadFile] = File(None),
+    jd_text: Optional[str] = Form(None),
+    top_k: Optional[int] = Form(None)
+):
+    if not jd_file and not jd_text:
+        raise HTTPException(
+            status_code=400, 
+            detail="Either JD file or JD text is required"
+        )
+    
+    try:
+        return await scoring_service.prescreen_resumes(
+            request_id=str(uuid.uuid4()),
+            resume_files=resumes,
+            jd_file=jd_file,
+            jd_text=jd_text,
+            top_k=top_k
+        )
+        
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InferenceQueueFull as e:
+        # Overloaded, not broken: the client should retry shortly
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
+    except ParseTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except BrokenProcessPool as e:
+        # The parse worker died; the pool is restarted for the next request
+        raise HTTPException(status_code=503, detail=f"Parse worker failed: {e}", headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/models")
+async def get_models():
+    return scoring_service.embedding_service.registry.get_stats()
+
+@router.get("/stats")
+async def get_stats():
+    # Sharded search stats are a round trip to every shard
+    return await asyncio.to_thread(scoring_service.get_stats)
+
 @router.get("/health")
 async def health_check():
     return {"status": "ok", "service": "scoring"}
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query
+from typing import List, Optional
+from concurrent.futures.process import BrokenProcessPool
+from app.api.v1.endpoints.scoring import scoring_service
+from app.schemas.search import CandidateSearchResponse
+from app.services.upload_intake import UploadRejected
+from app.services.inference_executor import InferenceQueueFull
+from app.services.parse_pool import ParseTimeout
+from app.core.config import settings
+import asyncio
+import uuid
+
+router = APIRouter()
+
+@router.post("/candidates", response_model=CandidateSearchResponse)
+async def search_candidates(
+    jd_file: Optional[UploadFile] = File(None),
+    jd_text: Optional[str] = Form(None),
+    top_k: int = Form(50),
+    shortlist_size: Optional[int] = Form(None),
+    nprobe: Optional[int] = Form(None)
+):
+    if not jd_file and not jd_text:
+        raise HTTPException(
+            status_code=400,
+            detail="Either JD file or JD text is required"
+        )
+    
+    try:
+        return await scoring_service.search_candidates(
+            request_id=str(uuid.uuid4()),
+            jd_file=jd_file,
+            jd_text=jd_text,
+            top_k=top_k,
+            shortlist_size=shortlist_size,
+            nprobe=nprobe
+        )
+        
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InferenceQueueFull as e:
+        # Overloaded, not broken: the client should retry shortly
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
+    except ParseTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except BrokenProcessPool as e:
+        # The parse worker died; the pool is restarted for the next request
+        raise HTTPException(status_code=503, detail=f"Parse worker failed: {e}", headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_S)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/recall")
+async def measure_recall(
+    k: int = 10,
+    queries: int = 100,
+    nprobe: Optional[List[int]] = Query(None)
+):
+    # Recall of the ANN index against brute force, per nprobe value
+    return await asyncio.to_thread(
+        scoring_service.candidate_search.measure_recall, k, queries, nprobe
+    )
@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 from app.api.v1.endpoints.scoring import router as scoring_router
+from app.api.v1.endpoints.search import router as search_router
 
 api_router = APIRouter()
 
 # Include scoring endpoints
 api_router.include_router(scoring_router, prefix="/scoring", tags=["scoring"])
+
+# Include candidate search endpoints
+api_router.include_router(search_router, prefix="/search", tags=["search"])
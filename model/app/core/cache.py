@@ -0,0 +1,304 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # No fork (and so no pre-fork workers) on this platform either
+    fcntl = None
+
+
+def content_key(*parts: str) -> str:
+    """Stable SHA-256 key for a tuple of strings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def numpy_dumps(value: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, value, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def numpy_loads(data: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+
+def _default_sizeof(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return 1024
+
+
+class MemoryLRUCache:
+    """Thread-safe LRU bounded by entry count and total size in bytes"""
+
+    def __init__(
+        self,
+        max_items: int,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = _default_sizeof
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        size = self._sizeof(value)
+        if self.max_items <= 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            # Evict least recently used entries until both bounds hold
+            while len(self._entries) > self.max_items or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'items': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class DiskCache:
+    """
+    File-per-entry store under a directory, evicting least recently used files by total size.
+
+    Processes sharing the directory (pre-fork workers) keep one running
+    total in a usage file under an flock. When it passes max_bytes the
+    directory is rescanned and the least recently used files, by
+    modification time, are evicted down to EVICT_TO of the cap, so a scan
+    runs once per that much churn rather than on every put.
+    """
+
+    USAGE_FILE = 'usage'
+    EVICT_TO = 0.9
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any]
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._dumps = dumps
+        self._loads = loads
+        self._items = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._usage() as usage:
+            entries = self._scan()
+            usage[:] = [sum(size for _, _, size in entries), len(entries)]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """(mtime, path, size) of every entry, least recently used first"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            if root == self.directory:
+                continue  # Entries live in key-prefix subdirectories; the usage file does not
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return sorted(entries)
+
+    @contextmanager
+    def _usage(self) -> Iterator[List[int]]:
+        """[bytes, items] shared by every process using the directory, locked while in use"""
+        with self._lock, open(os.path.join(self.directory, self.USAGE_FILE), 'a+') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                usage = [int(value) for value in f.read().split()][:2]
+            except ValueError:
+                usage = []
+            usage += [0] * (2 - len(usage))
+            yield usage
+            f.seek(0)
+            f.truncate()
+            f.write(f"{usage[0]} {usage[1]}")
+            f.flush()
+            self._bytes, self._items = usage
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            value = self._loads(data)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        # The modification time is the recency eviction goes by
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        data = self._dumps(value)
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = None
+
+        # Write atomically so concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing disk cache entry: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._usage() as usage:
+            usage[0] += len(data) - (previous or 0)
+            usage[1] += previous is None
+            if usage[0] > self.max_bytes:
+                self._evict(usage)
+
+    def _evict(self, usage: List[int]) -> None:
+        # The running total drifts when processes race on one key; the scan resets it
+        entries = self._scan()
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * self.EVICT_TO
+        evicted = 0
+        for _, path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self.evictions += evicted
+        usage[:] = [total, len(entries) - evicted]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'items': self._items,
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class TieredCache:
+    """Memory LRU in front of an optional persistent disk tier"""
+
+    def __init__(self, memory: MemoryLRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                # Promote to the memory tier for subsequent lookups
+                self.memory.put(key, value)
+                return value
+
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        memory_stats = self.memory.stats()
+        disk_stats = self.disk.stats() if self.disk is not None else None
+        hits = memory_stats['hits'] + (disk_stats['hits'] if disk_stats else 0)
+        lookups = memory_stats['hits'] + memory_stats['misses']
+        return {
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'memory': memory_stats,
+            'disk': disk_stats
+        }
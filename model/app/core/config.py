@@ -7,12 +7,71 @@ class Settings(BaseSettings):
     PORT: int = 8001
     HOST: str = "0.0.0.0"
     
+    # Startup (models load lazily; warm-up loads them in the background)
+    WARMUP_ON_STARTUP: bool = True
+    
+    # Pre-fork production server (python -m app.prefork)
+    WORKERS: int = 0  # 0 starts one worker per CPU core; each starts its own PARSE_WORKERS parse processes
+    WORKER_THREADS: int = 0  # Inference threads per worker; 0 splits the cores between workers
+    
     # CORS settings
     CORS_ORIGINS: List[str] = ["*"]
     
     # ML model settings
     MODEL_NAME: str = "all-MiniLM-L6-v2"
+    ALLOWED_MODELS: List[str] = []  # Extra embedding models requests may choose, besides MODEL_NAME
+    MODEL_MEMORY_BUDGET_MB: int = 2048  # Least recently used models are evicted above this
+    EMBEDDING_MODE: str = "transformer"  # "fast" uses hashed n-gram TF-IDF only
+    FAST_EMBEDDING_FEATURES: int = 2048  # Hash buckets per analyzer (word and char)
     EMBEDDING_DIMENSION: int = 384
+    EMBEDDING_BACKEND: str = "torch"  # "onnx" runs an exported graph on onnxruntime
+    ONNX_MODEL_DIR: str = ".cache/onnx"
+    ONNX_QUANTIZE: bool = True  # Dynamic int8 quantization of the exported graph
+    ONNX_PARITY_MIN_COSINE: float = 0.98  # Against PyTorch vectors, per text
+    ONNX_PARITY_MAX_SCORE_DELTA: float = 0.02  # Largest change in a pairwise similarity
+    REDUCED_EMBEDDING_DIMENSION: int = 0  # PCA dimension for search indexes; 0 disables
+    PROJECTION_PATH: str = ".cache/projection.npz"
+    
+    # Embedding cache (memory LRU in front of an on-disk tier)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ITEMS: int = 10000
+    EMBEDDING_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64MB
+    EMBEDDING_CACHE_DIR: str = ".cache/embeddings"  # Empty disables the disk tier
+    EMBEDDING_CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB
+    
+    # Cross-request micro-batching of embedding inference
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_MAX_BATCH_SIZE: int = 32
+    
+    # Inference executor (keeps model calls off the event loop)
+    INFERENCE_THREADS: int = 1
+    INFERENCE_MAX_QUEUE: int = 64  # 0 disables the bound
+    INFERENCE_RETRY_AFTER_S: int = 1  # Retry-After sent with the 503 when the queue is full
+    TORCH_NUM_THREADS: int = 0  # 0 keeps the library default
+    
+    # Document chunking (token windows instead of character truncation)
+    EMBEDDING_CHUNKING_ENABLED: bool = True
+    EMBEDDING_CHUNK_OVERLAP: int = 32  # Tokens shared by consecutive chunks
+    EMBEDDING_MAX_CHUNKS: int = 32  # Per document
+    
+    # Persistent vector store (memory-mapped resume and JD embeddings)
+    VECTOR_STORE_ENABLED: bool = True
+    VECTOR_STORE_DIR: str = ".cache/vector_store"
+    VECTOR_STORE_DTYPE: str = "float16"  # float32, float16 or int8
+    VECTOR_STORE_COMPACT_RATIO: float = 0.25  # Deleted fraction that triggers compaction
+    
+    # Candidate search (IVF index over stored resume embeddings)
+    ANN_NLIST: int = 0  # Inverted lists; 0 picks about sqrt(corpus size)
+    ANN_NPROBE: int = 8  # Lists scanned per query: the recall vs latency knob
+    ANN_MIN_INDEX_SIZE: int = 1000  # Smaller corpora are searched exactly
+    SEARCH_SHORTLIST_SIZE: int = 200  # Candidates reranked with the full scoring engine
+    
+    # Sharded vector index (scatter-gather across shard worker processes)
+    VECTOR_SHARDS: List[str] = []  # "host:port" per shard; empty keeps the in-process index
+    SHARD_TIMEOUT_MS: int = 500
+    SHARD_AUTHKEY: str = ""  # Required to use shards: a shared secret of 16+ characters, no default
+    SHARD_CONNECT_TIMEOUT_MS: int = 250  # Connect plus auth handshake
+    SHARD_RETRY_S: float = 5.0  # An unreachable shard is skipped this long before reconnecting
     
     # Scoring weights
     KEYWORD_MATCH_WEIGHT: float = 0.40
@@ -24,10 +83,49 @@ class Settings(BaseSettings):
     # Thresholds
     MIN_CONFIDENCE: float = 0.7
     SIMILARITY_THRESHOLD: float = 0.6
+    FUZZY_MATCH_THRESHOLD: int = 80  # A JD keyword matches a resume window scoring above this (partial_ratio scale)
+    FUZZY_INDEX_MIN_CHARS: int = 20000  # Resume text shorter than this skips the keyword n-gram index (break-even size)
+    
+    # Compiled job profiles (JD keywords, importance and expanded skills, keyed by JD content hash)
+    JOB_PROFILE_CACHE_MAX_ITEMS: int = 256
+    JOB_PROFILE_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # 16MB
+    
+    # Document parsing (worker processes keep PDF/DOCX parsing off the event loop)
+    # Per serving worker, so WORKERS x PARSE_WORKERS processes each load spaCy; lower it with many workers
+    PARSE_WORKERS: int = 2  # 0 parses on a thread of the serving process
+    PARSE_TIMEOUT_S: float = 30.0  # Per document; the worker is killed after this
+    PARSE_MAX_TASKS_PER_WORKER: int = 100  # Workers are replaced after this many documents
+    PARSE_EXTRACTOR_BUDGET_MS: float = 200.0  # Per extractor pass over a document; 0 disables
+    
+    # Parsed-document cache (keyed by upload bytes and parser version)
+    PARSE_CACHE_ENABLED: bool = True
+    PARSE_CACHE_VERSION: str = "1"  # Bump to invalidate entries when parser output changes outside its code
+    PARSE_CACHE_MAX_ITEMS: int = 2000
+    PARSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # 32MB
+    PARSE_CACHE_DIR: str = ".cache/parsed"  # Empty disables the disk tier
+    PARSE_CACHE_DISK_MAX_BYTES: int = 256 * 1024 * 1024  # 256MB
+    
+    # Named entities (names, employers and titles from the header and experience sections)
+    SPACY_MODEL: str = "en_core_web_sm"  # Loaded with only the components NER needs
+    NER_ENABLED: bool = True  # False keeps the rule-based titles and employers only
+    NER_BATCH_SIZE: int = 32  # Segments per nlp.pipe batch; also documents per bulk parse job
+    NER_MAX_CHARS: int = 20000  # Header and experience text sent to the model per document
+    
+    # Skill taxonomy (JSON list of skills with aliases, compiled into one matcher at startup)
+    SKILL_TAXONOMY_PATH: str = ""  # Empty uses the bundled app/data/skill_taxonomy.json
+    
+    # PDF and DOCX extraction budgets (per document)
+    PDF_MAX_PAGES: int = 50
+    PDF_MAX_CHARS: int = 200000  # Extraction stops once this much text is collected
+    PDF_PROBE_MIN_CHARS: int = 200  # Less PyPDF2 text than this on the first pages selects pdfplumber
+    DOCX_MAX_CHARS: int = 200000  # DOCX extraction stops once this much text is collected
     
     # File processing
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
-    SUPPORTED_FORMATS: List[str] = [".pdf", ".docx", ".doc", ".txt"]
+    SUPPORTED_FORMATS: List[str] = [".pdf", ".docx", ".txt"]  # Detected from the leading bytes, not the filename; legacy .doc has no extractor
+    UPLOAD_CHUNK_BYTES: int = 64 * 1024  # Uploads are read, size-checked and hashed in chunks of this size
+    UPLOAD_SPOOL_BYTES: int = 1024 * 1024  # Larger uploads go to a temp file that parsers memory-map
+    UPLOAD_SPOOL_DIR: str = ""  # Empty uses the system temp directory
     
     # Redis settings (for caching)
     REDIS_HOST: str = "localhost"
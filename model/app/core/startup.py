@@ -0,0 +1,101 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Taken when the app package is first imported, as close to process start as we get
+PROCESS_STARTED = time.perf_counter()
+
+class StartupReport:
+    """
+    Load state and timings of the heavy components (models, NLP pipelines).
+
+    Components are registered with a loader and loaded on first use or by
+    the background warm-up; readiness is reported from their states.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._per_process: set = set()
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> float:
+        """Record the time since process start at which a startup phase completed"""
+        elapsed_ms = round((time.perf_counter() - PROCESS_STARTED) * 1000.0, 3)
+        self.phases[phase] = elapsed_ms
+        return elapsed_ms
+
+    def register(self, name: str, loader: Callable[[], Any], enabled: bool = True, per_process: bool = False) -> None:
+        """per_process components (worker pools) cannot be inherited across fork"""
+        with self._lock:
+            self._loaders[name] = loader
+            if per_process:
+                self._per_process.add(name)
+            self.components.setdefault(name, {
+                "status": "pending" if enabled else "disabled",
+                "load_ms": None,
+                "error": None
+            })
+
+    @contextmanager
+    def track(self, name: str):
+        """Time a component load; exceptions mark it failed and propagate"""
+        with self._lock:
+            state = self.components.setdefault(name, {"status": "pending", "load_ms": None, "error": None})
+            state["status"] = "loading"
+        started = time.perf_counter()
+        try:
+            yield state
+        except Exception as e:
+            state["status"] = "failed"
+            state["error"] = str(e)
+            raise
+        finally:
+            state["load_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+        if state["status"] == "loading":
+            state["status"] = "ready"
+
+    def load_all(self, names: Optional[List[str]] = None, include_per_process: bool = True) -> None:
+        """Load every pending registered component in the calling thread"""
+        for name, loader in list(self._loaders.items()):
+            if names is not None and name not in names:
+                continue
+            if not include_per_process and name in self._per_process:
+                continue
+            if self.components[name]["status"] != "pending":
+                continue
+            try:
+                loader()
+            except Exception as e:
+                print(f"Error warming up {name}: {e}")
+        elapsed_ms = self.mark("warm")
+        print(f"Warm-up finished {elapsed_ms:.0f}ms after start: {self.summary()}")
+
+    def warm_up(self, names: Optional[List[str]] = None) -> threading.Thread:
+        """Load registered components on a background thread"""
+        thread = threading.Thread(target=self.load_all, args=(names,), name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self) -> bool:
+        return all(state["status"] in ("ready", "failed", "disabled") for state in self.components.values())
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{name}={state['status']}" + (f" ({state['load_ms']:.0f}ms)" if state["load_ms"] is not None else "")
+            for name, state in self.components.items()
+        )
+
+    def get_report(self) -> Dict[str, Any]:
+        degraded = [name for name, state in self.components.items() if state["status"] == "failed"]
+        return {
+            "ready": self.is_ready(),
+            "degraded": degraded,
+            "uptime_ms": round((time.perf_counter() - PROCESS_STARTED) * 1000.0, 3),
+            "phases": dict(self.phases),
+            "components": {name: dict(state) for name, state in self.components.items()}
+        }
+
+startup_report = StartupReport()
@@ -1,15 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 from app.core.config import settings
+from app.core.startup import startup_report
 from app.api.v1.router import api_router
-from app.services.scoring_service import ScoringService
+
+startup_report.mark("imported")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    elapsed_ms = startup_report.mark("serving")
+    print(f"Startup: serving {elapsed_ms:.0f}ms after start (imports {startup_report.phases['imported']:.0f}ms)")
+    
+    # Heavy models load in the background so liveness passes immediately
+    if settings.WARMUP_ON_STARTUP:
+        startup_report.warm_up()
+    yield
 
 app = FastAPI(
     title="ATS Scoring ML Service",
     description="AI-powered resume scoring and analysis service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -26,6 +40,14 @@ app.include_router(api_router, prefix="/api/v1")
 async def health_check():
     return {"status": "ok", "service": "ats-ml-service"}
 
+@app.get("/ready")
+async def readiness_check():
+    report = startup_report.get_report()
+    return JSONResponse(
+        status_code=200 if report["ready"] else 503,
+        content={"status": "ready" if report["ready"] else "loading", "service": "ats-ml-service", **report}
+    )
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,153 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+import uvicorn
+from app.core.config import settings
+
+def worker_thread_count(workers: int) -> int:
+    if settings.WORKER_THREADS > 0:
+        return settings.WORKER_THREADS
+    return max(1, (os.cpu_count() or 1) // workers)
+
+def memory_usage() -> Dict[str, float]:
+    """RSS and PSS (shared pages split between sharers) in MB, on Linux"""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    usage[key.lower() + "_mb"] = round(int(value.split()[0]) / 1024.0, 1)
+    except OSError:
+        pass
+    return usage
+
+def _limit_threads(threads: int) -> None:
+    # Must be set before torch / BLAS create their thread pools
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ.setdefault(variable, str(threads))
+    # The Rust tokenizer's thread pool does not survive fork
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+class PreforkServer:
+    """
+    Loads the models once, then forks uvicorn workers that share them.
+
+    The parent imports the app and loads every heavy component before
+    forking, so model weights are shared copy-on-write instead of being
+    loaded into each worker's private memory. gc.freeze() keeps the
+    collector from touching (and so copying) the inherited objects. The
+    parent never serves or runs inference; it restarts workers that exit.
+    """
+
+    def __init__(self, host: str, port: int, workers: int):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = worker_thread_count(workers)
+        self.children: Dict[int, int] = {}
+        self.stopping = False
+        self.sock: Optional[socket.socket] = None
+        self.app = None
+
+    def preload(self) -> None:
+        _limit_threads(self.threads)
+        from app.core.startup import startup_report
+        from app.main import app
+
+        # Worker pools are started by each worker after the fork
+        startup_report.load_all(include_per_process=False)
+        self.app = app
+        print(f"Preloaded models in parent {os.getpid()}: {memory_usage()}")
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = slot
+            return
+
+        # Worker process
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        try:
+            if "torch" in sys.modules:
+                sys.modules["torch"].set_num_threads(self.threads)
+
+            # Models are already loaded; the warm-up only starts per-process components
+            print(f"Worker {slot} (pid {os.getpid()}) serving with {self.threads} inference threads: {memory_usage()}")
+            config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="info")
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException as e:
+            print(f"Worker {slot} (pid {os.getpid()}) failed: {e!r}")
+            os._exit(1)
+        os._exit(0)
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        self.preload()
+        self.sock = _bind(self.host, self.port)
+
+        # Move everything allocated so far out of the collector's reach
+        gc.collect()
+        gc.freeze()
+
+        for slot in range(self.workers):
+            self.spawn(slot)
+        print(f"Pre-fork server on {self.host}:{self.port}: {self.workers} workers x {self.threads} threads")
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            slot = self.children.pop(pid, None)
+            if slot is None or self.stopping:
+                continue
+
+            print(f"Worker {slot} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+            time.sleep(1.0)
+            self.spawn(slot)
+
+        self.sock.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Production server: preload models, then fork workers")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS or os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        raise SystemExit("Pre-fork mode needs os.fork; use uvicorn --workers on this platform")
+
+    PreforkServer(args.host, args.port, max(1, args.workers)).run()
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ class ScoringResponse(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0)
     raw_parsed_resume: str
     raw_parsed_jd: str
+    embedding_model: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class ParsedResume(BaseModel):
@@ -49,3 +50,15 @@ class KeywordMatch(BaseModel):
     importance: str
     matched: bool
     confidence: float
+
+class PrescreenMatch(BaseModel):
+    filename: str
+    rank: int
+    score: float
+
+class PrescreenResponse(BaseModel):
+    request_id: str
+    method: str
+    results: List[PrescreenMatch]
+    elapsed_ms: float
+    created_at: datetime = Field(default_factory=datetime.utcnow)
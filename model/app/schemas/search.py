@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict
+from datetime import datetime
+
+class CandidateMatch(BaseModel):
+    resume_id: str
+    candidate_name: Optional[str] = None
+    candidate_email: Optional[str] = None
+    similarity: float = Field(..., description="Embedding similarity used for retrieval")
+    overall_score: int = Field(..., ge=0, le=100)
+    scores: Dict[str, int]
+    matched_keywords: List[str]
+    missing_keywords: List[Dict[str, str]]
+
+class CandidateSearchResponse(BaseModel):
+    request_id: str
+    total_indexed: int
+    retrieved: int = Field(..., description="Shortlist size reranked by the scoring engine")
+    index: str = Field(..., description="Retrieval method: ivf, exact, sharded or none")
+    nprobe: Optional[int] = None
+    partial: bool = Field(False, description="True when some shards did not answer in time")
+    missing_shards: List[str] = []
+    results: List[CandidateMatch]
+    retrieval_ms: float
+    rerank_ms: float
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,384 @@
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.services import vector_ops
+from app.services.vector_store import VectorStore
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest neighbour index over unit vectors.
+
+    Vectors are clustered with k-means into `n_lists` cells. A query scans
+    only the `nprobe` cells whose centroids are closest, so nprobe trades
+    recall for latency: nprobe == n_lists is an exact search.
+    """
+
+    def __init__(self, n_lists: int, dtype=np.float16):
+        self.n_lists = max(1, n_lists)
+        self.dtype = dtype
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+
+        self._list_ids: List[List[str]] = []
+        self._list_vectors: List[np.ndarray] = []
+        self._list_pending: List[List[np.ndarray]] = []
+        self._locations: Dict[str, Tuple[int, int]] = {}
+        self._stale = 0
+
+    @staticmethod
+    def default_n_lists(size: int) -> int:
+        # Around sqrt(N) cells keeps both centroid and cell scans small
+        return max(1, int(np.sqrt(size)))
+
+    @classmethod
+    def build_from_store(
+        cls,
+        store: VectorStore,
+        n_lists: int = 0,
+        sample_size: int = 100000,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> "IVFIndex":
+        ids: List[str] = []
+        blocks: List[np.ndarray] = []
+        for row_ids, block, alive in store.iter_blocks():
+            ids.extend(row_ids[i] for i in np.flatnonzero(alive))
+            block = block[alive]
+            if transform is not None and len(block):
+                block = transform(block)
+            blocks.append(block.astype(np.float16))
+
+        vectors = np.vstack(blocks) if blocks else np.zeros((0, store.dimension), dtype=np.float16)
+        index = cls(n_lists or cls.default_n_lists(len(ids)))
+        index.train(vectors, sample_size=sample_size)
+        index.add(ids, vectors)
+        return index
+
+    def train(self, vectors: np.ndarray, iterations: int = 10, sample_size: int = 100000, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        vectors = vector_ops.normalize(vectors)
+
+        self.n_lists = max(1, min(self.n_lists, len(vectors)))
+        if len(vectors) == 0:
+            raise ValueError("Cannot train an IVF index without vectors")
+
+        # Spherical k-means (Lloyd iterations on unit vectors)
+        centroids = vectors[rng.choice(len(vectors), self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            counts = np.bincount(assignments, minlength=self.n_lists)
+
+            # Re-seed empty cells from random points
+            empty = counts == 0
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            centroids = vector_ops.normalize(sums)
+
+        self.centroids = centroids
+        self.trained_size = len(vectors)
+        self._list_ids = [[] for _ in range(self.n_lists)]
+        self._list_vectors = [np.zeros((0, vectors.shape[1]), dtype=self.dtype) for _ in range(self.n_lists)]
+        self._list_pending = [[] for _ in range(self.n_lists)]
+        self._locations = {}
+        self._stale = 0
+
+    def add(self, ids: List[str], vectors: np.ndarray) -> None:
+        if self.centroids is None:
+            raise RuntimeError("IVF index must be trained before adding vectors")
+        if not ids:
+            return
+
+        vectors = vector_ops.normalize(np.atleast_2d(vectors))
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        for vector_id, vector, cell in zip(ids, vectors, assignments):
+            if vector_id in self._locations:
+                self._stale += 1
+            position = len(self._list_ids[cell])
+            self._list_ids[cell].append(vector_id)
+            self._list_pending[cell].append(vector.astype(self.dtype))
+            self._locations[vector_id] = (int(cell), position)
+
+    def remove(self, vector_id: str) -> bool:
+        # Stale entries are skipped at query time via the location map
+        if self._locations.pop(vector_id, None) is None:
+            return False
+        self._stale += 1
+        return True
+
+    def ids(self) -> List[str]:
+        return list(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, vector_id: str) -> bool:
+        return vector_id in self._locations
+
+    def _cell_vectors(self, cell: int) -> np.ndarray:
+        if self._list_pending[cell]:
+            self._list_vectors[cell] = np.vstack([self._list_vectors[cell]] + self._list_pending[cell])
+            self._list_pending[cell] = []
+        return self._list_vectors[cell]
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = 8) -> List[Tuple[str, float]]:
+        if self.centroids is None or k <= 0:
+            return []
+
+        query = vector_ops.normalize(query)
+        probe_cells, _ = vector_ops.top_k(self.centroids @ query, min(max(1, nprobe), self.n_lists))
+
+        ids: List[str] = []
+        positions: List[Tuple[int, int]] = []
+        blocks: List[np.ndarray] = []
+        for cell in probe_cells:
+            vectors = self._cell_vectors(int(cell))
+            if len(vectors) == 0:
+                continue
+            ids.extend(self._list_ids[cell])
+            positions.extend((int(cell), position) for position in range(len(vectors)))
+            blocks.append(vectors)
+
+        if not blocks:
+            return []
+
+        scores = vector_ops.similarity_matrix(query, np.vstack(blocks), normalized=True, dtype=self.dtype)
+
+        # Mask removed or superseded entries
+        if self._stale:
+            for i, (vector_id, location) in enumerate(zip(ids, positions)):
+                if self._locations.get(vector_id) != location:
+                    scores[i] = -np.inf
+
+        indices, top_scores = vector_ops.top_k(scores, k)
+        return [
+            (ids[i], float(score))
+            for i, score in zip(indices, top_scores)
+            if np.isfinite(score)
+        ]
+
+    def exact_search(self, query: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        return self.search(query, k, nprobe=self.n_lists)
+
+    def measure_recall(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        nprobe_values: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Recall@k and mean latency per nprobe, against a brute-force scan of every cell
+        """
+        queries = np.atleast_2d(queries)
+        nprobe_values = nprobe_values or sorted({1, 2, 4, 8, 16, 32, self.n_lists})
+
+        exact = []
+        started = time.perf_counter()
+        for query in queries:
+            exact.append({vector_id for vector_id, _ in self.exact_search(query, k)})
+        exact_ms = (time.perf_counter() - started) * 1000.0 / max(1, len(queries))
+
+        report = []
+        for nprobe in nprobe_values:
+            if nprobe > self.n_lists:
+                continue
+            hits = 0
+            expected = 0
+            started = time.perf_counter()
+            for query, truth in zip(queries, exact):
+                found = {vector_id for vector_id, _ in self.search(query, k, nprobe=nprobe)}
+                hits += len(found & truth)
+                expected += len(truth)
+            elapsed_ms = (time.perf_counter() - started) * 1000.0 / max(1, len(queries))
+
+            report.append({
+                'nprobe': nprobe,
+                'recall': round(hits / expected, 4) if expected else 1.0,
+                'latency_ms': round(elapsed_ms, 3),
+                'exact_latency_ms': round(exact_ms, 3)
+            })
+
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        sizes = [len(ids) for ids in self._list_ids]
+        return {
+            'size': len(self._locations),
+            'n_lists': self.n_lists,
+            'trained_size': self.trained_size,
+            'largest_list': max(sizes) if sizes else 0
+        }
+
+class StoreIndex:
+    """
+    VectorStore plus a lazily trained IVF index.
+
+    Small stores are searched exactly; once the store reaches
+    min_index_size an IVF index is built and retrained whenever the store
+    has doubled since the centroids were fitted. Builds run on a background
+    thread: searches meanwhile use the previous index, or exact search
+    before the first one exists. With a projector the index holds reduced
+    vectors while the store keeps full-dimension ones.
+
+    Other processes may write to the same store, so each search first adds
+    the rows appended since the index last looked, and drops results the
+    store no longer holds.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        min_index_size: int = 1000,
+        n_lists: int = 0,
+        projector: Optional[Any] = None
+    ):
+        self.store = store
+        self.min_index_size = min_index_size
+        self.n_lists = n_lists
+        self.projector = projector
+        self.index: Optional[IVFIndex] = None
+        self._lock = threading.Lock()
+        self._builder: Optional[threading.Thread] = None
+        self._seen = (-1, 0)  # Store generation and row count the index reflects
+
+    def add(self, vector_id: str, vector: np.ndarray) -> bool:
+        # Ids are content hashes, so an existing id already holds this vector
+        if vector_id in self.store:
+            return False
+
+        self.store.add(vector_id, vector)
+        with self._lock:
+            if self.index is not None and vector_id not in self.index:
+                self.index.add([vector_id], self._project(vector))
+        return True
+
+    def delete(self, vector_id: str) -> bool:
+        deleted = self.store.delete(vector_id)
+        with self._lock:
+            # Otherwise it keeps taking shortlist slots until the next rebuild
+            if self.index is not None:
+                self.index.remove(vector_id)
+        return deleted
+
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        return self.projector.transform(vectors) if self.projector is not None else vectors
+
+    def _build_index(self) -> IVFIndex:
+        transform = self.projector.transform if self.projector is not None else None
+        return IVFIndex.build_from_store(self.store, self.n_lists, transform=transform)
+
+    def get_vectors(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        vectors = {}
+        for vector_id in ids:
+            vector = self.store.get(vector_id)
+            if vector is not None:
+                vectors[vector_id] = vector
+        return vectors
+
+    def ensure_index(self, wait: bool = False) -> Optional[IVFIndex]:
+        """
+        Current IVF index, starting a background (re)build when one is due;
+        with wait, blocks until that build has finished
+        """
+        if len(self.store) < self.min_index_size:
+            return None
+
+        with self._lock:
+            if (self.index is None or len(self.store) > 2 * self.index.trained_size) and self._builder is None:
+                self._builder = threading.Thread(target=self._rebuild, name="ivf-build", daemon=True)
+                self._builder.start()
+            builder = self._builder
+            index = self.index
+
+        if wait and builder is not None:
+            builder.join()
+            with self._lock:
+                index = self.index
+        return index
+
+    def _rebuild(self) -> None:
+        started = time.perf_counter()
+        try:
+            index = self._build_index()
+        except Exception as e:
+            print(f"Error building IVF index: {e}")
+            with self._lock:
+                self._builder = None
+            return
+
+        with self._lock:
+            # Vectors added or deleted while the build ran are not reflected in its snapshot
+            self.index = index
+            self._seen = (-1, 0)
+            self._catch_up()
+            self._builder = None
+        print(f"Built IVF index over {len(index)} vectors in {time.perf_counter() - started:.2f}s")
+
+    def _catch_up(self) -> None:
+        """Bring the index up to date with the store; call with the lock held"""
+        seen_generation, seen_count = self._seen
+        generation, count, ids = self.store.ids_from(seen_count)
+        if generation != seen_generation:
+            # A rebuild or compaction: row numbers start over, so compare the whole id sets
+            generation, count, ids = self.store.ids_from(0)
+            live = set(ids)
+            for vector_id in self.index.ids():
+                if vector_id not in live:
+                    self.index.remove(vector_id)
+
+        for vector_id in ids:
+            if vector_id not in self.index:
+                vector = self.store.get(vector_id)
+                if vector is not None:
+                    self.index.add([vector_id], self._project(vector))
+        self._seen = (generation, count)
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = 8) -> Tuple[List[Tuple[str, float]], str]:
+        index = self.ensure_index()
+        if index is None:
+            return self.store.search(query, k), "exact"
+
+        with self._lock:
+            self._catch_up()
+            results = self.index.search(self._project(query), k, nprobe=nprobe)
+            # Deleted by another process since the index last looked
+            gone = [vector_id for vector_id, _ in results if vector_id not in self.store]
+            for vector_id in gone:
+                self.index.remove(vector_id)
+        if gone:
+            results = [(vector_id, score) for vector_id, score in results if vector_id not in gone]
+        return results, "ivf"
+
+    def measure_recall(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        nprobe_values: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        with self._lock:
+            index = self.index
+        if index is None:
+            index = self._build_index()
+        queries = self._project(queries)
+
+        return {
+            "corpus_size": len(index),
+            "n_lists": index.n_lists,
+            "k": k,
+            "queries": len(queries),
+            "results": index.measure_recall(queries, k=k, nprobe_values=nprobe_values)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "store": self.store.get_stats(),
+                "index": self.index.get_stats() if self.index is not None else None,
+                "min_index_size": self.min_index_size,
+                "projection": (
+                    f"{self.projector.input_dimension}->{self.projector.dimension}"
+                    if self.projector is not None else None
+                )
+            }
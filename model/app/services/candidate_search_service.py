@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple, Union
+from app.core.config import settings
+from app.schemas.scoring import ParsedResume, ParsedJD
+from app.schemas.search import CandidateMatch, CandidateSearchResponse
+from app.services.ann_index import StoreIndex
+from app.services.dimension_reduction import EmbeddingProjector
+from app.services.embedding_service import EmbeddingService
+from app.services.scoring_engine import ScoringEngine
+from app.services.shard_service import ShardedVectorIndex, shard_authkey
+
+RESUME_STORE = "resumes"
+JD_STORE = "jds"
+
+class CandidateSearchService:
+    """
+    Ranks the stored resume corpus against a JD.
+
+    Retrieval uses an IVF index over the stored resume embeddings (exact
+    search while the corpus is small), or scatter-gathers across shard
+    processes when VECTOR_SHARDS is set; only the retrieved shortlist is
+    reranked with the full ScoringEngine.
+    """
+
+    def __init__(self, embedding_service: EmbeddingService, scoring_engine: ScoringEngine):
+        self.embedding_service = embedding_service
+        self.scoring_engine = scoring_engine
+        self._index: Optional[Union[StoreIndex, ShardedVectorIndex]] = None
+        self._lock = threading.Lock()
+        if settings.VECTOR_SHARDS:
+            # Fail at startup rather than on the first search
+            shard_authkey()
+
+    # Corpus
+
+    def _document_path(self, resume_id: str) -> str:
+        return os.path.join(settings.VECTOR_STORE_DIR, RESUME_STORE, "documents", resume_id[:2], f"{resume_id}.json")
+
+    def _save_document(self, resume_id: str, parsed_resume: ParsedResume, metadata: Dict[str, Any]) -> None:
+        path = self._document_path(resume_id)
+        if os.path.exists(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "metadata": metadata,
+                "parsed_resume": parsed_resume.model_dump()
+            }, f)
+        os.replace(tmp_path, path)
+
+    def _load_document(self, resume_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._document_path(resume_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_shortlist(self, resume_ids: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, np.ndarray]]:
+        """Stored documents and vectors of a shortlist; file and shard I/O, so run off the event loop"""
+        backend = self._backend()
+        if backend is None or not resume_ids:
+            return {}, {}
+
+        documents = {}
+        for resume_id in resume_ids:
+            document = self._load_document(resume_id)
+            if document is not None:
+                documents[resume_id] = document
+        return documents, backend.get_vectors(resume_ids)
+
+    def _backend(self) -> Optional[Union[StoreIndex, ShardedVectorIndex]]:
+        """Sharded scatter-gather index when shards are configured, else the local store"""
+        with self._lock:
+            if self._index is None:
+                if settings.VECTOR_SHARDS:
+                    self._index = ShardedVectorIndex(settings.VECTOR_SHARDS)
+                else:
+                    store = self.embedding_service.get_vector_store(RESUME_STORE)
+                    if store is not None:
+                        self._index = StoreIndex(
+                            store,
+                            min_index_size=settings.ANN_MIN_INDEX_SIZE,
+                            n_lists=settings.ANN_NLIST,
+                            projector=EmbeddingProjector.load_configured(store.dimension)
+                        )
+            return self._index
+
+    def index_resume(
+        self,
+        resume_id: str,
+        parsed_resume: ParsedResume,
+        vector: np.ndarray,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        backend = self._backend()
+        if backend is None or self.embedding_service.model is None:
+            return False
+
+        try:
+            self._save_document(resume_id, parsed_resume, metadata or {})
+            backend.add(resume_id, vector)
+        except Exception as e:
+            print(f"Error indexing resume {resume_id}: {e}")
+            return False
+        return True
+
+    # Retrieval
+
+    def retrieve(
+        self,
+        jd_vector: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None
+    ) -> Tuple[List[Tuple[str, float]], str, List[str]]:
+        backend = self._backend()
+        if backend is None:
+            return [], "none", []
+
+        nprobe = nprobe or settings.ANN_NPROBE
+        if isinstance(backend, ShardedVectorIndex):
+            return backend.search(jd_vector, k, nprobe=nprobe)
+
+        results, method = backend.search(jd_vector, k, nprobe=nprobe)
+        return results, method, []
+
+    async def search(
+        self,
+        request_id: str,
+        parsed_jd: ParsedJD,
+        jd_vector: np.ndarray,
+        top_k: int,
+        shortlist_size: Optional[int] = None,
+        nprobe: Optional[int] = None
+    ) -> CandidateSearchResponse:
+        shortlist_size = max(top_k, shortlist_size or settings.SEARCH_SHORTLIST_SIZE)
+
+        started = time.perf_counter()
+        shortlist, index_type, missing_shards = await asyncio.to_thread(self.retrieve, jd_vector, shortlist_size, nprobe)
+        retrieval_ms = (time.perf_counter() - started) * 1000.0
+
+        # Rerank only the shortlist with the full scoring engine
+        started = time.perf_counter()
+        matches = await asyncio.to_thread(self._rerank, shortlist, parsed_jd, jd_vector)
+        rerank_ms = (time.perf_counter() - started) * 1000.0
+
+        matches.sort(key=lambda match: (match.overall_score, match.similarity), reverse=True)
+        total_indexed = await asyncio.to_thread(self._corpus_size)
+
+        return CandidateSearchResponse(
+            request_id=request_id,
+            total_indexed=total_indexed,
+            retrieved=len(shortlist),
+            index=index_type,
+            nprobe=(nprobe or settings.ANN_NPROBE) if index_type in ("ivf", "sharded") else None,
+            partial=bool(missing_shards),
+            missing_shards=missing_shards,
+            results=matches[:top_k],
+            retrieval_ms=round(retrieval_ms, 3),
+            rerank_ms=round(rerank_ms, 3)
+        )
+
+    def _rerank(self, shortlist: List[Tuple[str, float]], parsed_jd: ParsedJD, jd_vector: np.ndarray) -> List[CandidateMatch]:
+        """Full scores for a shortlist; file I/O and CPU-bound scoring, so run off the event loop"""
+        documents, resume_vectors = self._load_shortlist([resume_id for resume_id, _ in shortlist])
+        # score_resume never suspends, so a private loop on this thread runs it start to finish
+        return asyncio.run(self._score_shortlist(shortlist, documents, resume_vectors, parsed_jd, jd_vector))
+
+    async def _score_shortlist(
+        self,
+        shortlist: List[Tuple[str, float]],
+        documents: Dict[str, Dict[str, Any]],
+        resume_vectors: Dict[str, np.ndarray],
+        parsed_jd: ParsedJD,
+        jd_vector: np.ndarray
+    ) -> List[CandidateMatch]:
+        matches = []
+        jd_embeddings = jd_vector[np.newaxis, :]
+        for resume_id, similarity in shortlist:
+            document = documents.get(resume_id)
+            resume_vector = resume_vectors.get(resume_id)
+            if document is None or resume_vector is None:
+                continue
+
+            parsed_resume = ParsedResume(**document["parsed_resume"])
+            result = await self.scoring_engine.score_resume(
+                parsed_resume=parsed_resume,
+                parsed_jd=parsed_jd,
+                resume_embeddings=resume_vector[np.newaxis, :],
+                jd_embeddings=jd_embeddings
+            )
+
+            metadata = document.get("metadata", {})
+            matches.append(CandidateMatch(
+                resume_id=resume_id,
+                candidate_name=metadata.get("candidate_name") or parsed_resume.contact_info.get("name"),
+                candidate_email=metadata.get("candidate_email") or parsed_resume.contact_info.get("email"),
+                similarity=similarity,
+                overall_score=result["overall_score"],
+                scores=result["scores"],
+                matched_keywords=result["matched_keywords"],
+                missing_keywords=result["missing_keywords"]
+            ))
+        return matches
+
+    def _corpus_size(self) -> int:
+        backend = self._backend()
+        if isinstance(backend, StoreIndex):
+            return len(backend.store)
+        if isinstance(backend, ShardedVectorIndex):
+            # Counts the shards reported with their last search results
+            return backend.live_count()
+        return 0
+
+    def measure_recall(
+        self,
+        k: int = 10,
+        num_queries: int = 100,
+        nprobe_values: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Recall@k of the IVF index against brute force for a range of nprobe values
+        """
+        backend = self._backend()
+        if not isinstance(backend, StoreIndex):
+            return {"error": "Recall is measured on the local index; query each shard's process directly"}
+
+        store = backend.store
+        if len(store) == 0:
+            return {"error": "No stored resume embeddings"}
+
+        # Stored JDs are the realistic query set; fall back to resumes themselves
+        rng = np.random.default_rng(0)
+        jd_store = self.embedding_service.get_vector_store(JD_STORE)
+        query_store = jd_store if jd_store is not None and len(jd_store) > 0 else store
+        query_ids = query_store.ids()
+        if len(query_ids) > num_queries:
+            query_ids = [query_ids[i] for i in rng.choice(len(query_ids), num_queries, replace=False)]
+        queries = np.vstack([query_store.get(query_id) for query_id in query_ids])
+
+        return backend.measure_recall(queries, k=k, nprobe_values=nprobe_values)
+
+    def get_stats(self) -> Dict[str, Any]:
+        backend = self._backend()
+        return {
+            "backend": backend.get_stats() if backend is not None else None,
+            "nprobe": settings.ANN_NPROBE
+        }
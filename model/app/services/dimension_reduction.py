@@ -0,0 +1,188 @@
+import argparse
+import os
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.services import vector_ops
+from app.services.vector_store import VectorStore
+
+class EmbeddingProjector:
+    """
+    Linear (PCA) projection of embeddings to a smaller dimension.
+
+    Projected vectors are re-normalised, so dot products in the reduced
+    space remain cosine similarities.
+    """
+
+    def __init__(self, components: np.ndarray, mean: np.ndarray):
+        self.components = components.astype(np.float32)
+        self.mean = mean.astype(np.float32)
+
+    @property
+    def input_dimension(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def dimension(self) -> int:
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dimension: int, seed: int = 0) -> "EmbeddingProjector":
+        from sklearn.decomposition import PCA
+
+        vectors = vector_ops.normalize(vectors)
+        dimension = min(dimension, vectors.shape[0], vectors.shape[1])
+        pca = PCA(n_components=dimension, svd_solver="randomized", random_state=seed)
+        pca.fit(vectors)
+        return cls(pca.components_, pca.mean_)
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        single = np.ndim(vectors) == 1
+        projected = (np.atleast_2d(vectors).astype(np.float32) - self.mean) @ self.components.T
+        projected = vector_ops.normalize(projected)
+        return projected[0] if single else projected
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, components=self.components, mean=self.mean)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingProjector":
+        data = np.load(path)
+        return cls(data["components"], data["mean"])
+
+    @classmethod
+    def load_configured(cls, input_dimension: int) -> Optional["EmbeddingProjector"]:
+        """Projection from settings, or None when reduction is disabled or not fitted yet"""
+        if settings.REDUCED_EMBEDDING_DIMENSION <= 0 or not os.path.exists(settings.PROJECTION_PATH):
+            return None
+
+        try:
+            projector = cls.load(settings.PROJECTION_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading embedding projection: {e}")
+            return None
+
+        if projector.input_dimension != input_dimension or projector.dimension != settings.REDUCED_EMBEDDING_DIMENSION:
+            print(
+                f"Ignoring projection {projector.input_dimension}->{projector.dimension}: "
+                f"expected {input_dimension}->{settings.REDUCED_EMBEDDING_DIMENSION}"
+            )
+            return None
+        return projector
+
+def _load_vectors(store: VectorStore, limit: Optional[int] = None, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Live vectors, or a uniform random sample of limit of them (not the oldest rows)"""
+    chosen = None
+    if limit is not None and limit < len(store):
+        rng = rng or np.random.default_rng(0)
+        chosen = np.sort(rng.choice(len(store), limit, replace=False))
+
+    blocks = []
+    seen = 0
+    for _, block, alive in store.iter_blocks():
+        block = block[alive]
+        if chosen is not None:
+            low, high = np.searchsorted(chosen, [seen, seen + len(block)])
+            seen += len(block)
+            block = block[chosen[low:high] - (seen - len(block))]
+        blocks.append(block)
+    return np.vstack(blocks) if blocks else np.zeros((0, store.dimension), dtype=np.float32)
+
+def evaluate_projection(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    projector: EmbeddingProjector,
+    k: int = 10
+) -> Dict[str, Any]:
+    """
+    Compare ranking and similarity scores in the reduced space against full-dimension vectors
+    """
+    from scipy.stats import spearmanr
+
+    full_scores = vector_ops.similarity_matrix(queries, corpus)
+
+    reduced_corpus = projector.transform(corpus)
+    reduced_queries = projector.transform(queries)
+    started = time.perf_counter()
+    reduced_scores = vector_ops.similarity_matrix(reduced_queries, reduced_corpus, normalized=True)
+    reduced_ms = (time.perf_counter() - started) * 1000.0
+
+    full_top, _ = vector_ops.top_k(full_scores, k)
+    reduced_top, _ = vector_ops.top_k(reduced_scores, k)
+    recall = np.mean([
+        len(set(full_row) & set(reduced_row)) / len(full_row)
+        for full_row, reduced_row in zip(full_top, reduced_top)
+        if len(full_row)
+    ])
+
+    # Agreement of per-candidate scores, as compute_similarities would return them
+    correlations = [spearmanr(full_row, reduced_row).correlation for full_row, reduced_row in zip(full_scores, reduced_scores)]
+
+    return {
+        "dimension": projector.dimension,
+        "recall_at_k": round(float(recall), 4),
+        "similarity_spearman": round(float(np.nanmean(correlations)), 4),
+        "similarity_mean_abs_error": round(float(np.mean(np.abs(full_scores - reduced_scores))), 4),
+        "bytes_per_vector_float16": projector.dimension * 2,
+        "reduced_scan_ms": round(reduced_ms, 3)
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fit and evaluate the stored-embedding projection")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = subparsers.add_parser("fit", help="Fit a PCA projection on stored resume embeddings")
+    fit_parser.add_argument("--dimension", type=int, default=settings.REDUCED_EMBEDDING_DIMENSION or 128)
+    fit_parser.add_argument("--sample", type=int, default=100000)
+    fit_parser.add_argument("--output", default=settings.PROJECTION_PATH)
+
+    eval_parser = subparsers.add_parser("evaluate", help="Report recall and similarity agreement per dimension")
+    eval_parser.add_argument("--dimensions", type=int, nargs="+", default=[32, 64, 128, 192, 256])
+    eval_parser.add_argument("--k", type=int, default=10)
+    eval_parser.add_argument("--queries", type=int, default=200)
+    eval_parser.add_argument("--corpus", type=int, default=50000)
+
+    fit_parser.add_argument("--seed", type=int, default=0, help="Seed for sampling stored vectors")
+    eval_parser.add_argument("--seed", type=int, default=0, help="Seed for sampling stored vectors and queries")
+
+    for sub in (fit_parser, eval_parser):
+        sub.add_argument("--store", default=os.path.join(settings.VECTOR_STORE_DIR, "resumes"))
+        sub.add_argument("--store-dimension", type=int, default=settings.EMBEDDING_DIMENSION)
+
+    args = parser.parse_args(argv)
+    store = VectorStore(args.store, args.store_dimension, dtype=settings.VECTOR_STORE_DTYPE)
+
+    if args.command == "fit":
+        vectors = _load_vectors(store, args.sample, np.random.default_rng(args.seed))
+        projector = EmbeddingProjector.fit(vectors, args.dimension)
+        projector.save(args.output)
+        print(f"Fitted {projector.input_dimension}->{projector.dimension} projection on {len(vectors)} vectors: {args.output}")
+        return
+
+    rng = np.random.default_rng(args.seed)
+    vectors = _load_vectors(store, args.corpus, rng)
+    query_rows = rng.choice(len(vectors), min(args.queries, len(vectors) // 2), replace=False)
+    queries = vectors[query_rows]
+
+    # Queries are held out of both the fit and the searched corpus: left in,
+    # each finds itself at rank 1 in both spaces and inflates recall
+    rest = np.ones(len(vectors), dtype=bool)
+    rest[query_rows] = False
+    corpus = vectors[rest]
+
+    print(f"Corpus: {len(corpus)} vectors, {len(queries)} held-out queries, k={args.k}")
+    print(f"{'dim':>5} {'recall@k':>9} {'spearman':>9} {'mae':>7} {'bytes':>6} {'scan_ms':>9}")
+    for dimension in args.dimensions:
+        projector = EmbeddingProjector.fit(corpus, dimension)
+        report = evaluate_projection(corpus, queries, projector, k=args.k)
+        print(
+            f"{report['dimension']:>5} {report['recall_at_k']:>9} {report['similarity_spearman']:>9} "
+            f"{report['similarity_mean_abs_error']:>7} {report['bytes_per_vector_float16']:>6} {report['reduced_scan_ms']:>9}"
+        )
+
+if __name__ == "__main__":
+    main()
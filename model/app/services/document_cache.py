@@ -0,0 +1,101 @@
+import hashlib
+import importlib.util
+import json
+import os
+from typing import Any, Dict, Optional, Tuple, Type
+from pydantic import BaseModel
+from app.core.cache import DiskCache, MemoryLRUCache, TieredCache, content_key
+from app.core.config import settings
+from app.services.upload_intake import Upload
+
+# Modules whose code decides parser output; editing any of them changes the version
+PARSER_SOURCES = [
+    "app.services.parser_service",
+    "app.services.pdf_extractor",
+    "app.services.docx_extractor",
+    "app.services.skill_matcher",
+    "app.services.text_scanner",
+    "app.services.section_index",
+    "app.services.entity_extractor",
+    "app.services.upload_intake",
+]
+
+_parser_version: Optional[str] = None
+
+def parser_version() -> str:
+    """Fingerprint of the parser code, the skill taxonomy, the NER model and PARSE_CACHE_VERSION"""
+    global _parser_version
+    if _parser_version is None:
+        from app.services.skill_matcher import taxonomy_path
+
+        digest = hashlib.sha256(settings.PARSE_CACHE_VERSION.encode("utf-8"))
+        digest.update(f"{settings.SPACY_MODEL}:{settings.NER_ENABLED}".encode("utf-8"))
+        paths = [getattr(importlib.util.find_spec(module), "origin", None) for module in PARSER_SOURCES]
+        for path in paths + [taxonomy_path()]:
+            if path and os.path.exists(path):
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        _parser_version = digest.hexdigest()[:16]
+    return _parser_version
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+class ParsedDocumentCache:
+    """
+    Extracted text and parse result per upload, keyed by the SHA-256 of
+    the file bytes and the parser version.
+
+    Entries are kept as compact JSON in both tiers, so the memory tier is
+    bounded by real size and the disk tier survives restarts. A parser
+    change produces new keys; stale entries are never read again and age
+    out of the LRU tiers.
+    """
+
+    def __init__(self):
+        self.version = parser_version()
+        self.cache = TieredCache(
+            MemoryLRUCache(
+                max_items=settings.PARSE_CACHE_MAX_ITEMS,
+                max_bytes=settings.PARSE_CACHE_MAX_BYTES
+            ),
+            self._open_disk()
+        )
+
+    @staticmethod
+    def _open_disk() -> Optional[DiskCache]:
+        if not settings.PARSE_CACHE_DIR:
+            return None
+        try:
+            return DiskCache(
+                directory=settings.PARSE_CACHE_DIR,
+                max_bytes=settings.PARSE_CACHE_DISK_MAX_BYTES,
+                dumps=_identity,
+                loads=_identity
+            )
+        except OSError as e:
+            print(f"Error opening parsed document disk cache: {e}")
+            return None
+
+    def key(self, kind: str, upload: Upload) -> str:
+        # The detected format picks the extractor, so it is part of the key;
+        # the hash was taken while the upload streamed in
+        return content_key("parsed", self.version, kind, upload.format, upload.sha256)
+
+    def get(self, key: str, schema: Type[BaseModel]) -> Optional[Tuple[str, BaseModel]]:
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data)
+            return entry["text"], schema.model_validate(entry["parsed"])
+        except (ValueError, KeyError) as e:
+            print(f"Ignoring unreadable parsed document cache entry: {e}")
+            return None
+
+    def put(self, key: str, text: str, parsed: BaseModel) -> None:
+        entry = {"text": text, "parsed": parsed.model_dump(mode="json")}
+        self.cache.put(key, json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"parser_version": self.version, **self.cache.stats()}
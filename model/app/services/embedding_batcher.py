@@ -0,0 +1,134 @@
+import asyncio
+import numpy as np
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.services.embedding_service import EmbeddingService
+from app.services.inference_executor import InferenceQueueFull
+
+class EmbeddingBatcher:
+    """
+    Collects texts from concurrent requests and embeds them together.
+
+    Pending texts are flushed when the batching window elapses or the
+    maximum batch size is reached, whichever comes first. Each flush is
+    ordered by approximate token length so sub-batches carry little padding.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.embedding_service = embedding_service
+        self.window = (settings.EMBEDDING_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size or settings.EMBEDDING_MAX_BATCH_SIZE)
+
+        self._pending: List[Tuple[str, Optional[str], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Counters
+        self.batches = 0
+        self.texts = 0
+        self.largest_batch = 0
+
+    async def embed(self, texts: List[str], model_name: Optional[str] = None) -> np.ndarray:
+        if not texts:
+            return np.array([])
+
+        model_name = self.embedding_service.resolve_model_name(model_name)
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, model_name, future))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch_size or self.window <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        vectors = await asyncio.gather(*futures)
+        return np.vstack(vectors)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, Optional[str], asyncio.Future]]) -> None:
+        # One encode call per model, with texts of similar length grouped to cut padding
+        ordered = sorted(batch, key=lambda item: (item[1], len(item[0].split())))
+        groups = []
+        for text, model_name, future in ordered:
+            if not groups or groups[-1][0] != model_name or len(groups[-1][1]) >= self.max_batch_size:
+                groups.append((model_name, []))
+            groups[-1][1].append((text, future))
+
+        # Groups of one model succeed or fall back together: a caller whose texts
+        # span groups must not get vectors of two dimensions
+        for model_name in dict.fromkeys(model_name for model_name, _ in groups):
+            model_groups = [group for name, group in groups if name == model_name]
+            try:
+                results = await self._embed_groups(model_groups, model_name)
+            except Exception as e:
+                for group in model_groups:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+
+            for group, vectors in zip(model_groups, results):
+                for (_, future), vector in zip(group, vectors):
+                    if not future.done():
+                        future.set_result(vector)
+
+                self.batches += 1
+                self.texts += len(group)
+                self.largest_batch = max(self.largest_batch, len(group))
+
+    async def _embed_groups(self, groups: List[List[Tuple[str, asyncio.Future]]], model_name: Optional[str]) -> List[np.ndarray]:
+        try:
+            results = []
+            for group in groups:
+                vectors = await self.embedding_service.get_embeddings([text for text, _ in group], model_name, fallback=False)
+                if len(vectors) != len(group):
+                    raise ValueError(f"Expected {len(group)} embeddings, got {len(vectors)}")
+                results.append(vectors)
+            return results
+        except InferenceQueueFull:
+            raise
+        except Exception as e:
+            if model_name != self.embedding_service.model_name:
+                raise
+            print(f"Error generating embeddings, falling back for the whole batch: {e}")
+            vectors = await self.embedding_service.get_fallback_embeddings([text for group in groups for text, _ in group])
+            results = []
+            position = 0
+            for group in groups:
+                results.append(vectors[position:position + len(group)])
+                position += len(group)
+            return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch
+        }
@@ -1,47 +1,396 @@
+import os
+import re
+import threading
 import numpy as np
-from typing import List, Optional
-from sentence_transformers import SentenceTransformer
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 from app.core.config import settings
+from app.core.startup import startup_report
+from app.core.cache import (
+    DiskCache, MemoryLRUCache, TieredCache, content_key, numpy_dumps, numpy_loads
+)
+from app.services.inference_executor import InferenceExecutor, InferenceQueueFull
+from app.services import vector_ops
+from app.services.vector_store import VectorStore
+from app.services.hashing_embedder import HashingEmbedder
+from app.services.model_registry import ModelRegistry
 import asyncio
 
+@dataclass
+class DocumentEmbedding:
+    """Pooled document vector plus the per-chunk vectors it was built from"""
+    vector: np.ndarray
+    chunk_vectors: np.ndarray
+    chunks: List[str]
+    
+    def chunk_similarities(self, query: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(self.chunk_vectors, axis=1) * np.linalg.norm(query)
+        norms[norms == 0] = 1.0
+        return np.clip(self.chunk_vectors @ query / norms, -1.0, 1.0)
+
 class EmbeddingService:
     def __init__(self):
         self.model_name = settings.MODEL_NAME
-        self.model = None
+        self.registry = ModelRegistry()
+        self._model_loaded = False
+        self._model_available = False
+        self._model_lock = threading.Lock()
+        self.mode = settings.EMBEDDING_MODE
+        self.fast_embedder: Optional[HashingEmbedder] = None
         self.embedding_dimension = settings.EMBEDDING_DIMENSION
-        self._load_model()
+        self.cache = self._build_cache()
+        self.executor = InferenceExecutor()
+        self.vector_stores: Dict[str, VectorStore] = {}
+        self._stores_lock = threading.Lock()
+        if self.mode == "fast":
+            print(f"Fast embedding mode: using {HashingEmbedder.name} instead of {self.model_name}")
+            self._model_loaded = True
+        # The transformer is loaded on first use or by the startup warm-up
+        startup_report.register("embedding_model", self.load_model, enabled=self.mode != "fast")
+    
+    def _build_cache(self) -> Optional[TieredCache]:
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return None
+        
+        memory = MemoryLRUCache(
+            max_items=settings.EMBEDDING_CACHE_MAX_ITEMS,
+            max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES
+        )
+        
+        disk = None
+        if settings.EMBEDDING_CACHE_DIR:
+            try:
+                disk = DiskCache(
+                    directory=settings.EMBEDDING_CACHE_DIR,
+                    max_bytes=settings.EMBEDDING_CACHE_DISK_MAX_BYTES,
+                    dumps=numpy_dumps,
+                    loads=numpy_loads
+                )
+            except OSError as e:
+                print(f"Error opening embedding disk cache: {e}")
+        
+        return TieredCache(memory, disk)
+    
+    @property
+    def model(self) -> Optional[Any]:
+        """The default model, or None in fast mode or when it failed to load"""
+        if not self._model_loaded:
+            self.load_model()
+        if not self._model_available:
+            return None
+        # Reloaded here if the registry evicted it
+        return self.registry.get(self.model_name)
+    
+    @property
+    def model_loaded(self) -> bool:
+        return self._model_loaded
+    
+    def load_model(self) -> Optional[Any]:
+        with self._model_lock:
+            if self._model_loaded:
+                return self.registry.peek(self.model_name)
+            
+            model = None
+            try:
+                with startup_report.track("embedding_model"):
+                    model = self._load_model()
+            except Exception as e:
+                print(f"Error loading embedding model: {e}")
+                print(f"Falling back to {HashingEmbedder.name} embeddings")
+            
+            self._model_available = model is not None
+            self._model_loaded = True
+            return model
     
     def _load_model(self):
-        try:
-            print(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
-            print(f"Model loaded successfully. Embedding dimension: {self.model.get_sentence_embedding_dimension()}")
-        except Exception as e:
-            print(f"Error loading embedding model: {e}")
-            print("Falling back to basic text processing")
-            self.model = None
+        print(f"Loading embedding model: {self.model_name} ({settings.EMBEDDING_BACKEND} backend)")
+        if settings.TORCH_NUM_THREADS > 0:
+            import torch
+            torch.set_num_threads(settings.TORCH_NUM_THREADS)
+        model = self.registry.get(self.model_name)
+        print(f"Model loaded successfully. Embedding dimension: {model.get_sentence_embedding_dimension()}")
+        return model
+    
+    def resolve_model_name(self, model_name: Optional[str] = None) -> str:
+        return model_name or self.model_name
+    
+    async def ensure_model(self, model_name: Optional[str] = None) -> Optional[Any]:
+        """Load the model off the event loop if no request or warm-up has yet"""
+        model_name = self.resolve_model_name(model_name)
+        if model_name == self.model_name:
+            if not self._model_loaded:
+                await asyncio.to_thread(self.load_model)
+            if not self._model_available:
+                return None
+        
+        model = self.registry.peek(model_name)
+        if model is None:
+            model = await asyncio.to_thread(self.registry.get, model_name)
+        return model
     
-    async def get_embeddings(self, texts: List[str]) -> np.ndarray:
+    async def get_embeddings(
+        self,
+        texts: List[str],
+        model_name: Optional[str] = None,
+        fallback: bool = True
+    ) -> np.ndarray:
+        """
+        Vectors for texts; on a model error the default model falls back to
+        hashed embeddings unless fallback is False, when the error is raised
+        """
         if not texts:
             return np.array([])
         
+        model_name = self.resolve_model_name(model_name)
         try:
-            if self.model is None:
-                # Fallback to basic processing
-                return self._basic_embeddings(texts)
+            model = await self.ensure_model(model_name)
+            if model is None:
+                # Fast mode, or fallback when the transformer is unavailable
+                return await self.executor.run(self._basic_embeddings, texts)
             
             # Clean and prepare texts
             cleaned_texts = [self._preprocess_text(text) for text in texts]
             
-            # Generate embeddings
-            embeddings = self.model.encode(cleaned_texts, convert_to_numpy=True)
+            # Generate embeddings off the event loop, reusing cached vectors where possible
+            if settings.EMBEDDING_CHUNKING_ENABLED:
+                documents = await self.executor.run(self._embed_documents, cleaned_texts, model_name, model)
+                return np.vstack([document.vector for document in documents])
+            
+            embeddings = await self.executor.run(self._encode_with_cache, cleaned_texts, model_name, model)
             
             return embeddings
             
+        except InferenceQueueFull:
+            raise
         except Exception as e:
+            if model_name != self.model_name or not fallback:
+                # Vectors from another model would not be comparable with the requested one
+                raise
             print(f"Error generating embeddings: {e}")
             # Fallback to basic processing
-            return self._basic_embeddings(texts)
+            return await self.get_fallback_embeddings(texts)
+    
+    async def get_fallback_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Hashed embeddings, as get_embeddings falls back to"""
+        return await asyncio.to_thread(self._basic_embeddings, texts)
+    
+    async def get_document_embeddings(self, texts: List[str], model_name: Optional[str] = None) -> List[DocumentEmbedding]:
+        if not texts:
+            return []
+        
+        model_name = self.resolve_model_name(model_name)
+        model = await self.ensure_model(model_name)
+        if model is None:
+            vectors = await self.executor.run(self._basic_embeddings, texts)
+            return [
+                DocumentEmbedding(vector=vector, chunk_vectors=vector[np.newaxis, :], chunks=[text])
+                for text, vector in zip(texts, vectors)
+            ]
+        
+        cleaned_texts = [self._preprocess_text(text) for text in texts]
+        return await self.executor.run(self._embed_documents, cleaned_texts, model_name, model)
+    
+    def _embed_documents(
+        self,
+        texts: List[str],
+        model_name: Optional[str] = None,
+        model: Optional[Any] = None
+    ) -> List[DocumentEmbedding]:
+        model = model or self.model
+        
+        # Chunk every document, then encode all chunks in one batched call
+        window = self._chunk_token_limit(model)
+        chunked = self._chunk_documents(texts, window, model_name, model)
+        vectors = self._encode_with_cache([chunk for chunks in chunked for chunk in chunks], model_name, model)
+        
+        documents = []
+        position = 0
+        for chunks in chunked:
+            chunk_vectors = vectors[position:position + len(chunks)]
+            position += len(chunks)
+            documents.append(DocumentEmbedding(
+                vector=self._pool_chunks(chunk_vectors, chunks),
+                chunk_vectors=chunk_vectors,
+                chunks=chunks
+            ))
+        
+        return documents
+    
+    def _chunk_documents(
+        self,
+        texts: List[str],
+        window: int,
+        model_name: Optional[str] = None,
+        model: Optional[Any] = None
+    ) -> List[List[str]]:
+        """Chunks of each text; boundaries are cached by text, so only new texts are tokenized"""
+        keys = [self._chunk_spans_key(text, window, model_name, model) for text in texts] if self.cache is not None else []
+        spans: List[Optional[np.ndarray]] = [self.cache.get(key) for key in keys] if keys else [None] * len(texts)
+        
+        missing = [i for i, found in enumerate(spans) if found is None]
+        if missing:
+            offsets = self._token_offsets([texts[i] for i in missing], model)
+            for i, text_offsets in zip(missing, offsets):
+                spans[i] = np.array(self._chunk_spans(texts[i], text_offsets, window), dtype=np.int64).reshape(-1, 2)
+                if keys:
+                    self.cache.put(keys[i], spans[i])
+        
+        return [[text[start:end] for start, end in text_spans.tolist()] for text, text_spans in zip(texts, spans)]
+    
+    def _chunk_spans_key(self, text: str, window: int, model_name: Optional[str] = None, model: Optional[Any] = None) -> str:
+        # Boundaries depend on the tokenizer (the model) and on the chunking settings
+        return content_key(
+            "chunk-spans",
+            self._cache_key(text, model_name, model),
+            str(window),
+            str(settings.EMBEDDING_CHUNK_OVERLAP),
+            str(settings.EMBEDDING_MAX_CHUNKS)
+        )
+    
+    def _token_offsets(self, texts: List[str], model: Optional[Any] = None) -> List[List[Tuple[int, int]]]:
+        tokenizer = getattr(model or self.model, 'tokenizer', None)
+        if tokenizer is not None:
+            try:
+                encoding = tokenizer(
+                    texts,
+                    add_special_tokens=False,
+                    return_offsets_mapping=True,
+                    truncation=False
+                )
+                return [list(offsets) for offsets in encoding['offset_mapping']]
+            except Exception as e:
+                print(f"Error tokenizing for chunking, splitting on whitespace: {e}")
+        
+        # Whitespace words as an approximation of tokens
+        return [[(m.start(), m.end()) for m in re.finditer(r'\S+', text)] for text in texts]
+    
+    def _chunk_token_limit(self, model: Optional[Any] = None) -> int:
+        # Leave room for the special tokens the model adds around each chunk
+        max_seq_length = getattr(model or self.model, 'max_seq_length', None) or 256
+        return max(16, max_seq_length - 2)
+    
+    def _chunk_spans(self, text: str, offsets: List[Tuple[int, int]], window: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Character span of each chunk of at most window tokens"""
+        window = window or self._chunk_token_limit()
+        if len(offsets) <= window:
+            return [(0, len(text))]
+        
+        stride = max(1, window - min(settings.EMBEDDING_CHUNK_OVERLAP, window // 2))
+        spans = []
+        for start in range(0, len(offsets), stride):
+            end = min(start + window, len(offsets))
+            spans.append((offsets[start][0], offsets[end - 1][1]))
+            if end == len(offsets) or len(spans) >= settings.EMBEDDING_MAX_CHUNKS:
+                break
+        
+        return spans
+    
+    def _pool_chunks(self, chunk_vectors: np.ndarray, chunks: List[str]) -> np.ndarray:
+        if len(chunks) == 1:
+            return chunk_vectors[0]
+        
+        # Length-weighted mean so a short trailing chunk does not dominate
+        weights = np.array([max(1, len(chunk)) for chunk in chunks], dtype=np.float32)
+        return (chunk_vectors * weights[:, np.newaxis]).sum(axis=0) / weights.sum()
+    
+    def _cache_key(self, text: str, model_name: Optional[str] = None, model: Optional[Any] = None) -> str:
+        # Tagged with the producing model; backends other than the reference
+        # produce slightly different vectors, so they are tagged too
+        model_name = self.resolve_model_name(model_name)
+        backend = getattr(model, 'name', 'torch')
+        if backend != "torch":
+            return content_key(model_name, backend, text)
+        return content_key(model_name, text)
+    
+    def _encode_with_cache(
+        self,
+        texts: List[str],
+        model_name: Optional[str] = None,
+        model: Optional[Any] = None
+    ) -> np.ndarray:
+        model = model or self.model
+        if self.cache is None:
+            return model.encode(texts)
+        
+        keys = [self._cache_key(text, model_name, model) for text in texts]
+        results: List[Optional[np.ndarray]] = [self.cache.get(key) for key in keys]
+        
+        # Encode each distinct missing text once
+        pending: dict = {}
+        for i, vector in enumerate(results):
+            if vector is None:
+                pending.setdefault(keys[i], []).append(i)
+        
+        if pending:
+            miss_texts = [texts[indices[0]] for indices in pending.values()]
+            encoded = model.encode(miss_texts)
+            for (key, indices), vector in zip(pending.items(), encoded):
+                self.cache.put(key, vector)
+                for i in indices:
+                    results[i] = vector
+        
+        return np.vstack(results)
+    
+    def get_vector_store(self, name: str, model_name: Optional[str] = None) -> Optional[VectorStore]:
+        """
+        Persistent store for one kind of document ("resumes", "jds"), opened on first use.
+        Other models than the default get their own stores under models/<model>/.
+        """
+        model_name = self.resolve_model_name(model_name)
+        if not settings.VECTOR_STORE_ENABLED:
+            return None
+        
+        if model_name == self.model_name:
+            if self.model is None:
+                return None
+            key = name
+            directory = os.path.join(settings.VECTOR_STORE_DIR, name)
+        else:
+            key = f"{name}@{model_name}"
+            safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name.strip('/'))
+            directory = os.path.join(settings.VECTOR_STORE_DIR, "models", safe_name, name)
+        
+        with self._stores_lock:
+            store = self.vector_stores.get(key)
+            if store is None:
+                try:
+                    store = VectorStore(
+                        directory=directory,
+                        dimension=self.registry.get(model_name).get_sentence_embedding_dimension(),
+                        dtype=settings.VECTOR_STORE_DTYPE,
+                        compact_ratio=settings.VECTOR_STORE_COMPACT_RATIO,
+                        model=model_name
+                    )
+                except (OSError, ValueError) as e:
+                    print(f"Error opening vector store '{key}': {e}")
+                    return None
+                self.vector_stores[key] = store
+            return store
+    
+    def store_embedding(
+        self,
+        name: str,
+        vector_id: str,
+        vector: np.ndarray,
+        model_name: Optional[str] = None
+    ) -> bool:
+        store = self.get_vector_store(name, model_name)
+        if store is None:
+            return False
+        
+        # Ids are content hashes, so an existing id already holds this vector
+        if vector_id in store:
+            return True
+        
+        try:
+            store.add(vector_id, vector)
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Error storing embedding in '{name}': {e}")
+            return False
+    
+    def get_cache_stats(self) -> Optional[dict]:
+        return self.cache.stats() if self.cache is not None else None
     
     async def get_single_embedding(self, text: str) -> np.ndarray:
         embeddings = await self.get_embeddings([text])
@@ -70,20 +419,49 @@ class EmbeddingService:
             if len(embeddings) < 2:
                 return [0.0] * len(candidate_texts)
             
-            query_embedding = embeddings[0]
-            candidate_embeddings = embeddings[1:]
+            similarities = self.similarity_scores(embeddings[0], embeddings[1:])
             
-            similarities = []
-            for candidate_embedding in candidate_embeddings:
-                similarity = self._cosine_similarity(query_embedding, candidate_embedding)
-                similarities.append(float(similarity))
-            
-            return similarities
+            return similarities.tolist()
             
         except Exception as e:
             print(f"Error computing similarities: {e}")
             return [0.0] * len(candidate_texts)
     
+    @staticmethod
+    def normalize_embeddings(embeddings: np.ndarray, dtype=np.float32) -> np.ndarray:
+        """Unit-length copies of embeddings, stored as float32 or float16"""
+        return vector_ops.normalize(embeddings, dtype=dtype)
+    
+    def similarity_scores(
+        self,
+        query_embeddings: np.ndarray,
+        candidate_embeddings: np.ndarray,
+        normalized: bool = False,
+        dtype=np.float32
+    ) -> np.ndarray:
+        """
+        Cosine similarity of one query (N,) or M queries (M, N) against N candidates
+        """
+        return vector_ops.similarity_matrix(
+            query_embeddings, candidate_embeddings, normalized=normalized, dtype=dtype
+        )
+    
+    def top_k_similar(
+        self,
+        query_embeddings: np.ndarray,
+        candidate_embeddings: np.ndarray,
+        k: int,
+        normalized: bool = False,
+        dtype=np.float32
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Indices and scores of the k most similar candidates per query, best first
+        """
+        scores = self.similarity_scores(
+            query_embeddings, candidate_embeddings, normalized=normalized, dtype=dtype
+        )
+        return vector_ops.top_k(scores, k)
+    
     def _preprocess_text(self, text: str) -> str:
         if not text:
             return ""
@@ -94,9 +472,10 @@ class EmbeddingService:
         # Remove extra whitespace
         text = ' '.join(text.split())
         
-        # Truncate if too long (sentence-transformers have limits)
+        # Chunking covers the whole document; otherwise truncate
+        # (sentence-transformers have limits)
         max_length = 512  # Conservative limit
-        if len(text) > max_length:
+        if not settings.EMBEDDING_CHUNKING_ENABLED and len(text) > max_length:
             text = text[:max_length]
         
         return text
@@ -122,48 +501,59 @@ class EmbeddingService:
             print(f"Error computing cosine similarity: {e}")
             return 0.0
     
+    def _get_fast_embedder(self) -> HashingEmbedder:
+        if self.fast_embedder is None:
+            self.fast_embedder = HashingEmbedder()
+        return self.fast_embedder
+    
     def _basic_embeddings(self, texts: List[str]) -> np.ndarray:
         try:
-            embeddings = []
-            for text in texts:
-                # Create a simple feature vector based on text characteristics
-                text_lower = text.lower()
-                
-                # Basic features
-                length = len(text)
-                word_count = len(text.split())
-                char_count = len(text.replace(' ', ''))
-                
-                # Simple keyword presence features
-                tech_keywords = ['python', 'javascript', 'java', 'react', 'node', 'sql', 'aws']
-                keyword_features = [1.0 if keyword in text_lower else 0.0 for keyword in tech_keywords]
-                
-                # Combine features
-                features = [length, word_count, char_count] + keyword_features
-                
-                # Normalize features
-                features = np.array(features, dtype=np.float32)
-                features = features / (np.linalg.norm(features) + 1e-8)
-                
-                embeddings.append(features)
-            
-            return np.array(embeddings)
+            # Hashed n-gram TF-IDF for the whole batch in one vectorised pass
+            return self._get_fast_embedder().embed([' '.join(text.split()) for text in texts])
             
         except Exception as e:
             print(f"Error in basic embeddings: {e}")
             # Return zero embeddings as last resort
-            return np.zeros((len(texts), 10), dtype=np.float32)
+            return np.zeros((len(texts), 2 * settings.FAST_EMBEDDING_FEATURES), dtype=np.float32)
+    
+    async def prescreen(
+        self,
+        query_text: str,
+        candidate_texts: List[str],
+        top_k: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cheap bulk ranking of candidates with sparse hashed TF-IDF vectors, best first
+        """
+        if not candidate_texts:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        
+        return await self.executor.run(
+            self._get_fast_embedder().prescreen, query_text, candidate_texts, top_k
+        )
     
     def get_model_info(self) -> dict:
-        if self.model is None:
+        if not self._model_loaded:
+            return {
+                "model_name": self.model_name,
+                "embedding_dimension": self.embedding_dimension,
+                "status": startup_report.components["embedding_model"]["status"]
+            }
+        
+        model = self.registry.peek(self.model_name) if self._model_available else None
+        if not self._model_available:
             return {
-                "model_name": "none",
-                "embedding_dimension": 0,
-                "status": "not_loaded"
+                "model_name": HashingEmbedder.name,
+                "embedding_dimension": 2 * settings.FAST_EMBEDDING_FEATURES,
+                "status": "fast" if self.mode == "fast" else "fallback"
             }
         
         return {
             "model_name": self.model_name,
-            "embedding_dimension": self.model.get_sentence_embedding_dimension(),
-            "status": "loaded"
+            "embedding_dimension": model.get_sentence_embedding_dimension() if model is not None else self.embedding_dimension,
+            "status": "loaded" if model is not None else "evicted",
+            "backend": getattr(model, 'name', None),
+            "registry": self.registry.get_stats(),
+            "cache": self.get_cache_stats(),
+            "vector_stores": {name: store.get_stats() for name, store in self.vector_stores.items()}
         }
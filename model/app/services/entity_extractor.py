@@ -0,0 +1,312 @@
+import argparse
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.services.section_index import SectionIndex
+from app.services.text_scanner import Marker, ScanResult
+
+# Pipeline components NER does not read. The en_core_web_* "ner" embeds its
+# own tokens, so tagging, parsing and lemmatisation are pure overhead here.
+NER_EXCLUDE = ["tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer", "textcat"]
+
+# Job titles are not a spaCy entity type; a title is the phrase ending in one of these words
+TITLE_WORDS = [
+    "engineer", "developer", "programmer", "architect", "manager", "lead", "analyst", "scientist",
+    "designer", "consultant", "intern", "director", "administrator", "specialist", "officer",
+    "coordinator", "associate", "head", "vp", "cto", "ceo", "founder", "researcher", "assistant",
+    "technician", "tester", "trainee",
+]
+TITLE_RE = re.compile(r"\b(?:" + "|".join(TITLE_WORDS) + r")s?\b", re.IGNORECASE)
+
+# Words that end a title phrase when walking left from the title word
+_TITLE_STOP = {
+    "a", "an", "the", "as", "at", "in", "for", "with", "was", "worked", "working", "is", "to",
+    "from", "on", "by", "and", "role", "position",
+}
+_MAX_TITLE_WORDS = 6
+
+# Field separators that survive text cleaning
+_FIELD_SPLIT_RE = re.compile(r"\s*[,@•:(/)]\s*|\s+-\s+|\s+at\s+", re.IGNORECASE)
+
+# Lines before a date range that still belong to its entry ("Acme Corp" over "Engineer 2019 - 2021")
+ENTRY_LINES_BEFORE = 2
+
+Span = Tuple[int, int]
+
+def load_pipeline(model: Optional[str] = None):
+    """spaCy pipeline with only the components NER needs"""
+    import spacy
+
+    nlp = spacy.load(model or settings.SPACY_MODEL, exclude=NER_EXCLUDE)
+    # A shared tok2vec only matters when ner listens to it
+    if "tok2vec" in nlp.pipe_names and "ner" not in getattr(nlp.get_pipe("tok2vec"), "listening_components", []):
+        nlp.disable_pipe("tok2vec")
+    return nlp
+
+@dataclass
+class Entity:
+    label: str
+    start: int  # Character offsets in the document
+    end: int
+    text: str
+
+@dataclass
+class DocumentEntities:
+    name: Optional[str] = None
+    # (company, title) per experience date range, keyed by the range's start offset
+    jobs: Dict[int, Tuple[str, str]] = field(default_factory=dict)
+    entities: List[Entity] = field(default_factory=list)
+
+class EntityExtractor:
+    """
+    Names, employers and job titles for a batch of resumes.
+
+    Only the header and experience sections go through spaCy, and all of
+    a batch's segments go through one nlp.pipe call, so the model runs on
+    a few hundred characters per document in large batches instead of on
+    every document whole. Titles come from the lines of each experience
+    entry; employers are ORG entities on those lines, or capitalised
+    fields next to the title when no model is loaded.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_chars: Optional[int] = None):
+        self.batch_size = batch_size or settings.NER_BATCH_SIZE
+        self.max_chars = max_chars or settings.NER_MAX_CHARS
+
+    def segments(self, text: str, sections: SectionIndex) -> List[Span]:
+        """Header and experience spans, capped at max_chars per document"""
+        spans: List[Span] = []
+        remaining = self.max_chars
+        for start, end in sections.spans("header") + sections.spans("experience", fallback="all"):
+            if remaining <= 0:
+                break
+            if spans and start < spans[-1][1]:
+                start = spans[-1][1]
+            end = min(end, start + remaining)
+            if end > start:
+                spans.append((start, end))
+                remaining -= end - start
+        return spans
+
+    def extract(self, nlp, documents: List[Tuple[str, ScanResult, SectionIndex]]) -> List[DocumentEntities]:
+        results = [DocumentEntities() for _ in documents]
+        if nlp is not None and settings.NER_ENABLED:
+            for index, entity in self._run_ner(nlp, documents):
+                results[index].entities.append(entity)
+
+        for result, (text, markers, sections) in zip(results, documents):
+            result.name = self._name(text, sections, result.entities)
+            result.jobs = self._jobs(text, markers, sections, result.entities)
+        return results
+
+    def _run_ner(self, nlp, documents: List[Tuple[str, ScanResult, SectionIndex]]) -> Iterator[Tuple[int, Entity]]:
+        def segments():
+            for index, (text, _, sections) in enumerate(documents):
+                for start, end in self.segments(text, sections):
+                    yield text[start:end], (index, start)
+
+        for doc, (index, offset) in nlp.pipe(segments(), as_tuples=True, batch_size=self.batch_size):
+            for ent in doc.ents:
+                if ent.label_ in ("PERSON", "ORG"):
+                    yield index, Entity(ent.label_, offset + ent.start_char, offset + ent.end_char, ent.text.strip())
+
+    def _name(self, text: str, sections: SectionIndex, entities: List[Entity]) -> Optional[str]:
+        # A PERSON on one of the header's first lines
+        header = sections.spans("header")
+        if not header:
+            return None
+        header_start, header_end = header[0]
+        limit = header_start
+        for _ in range(5):
+            newline = text.find("\n", limit, header_end)
+            limit = header_end if newline == -1 else newline + 1
+        for entity in entities:
+            if entity.label == "PERSON" and header_start <= entity.start < limit and "\n" not in entity.text:
+                if 1 < len(entity.text.split()) <= 4:
+                    return entity.text
+        return None
+
+    def _jobs(
+        self,
+        text: str,
+        markers: ScanResult,
+        sections: SectionIndex,
+        entities: List[Entity]
+    ) -> Dict[int, Tuple[str, str]]:
+        jobs: Dict[int, Tuple[str, str]] = {}
+        spans = sections.spans("experience")
+        organisations = [entity for entity in entities if entity.label == "ORG"]
+        previous_end = 0
+        for date in markers.within(spans).all("date_range"):
+            span_start, span_end = next(span for span in spans if span[0] <= date.start < span[1])
+            lines = self._entry_lines(text, date, max(span_start, previous_end), span_end)
+            previous_end = lines[-1][1]
+
+            title, title_span = self._title(text, lines, markers)
+            company = self._company(text, lines, markers, organisations, title_span)
+            jobs[date.start] = (company, title)
+        return jobs
+
+    def _entry_lines(self, text: str, date: Marker, floor: int, ceiling: int) -> List[Span]:
+        """The date's line, up to ENTRY_LINES_BEFORE lines above it and the line below when it is not a bullet"""
+        start = max(floor, text.rfind("\n", floor, date.start) + 1)
+        end = text.find("\n", date.end, ceiling)
+        lines = [(start, ceiling if end == -1 else end)]
+
+        for _ in range(ENTRY_LINES_BEFORE):
+            if start <= floor + 1 or text[start - 2] == "\n":
+                break  # Top of the entry or a paragraph break
+            line_start = max(floor, text.rfind("\n", floor, start - 1) + 1)
+            line = text[line_start:start - 1].strip()
+            if not line or line.startswith(("•", "-", "*")):
+                break
+            lines.insert(0, (line_start, start - 1))
+            start = line_start
+
+        if end != -1 and end + 1 < ceiling and text[end + 1] != "\n":
+            next_end = text.find("\n", end + 1, ceiling)
+            next_end = ceiling if next_end == -1 else next_end
+            line = text[end + 1:next_end].strip()
+            if line and not line.startswith(("•", "-", "*")) and TITLE_RE.search(line) and len(line) <= 80:
+                lines.append((end + 1, next_end))
+        return lines
+
+    def _fields(self, text: str, start: int, end: int, markers: ScanResult, holes: List[Span]) -> List[Span]:
+        """A line's fields: split on separators, with dates and the given spans cut out"""
+        cuts = sorted(
+            [(marker.start, marker.end) for marker in markers.within([(start, end)]).markers if marker.tag in ("date_range", "year", "email", "phone")]
+            + [(hole_start, hole_end) for hole_start, hole_end in holes if hole_start < end and hole_end > start]
+        )
+        pieces: List[Span] = []
+        position = start
+        for cut_start, cut_end in cuts + [(end, end)]:
+            if cut_start > position:
+                pieces.append((position, cut_start))
+            position = max(position, cut_end)
+
+        fields: List[Span] = []
+        for piece_start, piece_end in pieces:
+            position = piece_start
+            for match in _FIELD_SPLIT_RE.finditer(text, piece_start, piece_end):
+                fields.append((position, match.start()))
+                position = match.end()
+            fields.append((position, piece_end))
+        return [(field_start, field_end) for field_start, field_end in fields if text[field_start:field_end].strip()]
+
+    def _title(self, text: str, lines: List[Span], markers: ScanResult) -> Tuple[str, Optional[Span]]:
+        for line_start, line_end in lines:
+            for field_start, field_end in self._fields(text, line_start, line_end, markers, []):
+                words = [(match.start(), match.end()) for match in re.finditer(r"\S+", text[field_start:field_end])]
+                nouns = [index for index, (start, end) in enumerate(words) if TITLE_RE.fullmatch(text[field_start + start:field_start + end].strip(".,"))]
+                if not nouns:
+                    continue
+                # The phrase ending in the last title word of its run ("Senior Software Engineer")
+                last = nouns[0]
+                while last + 1 < len(words) and last + 1 in nouns:
+                    last += 1
+                first = last
+                while first > 0 and last - first + 1 < _MAX_TITLE_WORDS:
+                    word = text[field_start + words[first - 1][0]:field_start + words[first - 1][1]]
+                    if word.lower() in _TITLE_STOP or any(char.isdigit() for char in word):
+                        break
+                    first -= 1
+                title_start = field_start + words[first][0]
+                title_end = field_start + words[last][1]
+                return text[title_start:title_end].strip(".,"), (title_start, title_end)
+        return "", None
+
+    def _company(
+        self,
+        text: str,
+        lines: List[Span],
+        markers: ScanResult,
+        organisations: List[Entity],
+        title_span: Optional[Span]
+    ) -> str:
+        entry_start, entry_end = lines[0][0], lines[-1][1]
+        candidates = [entity for entity in organisations if entry_start <= entity.start < entry_end]
+        if title_span is not None:
+            # The model sometimes tags "Software Engineer" as an ORG
+            candidates = [entity for entity in candidates if entity.end <= title_span[0] or entity.start >= title_span[1]]
+        if candidates:
+            return candidates[0].text
+
+        # Without a model: the capitalised field after the title, or a line of its own
+        holes = [title_span] if title_span is not None else []
+        for line_start, line_end in lines:
+            for field_start, field_end in self._fields(text, line_start, line_end, markers, holes):
+                value = text[field_start:field_end].strip(" .,-")
+                if not value or TITLE_RE.search(value) or any(char.isdigit() for char in value):
+                    continue
+                if value[0].isupper() and len(value.split()) <= 6:
+                    return value
+        return ""
+
+def _sample_resume(index: int) -> str:
+    return (
+        f"Jordan Example {index}\njordan{index}@example.com | +1 555 010 {1000 + index}\n\n"
+        "EXPERIENCE\n"
+        "Senior Software Engineer, Globex Corporation 2019 - present\n"
+        "• Led the billing platform rebuild in Python and Go\n"
+        "Initech\nData Analyst 2015 - 2019\n"
+        "• Built reporting pipelines on PostgreSQL\n\n"
+        "EDUCATION\nB.S. Computer Science, State University 2015\n"
+        "SKILLS\nPython, Go, SQL, Kubernetes\n"
+    )
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Extract names, employers and titles from resumes, one by one and batched")
+    parser.add_argument("paths", nargs="*", help="Text files; synthetic resumes when omitted")
+    parser.add_argument("--documents", type=int, default=64, help="Synthetic resumes to generate")
+    parser.add_argument("--model", default=settings.SPACY_MODEL, help="spaCy pipeline; 'none' for the rules alone")
+    args = parser.parse_args(argv)
+
+    from app.services import text_scanner
+    from app.services.parser_service import ParserService
+
+    if args.paths:
+        texts = []
+        for path in args.paths:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                texts.append(f.read())
+    else:
+        texts = [_sample_resume(index) for index in range(args.documents)]
+
+    nlp = None
+    if args.model != "none":
+        started = time.perf_counter()
+        nlp = load_pipeline(args.model)
+        print(f"Loaded {args.model} with {nlp.pipe_names} in {(time.perf_counter() - started) * 1000.0:.0f}ms")
+
+    cleaner = ParserService(use_pool=False, use_cache=False)
+    documents = []
+    for text in texts:
+        text = cleaner._clean_text(text)
+        documents.append((text, text_scanner.scan(text), SectionIndex(text, "resume")))
+
+    extractor = EntityExtractor()
+    started = time.perf_counter()
+    for document in documents:
+        extractor.extract(nlp, [document])
+    single_ms = (time.perf_counter() - started) * 1000.0
+    started = time.perf_counter()
+    results = extractor.extract(nlp, documents)
+    batch_ms = (time.perf_counter() - started) * 1000.0
+
+    print(f"{len(documents)} documents: one by one {single_ms:.1f}ms, batched {batch_ms:.1f}ms")
+    if nlp is not None:
+        # What the unpruned pipeline costs on whole documents, for comparison
+        import spacy
+
+        full = spacy.load(args.model)
+        started = time.perf_counter()
+        for text, _, _ in documents:
+            full(text)
+        print(f"Full pipeline {full.pipe_names} on whole documents: {(time.perf_counter() - started) * 1000.0:.1f}ms")
+    for (text, _, _), result in list(zip(documents, results))[:3]:
+        print({"name": result.name, "jobs": list(result.jobs.values())})
+
+if __name__ == "__main__":
+    main()
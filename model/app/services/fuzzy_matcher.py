@@ -0,0 +1,339 @@
+import argparse
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from fuzzywuzzy import fuzz
+from Levenshtein import ratio
+from app.core.config import settings
+
+def _score(keyword: str, window: str) -> int:
+    # fuzzywuzzy's scale: Levenshtein.ratio as a rounded percentage
+    return int(round(100 * ratio(keyword, window)))
+
+def _pair_buckets(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    # ASCII pairs get a bucket each; anything wider shares the last one
+    return (np.minimum(first, 127) * 128 + np.minimum(second, 127)).astype(np.int64)
+
+def max_indels(length: int, threshold: int) -> int:
+    """
+    Largest insert/delete count that keeps a window of the keyword's
+    length above threshold; equal-length strings differ by an even count
+    """
+    distance = 0
+    while distance + 2 <= 2 * length and int(round(100 * (2 * length - distance - 2) / (2 * length))) > threshold:
+        distance += 2
+    return distance
+
+class FuzzyIndex:
+    """
+    Character n-gram index of one document, for resolving a batch of
+    keywords against it with the same results as fuzz.partial_ratio.
+
+    A keyword matches when it occurs in the text or partial_ratio scores
+    it above the threshold. partial_ratio only scores windows aligned to
+    its matching blocks, each a full window of the keyword's length or a
+    shorter one at the end of the text. A full window within d
+    inserts/deletes of a keyword of length n keeps at least
+    n - q + 1 - d(2q - 1)/2 of the keyword's q-grams, each at most d/2
+    off its place, so only windows with that many nearby q-grams can
+    score high enough. The index scores those and the end windows; a
+    keyword none of them passes cannot match, and the rest are confirmed
+    with partial_ratio itself. The q-gram lookup for the whole batch is
+    one vectorised pass over the text.
+
+    Below FUZZY_INDEX_MIN_CHARS building the index costs more than it
+    saves, and every keyword goes straight to partial_ratio.
+    """
+
+    def __init__(self, text: str, threshold: Optional[int] = None):
+        self.text = text.lower()
+        self.threshold = settings.FUZZY_MATCH_THRESHOLD if threshold is None else threshold
+        self._codes: Optional[np.ndarray] = None
+        self._pairs: Optional[np.ndarray] = None
+        self._keys: Dict[int, np.ndarray] = {}
+        self.windows_scored = 0
+        self.confirmed = 0
+
+    def _gram_keys(self, codes: np.ndarray, q: int) -> np.ndarray:
+        # Code points fit in 21 bits, so up to three pack into one integer
+        keys = codes[:len(codes) - q + 1].copy()
+        for offset in range(1, q):
+            keys = (keys << np.uint64(21)) | codes[offset:len(codes) - q + 1 + offset]
+        return keys
+
+    def _text_codes(self) -> np.ndarray:
+        if self._codes is None:
+            self._codes = np.frombuffer(self.text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        return self._codes
+
+    def _text_keys(self, q: int) -> np.ndarray:
+        """q-gram key at every text position"""
+        if q not in self._keys:
+            self._keys[q] = self._gram_keys(self._text_codes(), q)
+        return self._keys[q]
+
+    def _text_pairs(self) -> np.ndarray:
+        """Bucket of the character pair at every text position"""
+        if self._pairs is None:
+            codes = self._text_codes()
+            self._pairs = _pair_buckets(codes[:-1], codes[1:])
+        return self._pairs
+
+    def contains(self, keyword: str) -> bool:
+        return self.match([keyword])[keyword.lower()]
+
+    def match(self, keywords: Iterable[str]) -> Dict[str, bool]:
+        """Lowercased keyword -> whether it matches, for a batch of keywords"""
+        results: Dict[str, bool] = {}
+        fuzzy: List[str] = []
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if keyword in results:
+                continue
+            results[keyword] = keyword in self.text
+            if not results[keyword]:
+                fuzzy.append(keyword)
+
+        if len(self.text) < settings.FUZZY_INDEX_MIN_CHARS:
+            for keyword in fuzzy:
+                results[keyword] = self._partial_ratio(keyword)
+            return results
+
+        # The index only rules keywords out; partial_ratio decides the ones it cannot
+        for keyword, starts in self._candidates(fuzzy).items():
+            if self._scan(keyword, starts) or self._scan_tail(keyword):
+                results[keyword] = self._partial_ratio(keyword)
+        return results
+
+    def _partial_ratio(self, keyword: str) -> bool:
+        self.confirmed += 1
+        return fuzz.partial_ratio(keyword, self.text) > self.threshold
+
+    def _candidates(self, keywords: List[str]) -> Dict[str, Iterable[int]]:
+        """Window starts worth scoring per keyword, best supported first"""
+        candidates: Dict[str, Iterable[int]] = {}
+        by_q: Dict[int, List[Tuple[str, int, int]]] = {2: [], 3: []}
+        for keyword in keywords:
+            length = len(keyword)
+            if length == 0 or length >= len(self.text):
+                # partial_ratio compares the other way round here; nothing to index
+                candidates[keyword] = [None]
+                continue
+
+            distance = max_indels(length, self.threshold)
+            if distance == 0:
+                candidates[keyword] = []  # Only an exact occurrence would score high enough in a full window
+                continue
+            # Trigrams are rarer, so fewer text positions to look at, where the bound leaves any to count
+            for q in (3, 2):
+                needed = length - q + 1 - distance * (2 * q - 1) // 2
+                if needed >= 1:
+                    by_q[q].append((keyword, needed, distance // 2))
+                    break
+            else:
+                candidates[keyword] = range(len(self.text) - length + 1)
+
+        passed: Dict[str, List[Tuple[np.ndarray, np.ndarray]]] = {}
+        for q, entries in by_q.items():
+            if entries:
+                for keyword, found in self._filter(q, entries).items():
+                    passed.setdefault(keyword, []).append(found)
+
+        for keyword, found in passed.items():
+            starts, votes = found[0]
+            for other_starts, other_votes in found[1:]:
+                starts, here, there = np.intersect1d(starts, other_starts, assume_unique=True, return_indices=True)
+                votes = votes[here] + other_votes[there]
+            # Best supported windows first, so a match is usually the first one scored
+            candidates[keyword] = starts[np.argsort(-votes, kind="stable")].tolist()
+        return candidates
+
+    def _filter(self, q: int, entries: List[Tuple[str, int, int]]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Window starts (ascending) passing the q-gram bound per keyword, with their q-gram votes"""
+        # Every q-gram of every keyword, with its keyword and offset
+        gram_keys, gram_owner, gram_offset = [], [], []
+        for owner, (keyword, _, _) in enumerate(entries):
+            codes = np.frombuffer(keyword.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+            keys = self._gram_keys(codes, q)
+            gram_keys.append(keys)
+            gram_owner.append(np.full(len(keys), owner, dtype=np.int64))
+            gram_offset.append(np.arange(len(keys), dtype=np.int64))
+        gram_keys = np.concatenate(gram_keys)
+        gram_owner = np.concatenate(gram_owner)
+        gram_offset = np.concatenate(gram_offset)
+
+        # Text positions holding any keyword gram, found by looking each text gram up among the batch's grams
+        grams, gram_ids = np.unique(gram_keys, return_inverse=True)
+        by_gram = np.argsort(gram_ids, kind="stable")
+        per_gram = np.bincount(gram_ids, minlength=len(grams))
+        gram_firsts = np.concatenate(([0], np.cumsum(per_gram)[:-1]))
+        # Most positions start with a character pair no gram starts with; a small table rules those out first
+        leads = np.zeros(128 * 128, dtype=bool)
+        leads[_pair_buckets(grams >> np.uint64(21 * (q - 1)), (grams >> np.uint64(21 * (q - 2))) & np.uint64(0x1FFFFF))] = True
+        text_keys = self._text_keys(q)
+        positions = np.flatnonzero(leads[self._text_pairs()[:len(text_keys)]])
+        slots = np.minimum(np.searchsorted(grams, text_keys[positions]), len(grams) - 1)
+        found = grams[slots] == text_keys[positions]
+        positions, slots = positions[found], slots[found]
+
+        # Each position paired with every keyword gram it holds
+        counts = per_gram[slots]
+        total = int(counts.sum())
+        firsts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        occurrences = by_gram[np.repeat(gram_firsts[slots] - firsts, counts) + np.arange(total)]
+        positions = np.repeat(positions, counts)
+
+        # The window start each occurrence points at, banded by keyword so one sort groups them
+        longest = max(len(keyword) for keyword, _, _ in entries)
+        band = len(self.text) + 2 * longest + 2
+        diagonals = np.sort(gram_owner[occurrences] * band + positions + longest - gram_offset[occurrences])
+
+        needed = np.array([needed for _, needed, _ in entries], dtype=np.int64)
+        shift = np.array([shift for _, _, shift in entries], dtype=np.int64)
+        lengths = np.array([len(keyword) for keyword, _, _ in entries], dtype=np.int64)
+        owners = diagonals // band
+        votes = np.searchsorted(diagonals, diagonals + 2 * shift[owners], side="right") - np.arange(len(diagonals))
+        anchors = diagonals[votes >= needed[owners]]
+
+        # A qualifying window start lies within shift of an anchor; recount each exactly
+        spread = np.arange(-shift.max(), shift.max() + 1)
+        starts = np.unique((anchors[:, None] + spread).ravel())
+        owners = starts // band
+        window_starts = starts % band - longest
+        inside = (window_starts >= 0) & (window_starts <= len(self.text) - lengths[owners])
+        starts, owners, window_starts = starts[inside], owners[inside], window_starts[inside]
+        votes = (
+            np.searchsorted(diagonals, starts + shift[owners], side="right")
+            - np.searchsorted(diagonals, starts - shift[owners], side="left")
+        )
+        keep = votes >= needed[owners]
+        owners, window_starts, votes = owners[keep], window_starts[keep], votes[keep]
+
+        # Window starts come out sorted per keyword
+        bounds = np.searchsorted(owners, np.arange(len(entries) + 1))
+        return {
+            keyword: (window_starts[bounds[owner]:bounds[owner + 1]], votes[bounds[owner]:bounds[owner + 1]])
+            for owner, (keyword, _, _) in enumerate(entries)
+        }
+
+    def _scan(self, keyword: str, starts: Iterable[Optional[int]]) -> bool:
+        length = len(keyword)
+        for start in starts:
+            if start is None:
+                return True  # Left to partial_ratio
+            self.windows_scored += 1
+            if _score(keyword, self.text[start:start + length]) > self.threshold:
+                return True
+        return False
+
+    def _scan_tail(self, keyword: str) -> bool:
+        """Windows cut short by the end of the text, which the q-gram bound does not cover"""
+        for start in range(max(0, len(self.text) - len(keyword) + 1), len(self.text)):
+            self.windows_scored += 1
+            if _score(keyword, self.text[start:]) > self.threshold:
+                return True
+        return False
+
+_VOCABULARY = (
+    "led built designed migrated improved reduced scaled owned shipped mentored automated deployed "
+    "services platform pipeline billing payments search analytics dashboard api apis backend frontend "
+    "python django flask fastapi java spring kotlin go rust javascript typescript react redux node.js "
+    "postgresql mysql mongodb redis kafka rabbitmq elasticsearch docker kubernetes terraform aws gcp azure "
+    "ci/cd jenkins github actions latency throughput reliability on-call incidents customers team "
+    "engineers product roadmap quarterly 40% 3x million requests per second across regions with and the of"
+).split()
+
+_KEYWORDS = [
+    "Python", "Kubernetes", "Terraform", "React", "GraphQL", "Machine Learning", "JavaScript", "Kafka",
+    "Postgres SQL", "TypeScript", "AWS Lambda", "Spring Boot", "Node", "Microservices", "Elastic Search",
+    "CI/CD", "Golang", "Scala", "Snowflake", "Airflow", "Tableau", "Data Engineering", "Redis Cache",
+    "Distributed Systems", "Engineer", "Developer", "Senior", "Lead", "Architect", "Manager",
+]
+
+_SYLLABLES = "ba co de fi gu ha je ki lo mu na pe qui ro su ta ve wi xo yu ze an er in on st tr".split()
+
+def _synthetic_resume(pages: int, rng: random.Random) -> str:
+    words = []
+    # About 500 words to a page; half are made-up words so the text is not one small vocabulary repeated
+    for _ in range(pages * 500):
+        if rng.random() < 0.5:
+            words.append("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4))))
+        else:
+            words.append(rng.choice(_VOCABULARY))
+        if rng.random() < 0.02:
+            # Typos, so fuzzy matches have something to find
+            word = list(rng.choice(_VOCABULARY))
+            word[rng.randrange(len(word))] = rng.choice("aeiourst")
+            words.append("".join(word))
+    return " ".join(words)
+
+def _timed(run: Callable[[], List[Dict[str, bool]]], repeat: int) -> Tuple[List[Dict[str, bool]], float]:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, (time.perf_counter() - started) * 1000.0)
+    return result, best
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare indexed fuzzy keyword matching with fuzz.partial_ratio")
+    parser.add_argument("--pages", default="1,2,4,6,8,10")
+    parser.add_argument("--files", nargs="*", default=[], help="Resume text files to compare on, shortest first, instead of synthetic resumes")
+    parser.add_argument("--resumes", type=int, default=20, help="Resumes per size")
+    parser.add_argument("--threshold", type=int, default=settings.FUZZY_MATCH_THRESHOLD)
+    parser.add_argument("--min-chars", type=int, default=settings.FUZZY_INDEX_MIN_CHARS, help="Shortest text indexed; 0 indexes every size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    settings.FUZZY_INDEX_MIN_CHARS = args.min_chars
+    rng = random.Random(0)
+    disagreements = []
+    if args.files:
+        texts = []
+        for path in args.files:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+        texts.sort(key=len)
+        groups = [(f"{i + 1:>2}/{len(texts)}", [text]) for i, text in enumerate(texts)]
+    else:
+        groups = [(f"{pages:>2} pages", [_synthetic_resume(pages, rng) for _ in range(args.resumes)]) for pages in (int(pages) for pages in args.pages.split(","))]
+
+    for label, resumes in groups:
+        keywords = [keyword.lower() for keyword in _KEYWORDS]
+        indexes: List[FuzzyIndex] = []
+
+        def baseline_run() -> List[Dict[str, bool]]:
+            return [
+                {keyword: keyword in text or fuzz.partial_ratio(keyword, text) > args.threshold for keyword in keywords}
+                for text in (resume.lower() for resume in resumes)
+            ]
+
+        def indexed_run() -> List[Dict[str, bool]]:
+            indexes[:] = [FuzzyIndex(resume, args.threshold) for resume in resumes]
+            return [index.match(keywords) for index in indexes]
+
+        baseline, baseline_ms = _timed(baseline_run, args.repeat)
+        indexed, indexed_ms = _timed(indexed_run, args.repeat)
+        baseline_ms /= len(resumes)
+        indexed_ms /= len(resumes)
+
+        for expected, found in zip(baseline, indexed):
+            disagreements.extend((label, keyword, expected[keyword], found[keyword]) for keyword in keywords if expected[keyword] != found[keyword])
+        matches = sum(sum(found.values()) for found in indexed)
+        confirmed = sum(index.confirmed for index in indexes)
+        path = "indexed" if len(resumes[0]) >= args.min_chars else "direct"
+        print(
+            f"{label} ({len(resumes[0]):>6} chars): partial_ratio {baseline_ms:8.2f}ms, "
+            f"{path:>7} {indexed_ms:6.2f}ms per resume ({baseline_ms / max(indexed_ms, 1e-6):5.1f}x), "
+            f"{matches} matches, {confirmed} partial_ratio calls"
+        )
+
+    # Every keyword the index cannot rule out is settled by partial_ratio, so any difference is a bug
+    print(f"{len(disagreements)} keywords matched differently from partial_ratio")
+    if disagreements:
+        print(disagreements[:10])
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+from app.core.config import settings
+
+class HashingEmbedder:
+    """
+    Hashed word and character n-gram TF-IDF embeddings.
+
+    No vocabulary is fitted, so a whole batch is vectorised in one sparse
+    pass with constant memory. Word unigrams/bigrams capture skills and
+    phrases; character 3-5 grams tolerate spelling and tokenisation
+    variants ("node.js" vs "nodejs"). Rows are sublinear-TF weighted,
+    optionally IDF weighted, and L2-normalised.
+    """
+
+    name = "hashing-tfidf"
+
+    def __init__(self, n_features: Optional[int] = None):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.n_features = n_features or settings.FAST_EMBEDDING_FEATURES
+        self.word_vectorizer = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=(1, 2),
+            token_pattern=r"(?u)\b\w[\w\+\#\.]*",
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32
+        )
+        self.char_vectorizer = HashingVectorizer(
+            n_features=self.n_features,
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32
+        )
+        self.idf: Optional[np.ndarray] = None
+
+    @property
+    def dimension(self) -> int:
+        return 2 * self.n_features
+
+    def transform(self, texts: List[str]):
+        """Sparse (len(texts), dimension) CSR matrix of unit-length rows"""
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        matrix = sparse.hstack(
+            [self.word_vectorizer.transform(texts), self.char_vectorizer.transform(texts)],
+            format="csr"
+        )
+        np.log1p(matrix.data, out=matrix.data)
+        if self.idf is not None:
+            matrix = matrix @ sparse.diags(self.idf)
+        return normalize(matrix, norm="l2", copy=False)
+
+    def fit_idf(self, texts: List[str]) -> "HashingEmbedder":
+        self.idf = None
+        matrix = self.transform(texts)
+        document_frequency = np.bincount(matrix.indices, minlength=self.dimension)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0).astype(np.float32)
+        return self
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.transform(texts).toarray()
+
+    def prescreen(self, query: str, candidates: List[str], top_k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rank candidates against the query by sparse cosine similarity.
+
+        IDF is fitted on the candidate batch itself so terms shared by every
+        candidate carry little weight.
+        """
+        from app.services import vector_ops
+
+        embedder = HashingEmbedder(self.n_features).fit_idf(candidates)
+        candidate_matrix = embedder.transform(candidates)
+        query_vector = embedder.transform([query])
+        scores = np.asarray((candidate_matrix @ query_vector.T).todense()).ravel()
+        return vector_ops.top_k(scores, top_k or len(candidates))
+
+def _rate(run, documents: int, repeat: int) -> float:
+    """Documents per second, best of repeat runs"""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return documents / best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the hashing embedder against the transformer")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_MAX_BATCH_SIZE, help="Texts per embed call, as the batcher sends them")
+    parser.add_argument("--model-sample", type=int, default=200, help="Documents encoded with the transformer")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = np.array(["python", "react", "aws", "docker", "led", "team", "built", "api", "data", "sql",
+                           "kubernetes", "design", "systems", "scalable", "services", "java", "node.js", "ml"])
+    texts = [" ".join(rng.choice(vocabulary, args.words)) for _ in range(args.documents)]
+    batches = [texts[i:i + args.batch_size] for i in range(0, len(texts), args.batch_size)]
+
+    # The fast tier's path: whitespace-normalised texts to dense float32 rows
+    embedder = HashingEmbedder()
+    sparse_rate = _rate(lambda: [embedder.transform(batch) for batch in batches], len(texts), args.repeat)
+    dense_rate = _rate(
+        lambda: [embedder.embed([" ".join(text.split()) for text in batch]) for batch in batches],
+        len(texts), args.repeat
+    )
+    print(f"{HashingEmbedder.name} transform (sparse): {sparse_rate:8.0f} docs/s")
+    print(f"{HashingEmbedder.name} embed ({embedder.dimension}-d dense): {dense_rate:8.0f} docs/s, batches of {args.batch_size}")
+
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(settings.MODEL_NAME)
+        sample = [batch for batch in batches[:max(1, args.model_sample // args.batch_size)]]
+        sample_size = sum(len(batch) for batch in sample)
+        model_rate = _rate(lambda: [model.encode(batch) for batch in sample], sample_size, 1)
+        print(f"{settings.MODEL_NAME} encode: {model_rate:8.0f} docs/s")
+        print(f"Fast tier embed is {dense_rate / model_rate:.0f}x the model path (target ~100x)")
+    except Exception as e:
+        print(f"Transformer unavailable for comparison: {e}")
@@ -0,0 +1,302 @@
+import argparse
+import json
+import os
+import re
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.services import vector_ops
+
+# Resume/JD-like sentences used to check a backend against the reference
+PARITY_TEXTS = [
+    "Senior Python developer with 6 years of experience building REST APIs with Django and FastAPI.",
+    "Led a team of five engineers migrating services to AWS using Docker and Kubernetes.",
+    "Bachelor of Science in Computer Science, University of Washington, 2016.",
+    "Looking for a data engineer comfortable with SQL, Spark and Airflow pipelines.",
+    "Frontend engineer: React, TypeScript, Redux, accessibility and design systems.",
+    "Managed payroll, accounts payable and monthly financial reporting for a retail chain.",
+    "Registered nurse with ICU experience and BLS/ACLS certification.",
+    "Machine learning engineer who shipped recommendation models to production.",
+    "Skills: Java, Spring Boot, microservices, Kafka, PostgreSQL, CI/CD",
+    "Excellent communication skills and a passion for customer success.",
+    "Developed embedded C firmware for low-power IoT sensors.",
+    "We are hiring a product manager with B2B SaaS experience.",
+]
+
+class TorchBackend:
+    """Reference backend: SentenceTransformer on PyTorch"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.tokenizer = self.model.tokenizer
+        self.max_seq_length = self.model.max_seq_length
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+class OnnxBackend:
+    """
+    Exported transformer graph on onnxruntime, optionally int8 quantized.
+
+    Only the transformer is exported; pooling and normalisation are
+    reproduced in numpy from the SentenceTransformer configuration. Loading
+    needs onnxruntime and the tokenizer files, not PyTorch.
+    """
+
+    name = "onnx"
+
+    def __init__(self, directory: str):
+        from transformers import AutoTokenizer
+
+        self.directory = directory
+        with open(os.path.join(directory, "config.json"), encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.max_seq_length = self.config["max_seq_length"]
+        self._session = None
+        self._session_pid = None
+
+    @staticmethod
+    def directory_for(model_name: str, quantize: bool) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name.strip("/"))
+        return os.path.join(settings.ONNX_MODEL_DIR, safe_name + ("-int8" if quantize else ""))
+
+    @classmethod
+    def export(cls, model_name: str, directory: str, quantize: bool = True) -> "OnnxBackend":
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        reference = SentenceTransformer(model_name, device="cpu")
+        modules = list(reference)
+        transformer = modules[0]
+        pooling_config = modules[1].get_config_dict() if len(modules) > 1 else {}
+        pooling = pooling_config.get("pooling_mode")
+        if not pooling:
+            # Older sentence-transformers store one flag per mode
+            if pooling_config.get("pooling_mode_cls_token"):
+                pooling = "cls"
+            elif pooling_config.get("pooling_mode_max_tokens"):
+                pooling = "max"
+            elif pooling_config.get("pooling_mode_mean_tokens"):
+                pooling = "mean"
+        normalize = any(type(module).__name__ == "Normalize" for module in modules[2:])
+        unsupported = [type(module).__name__ for module in modules[2:] if type(module).__name__ != "Normalize"]
+        if pooling not in ("mean", "cls", "max") or unsupported:
+            raise ValueError(f"Cannot export {model_name}: pooling={pooling}, extra modules={unsupported}")
+
+        os.makedirs(directory, exist_ok=True)
+        tokenizer = reference.tokenizer
+        input_names = list(tokenizer.model_input_names)
+        sample = dict(tokenizer(["onnx export sample"], return_tensors="pt"))
+        sample = {name: sample[name] for name in input_names}
+
+        class Wrapper(torch.nn.Module):
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names, inputs)))[0]
+
+        fp32_path = os.path.join(directory, "model-fp32.onnx")
+        export_kwargs = {"dynamo": False} if "dynamo" in torch.onnx.export.__code__.co_varnames else {}
+        with torch.no_grad():
+            torch.onnx.export(
+                Wrapper(transformer.auto_model.eval()),
+                tuple(sample[name] for name in input_names),
+                fp32_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                    "last_hidden_state": {0: "batch", 1: "sequence"}
+                },
+                opset_version=14,
+                **export_kwargs
+            )
+
+        model_path = fp32_path
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            model_path = os.path.join(directory, "model-int8.onnx")
+            quantize_dynamic(fp32_path, model_path, weight_type=QuantType.QInt8)
+            os.remove(fp32_path)
+
+        tokenizer.save_pretrained(directory)
+        config = {
+            "model_name": model_name,
+            "model_file": os.path.basename(model_path),
+            "input_names": input_names,
+            "pooling": pooling,
+            "normalize": normalize,
+            "max_seq_length": reference.max_seq_length,
+            "dimension": int(reference.encode(["dimension"]).shape[1]),
+            "quantized": quantize
+        }
+        with open(os.path.join(directory, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+
+        backend = cls(directory)
+        backend.config["parity"] = check_parity(
+            reference_vectors=reference.encode(PARITY_TEXTS, convert_to_numpy=True),
+            candidate_vectors=backend.encode(PARITY_TEXTS)
+        )
+        with open(os.path.join(directory, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(backend.config, f, indent=2)
+        return backend
+
+    def _get_session(self):
+        # onnxruntime's thread pool does not survive fork, so each process opens its own session
+        if self._session is None or self._session_pid != os.getpid():
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            threads = settings.TORCH_NUM_THREADS or int(os.environ.get("OMP_NUM_THREADS", "0") or 0)
+            if threads > 0:
+                options.intra_op_num_threads = threads
+            self._session = onnxruntime.InferenceSession(
+                os.path.join(self.directory, self.config["model_file"]),
+                options,
+                providers=["CPUExecutionProvider"]
+            )
+            self._session_pid = os.getpid()
+        return self._session
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dimension"]
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        session = self._get_session()
+        if not texts:
+            return np.zeros((0, self.config["dimension"]), dtype=np.float32)
+
+        # Length-sorted batches keep padding small
+        order = np.argsort([len(text) for text in texts])
+        vectors = np.zeros((len(texts), self.config["dimension"]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[i] for i in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            feed = {name: inputs[name].astype(np.int64) for name in self.config["input_names"]}
+            hidden = session.run(None, feed)[0]
+            vectors[batch] = self._pool(hidden, feed["attention_mask"])
+
+        return vector_ops.normalize(vectors) if self.config["normalize"] else vectors
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.config["pooling"] == "cls":
+            return hidden[:, 0]
+
+        mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+        if self.config["pooling"] == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+def check_parity(reference_vectors: np.ndarray, candidate_vectors: np.ndarray) -> Dict[str, Any]:
+    """
+    Compare a backend's vectors with the reference: per-text cosine and the
+    change in pairwise similarity scores (what scoring actually consumes)
+    """
+    reference_vectors = vector_ops.normalize(reference_vectors)
+    candidate_vectors = vector_ops.normalize(candidate_vectors)
+    cosines = np.sum(reference_vectors * candidate_vectors, axis=1)
+    score_delta = np.abs(reference_vectors @ reference_vectors.T - candidate_vectors @ candidate_vectors.T)
+
+    report = {
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "max_score_delta": round(float(score_delta.max()), 5)
+    }
+    report["passed"] = parity_passed(report)
+    return report
+
+def parity_passed(report: Dict[str, Any]) -> bool:
+    """Measured parity errors against the current thresholds; the stored "passed" flag is not trusted"""
+    try:
+        return bool(
+            float(report["min_cosine"]) >= settings.ONNX_PARITY_MIN_COSINE
+            and float(report["max_score_delta"]) <= settings.ONNX_PARITY_MAX_SCORE_DELTA
+        )
+    except (KeyError, TypeError, ValueError):
+        return False
+
+def load_backend(model_name: str, backend: Optional[str] = None):
+    """
+    Backend selected by EMBEDDING_BACKEND. The ONNX graph is exported on
+    first use; it is only used while the parity errors measured at export
+    are within the current ONNX_PARITY_* thresholds.
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "onnx":
+        directory = OnnxBackend.directory_for(model_name, settings.ONNX_QUANTIZE)
+        try:
+            if os.path.exists(os.path.join(directory, "config.json")):
+                onnx_backend = OnnxBackend(directory)
+            else:
+                print(f"Exporting {model_name} to ONNX: {directory}")
+                onnx_backend = OnnxBackend.export(model_name, directory, quantize=settings.ONNX_QUANTIZE)
+
+            parity = onnx_backend.config.get("parity", {})
+            if parity_passed(parity):
+                print(f"Using ONNX backend ({directory}), parity: {parity}")
+                return onnx_backend
+            print(
+                f"ONNX backend parity {parity} is outside the current thresholds (min cosine "
+                f"{settings.ONNX_PARITY_MIN_COSINE}, max score delta {settings.ONNX_PARITY_MAX_SCORE_DELTA}); using PyTorch"
+            )
+        except Exception as e:
+            print(f"Error loading ONNX backend: {e}; using PyTorch")
+    elif backend != "torch":
+        print(f"Unknown embedding backend {backend!r}; using PyTorch")
+
+    return TorchBackend(model_name)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export the ONNX backend and check parity and speed against PyTorch")
+    parser.add_argument("--model", default=settings.MODEL_NAME)
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    quantize = not args.no_quantize
+    onnx_backend = OnnxBackend.export(args.model, OnnxBackend.directory_for(args.model, quantize), quantize=quantize)
+    torch_backend = TorchBackend(args.model)
+
+    rng = np.random.default_rng(0)
+    texts = [" ".join(rng.choice(PARITY_TEXTS, 4)) for _ in range(args.texts)]
+
+    timings = {}
+    vectors = {}
+    for backend in (torch_backend, onnx_backend):
+        backend.encode(texts[:args.batch_size], batch_size=args.batch_size)
+        started = time.perf_counter()
+        vectors[backend.name] = backend.encode(texts, batch_size=args.batch_size)
+        timings[backend.name] = time.perf_counter() - started
+
+    parity = check_parity(vectors["torch"], vectors["onnx"])
+    print(f"Parity on {len(texts)} texts: {parity}")
+    for name, elapsed in timings.items():
+        print(f"{name:>6}: {len(texts) / elapsed:8.1f} texts/s")
+    print(f"Speedup: {timings['torch'] / timings['onnx']:.2f}x")
+    if not parity["passed"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+
+class InferenceQueueFull(RuntimeError):
+    pass
+
+class InferenceExecutor:
+    """
+    Bounded thread pool that keeps blocking model calls off the event loop.
+
+    PyTorch and NumPy release the GIL inside their kernels, so a small
+    dedicated pool overlaps inference with parsing and I/O on the loop.
+    Submissions beyond max_queue waiting jobs are rejected instead of
+    piling up unbounded latency.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.max_workers = max(1, max_workers or settings.INFERENCE_THREADS)
+        self.max_queue = max_queue if max_queue is not None else settings.INFERENCE_MAX_QUEUE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference"
+                )
+            return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self.max_queue > 0 and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise InferenceQueueFull(f"Inference queue is full ({self.queued} waiting)")
+            self.queued += 1
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            wait = started - submitted
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+            try:
+                result = fn(*args)
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            else:
+                with self._lock:
+                    self.completed += 1
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.total_run += time.perf_counter() - started
+
+            return result
+
+        def release(future: Future) -> None:
+            # Cancelled before a thread picked it up (e.g. the client went away), so job never ran
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+
+        future = self._get_executor().submit(job)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self.completed
+            finished = completed + self.failed
+            return {
+                "threads": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / finished * 1000.0, 3) if finished else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000.0, 3),
+                "avg_run_ms": round(self.total_run / finished * 1000.0, 3) if finished else 0.0
+            }
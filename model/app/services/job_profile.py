@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+from app.schemas.scoring import ParsedJD, ParsedResume
+from app.core.cache import MemoryLRUCache, content_key
+from app.core.config import settings
+from app.services.skill_matcher import SkillMatcher
+
+IMPORTANCE_WEIGHTS = {'required': 50, 'preferred': 30, 'nice-to-have': 20}
+
+REQUIRED_WORDS = ['required', 'must', 'essential', 'mandatory']
+PREFERRED_WORDS = ['preferred', 'desired', 'nice to have', 'bonus']
+
+def keyword_importance(keyword_lower: str, text_lower: str) -> str:
+    """Importance from the words within 50 characters of the keyword's first mention"""
+    position = text_lower.find(keyword_lower)
+    context = text_lower[max(0, position - 50):min(len(text_lower), position + len(keyword_lower) + 50)]
+
+    if any(word in context for word in REQUIRED_WORDS):
+        return 'required'
+    elif any(word in context for word in PREFERRED_WORDS):
+        return 'preferred'
+    else:
+        return 'nice-to-have'
+
+@dataclass(frozen=True)
+class CompiledJobProfile:
+    """
+    Everything scoring needs from a JD, derived once: keywords with their
+    importance, the synonym-expanded skill set, role keywords and required
+    years. Scoring a resume against it only does resume-side work.
+    """
+    keywords: Tuple[Tuple[str, str], ...]  # (keyword, importance) in JD order
+    canonical: Dict[str, Optional[str]]  # Lowercased keyword -> lowercased canonical skill
+    by_importance: Dict[str, FrozenSet[str]]  # Importance -> keywords, for counting matches
+    totals: Dict[str, int]  # Importance -> number of keywords
+    expanded_skills: FrozenSet[str]
+    roles: Tuple[str, ...]  # Lowercased role keywords
+    required_years: float
+
+    @classmethod
+    def compile(cls, parsed_jd: ParsedJD, skill_matcher: SkillMatcher) -> "CompiledJobProfile":
+        text = parsed_jd.raw_text.lower()
+        keywords = tuple(
+            (keyword, keyword_importance(keyword.lower(), text))
+            for keyword in list(parsed_jd.skills) + list(parsed_jd.role_keywords)
+        )
+
+        canonical: Dict[str, Optional[str]] = {}
+        for keyword, _ in keywords:
+            keyword_lower = keyword.lower()
+            if keyword_lower not in canonical:
+                name = skill_matcher.canonical(keyword_lower)
+                canonical[keyword_lower] = name.lower() if name is not None else None
+
+        return cls(
+            keywords=keywords,
+            canonical=canonical,
+            by_importance={
+                importance: frozenset(keyword for keyword, level in keywords if level == importance)
+                for importance in IMPORTANCE_WEIGHTS
+            },
+            totals={
+                importance: sum(1 for _, level in keywords if level == importance)
+                for importance in IMPORTANCE_WEIGHTS
+            },
+            expanded_skills=frozenset(skill_matcher.expand(set(skill.lower() for skill in parsed_jd.skills))),
+            roles=tuple(role.lower() for role in parsed_jd.role_keywords),
+            required_years=parsed_jd.required_years_experience
+        )
+
+    def keyword_score(self, matched_keywords: List[str]) -> int:
+        """Keyword match score: the matched share of each importance, weighted"""
+        if not self.keywords:
+            return 100
+
+        score = 0
+        for importance, weight in IMPORTANCE_WEIGHTS.items():
+            if self.totals[importance] > 0:
+                matches = sum(1 for keyword in matched_keywords if keyword in self.by_importance[importance])
+                score += (matches / self.totals[importance]) * weight
+        return int(score)
+
+def profile_key(parsed_jd: ParsedJD) -> str:
+    """Content hash of the JD fields a profile is compiled from"""
+    return content_key(
+        parsed_jd.raw_text,
+        "\n".join(parsed_jd.skills),
+        "\n".join(parsed_jd.role_keywords),
+        repr(parsed_jd.required_years_experience)
+    )
+
+def _profile_sizeof(profile: CompiledJobProfile) -> int:
+    # Rough: the strings held plus per-entry overhead
+    strings = [keyword for keyword, _ in profile.keywords] + list(profile.expanded_skills) + list(profile.roles)
+    return 256 + sum(len(value) + 64 for value in strings) * 3
+
+class JobProfileCache:
+    """LRU of compiled job profiles keyed by JD content hash"""
+
+    def __init__(self, skill_matcher: SkillMatcher):
+        self.skill_matcher = skill_matcher
+        self.memory = MemoryLRUCache(
+            max_items=settings.JOB_PROFILE_CACHE_MAX_ITEMS,
+            max_bytes=settings.JOB_PROFILE_CACHE_MAX_BYTES,
+            sizeof=_profile_sizeof
+        )
+
+    def get(self, parsed_jd: ParsedJD) -> CompiledJobProfile:
+        key = profile_key(parsed_jd)
+        profile = self.memory.get(key)
+        if profile is None:
+            profile = CompiledJobProfile.compile(parsed_jd, self.skill_matcher)
+            self.memory.put(key, profile)
+        return profile
+
+    def get_stats(self) -> Dict[str, int]:
+        return self.memory.stats()
+
+def _synthetic_jd(skills: List[str]) -> ParsedJD:
+    lines = [f"Must have strong {skill} experience." if i % 3 == 0 else f"{skill} is a bonus." for i, skill in enumerate(skills)]
+    return ParsedJD(
+        skills=skills,
+        required_years_experience=5.0,
+        role_keywords=["Senior", "Engineer", "Developer"],
+        required_technologies=skills,
+        seniority="senior",
+        responsibilities=[],
+        raw_text="Senior Backend Engineer\n" + "\n".join(lines * 20)
+    )
+
+def _synthetic_resume(skills: List[str], i: int) -> ParsedResume:
+    mine = skills[i % 5::2]
+    return ParsedResume(
+        contact_info={"name": f"Candidate {i}"},
+        skills=mine,
+        experience=[{"title": "Software Engineer", "company": "Acme", "years": 3.0}],
+        total_years_experience=3.0 + i % 4,
+        education=[],
+        certifications=[],
+        projects=[],
+        summary="",
+        raw_text="Software Engineer at Acme. Built services with " + ", ".join(mine) + ".\n" * 5
+    )
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Score a shortlist of resumes against one JD with and without the job profile cache")
+    parser.add_argument("--resumes", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    from app.services.scoring_engine import ScoringEngine
+
+    engine = ScoringEngine()
+    skills = sorted(engine.skill_matcher.names)[:40]
+    jd = _synthetic_jd(skills)
+    resumes = [_synthetic_resume(skills, i) for i in range(args.resumes)]
+    vector = np.zeros((1, 8), dtype=np.float32)
+
+    async def score_all() -> List[int]:
+        return [(await engine.score_resume(resume, jd, vector, vector))['overall_score'] for resume in resumes]
+
+    for name, items in (("uncached", 0), ("cached", settings.JOB_PROFILE_CACHE_MAX_ITEMS)):
+        engine.job_profiles.memory.max_items = items
+        engine.job_profiles.memory.clear()
+        started = time.perf_counter()
+        scores = asyncio.run(score_all())
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        print(f"{name:>8}: {elapsed_ms:8.1f}ms for {len(resumes)} resumes ({elapsed_ms / len(resumes):.3f}ms each), mean score {sum(scores) / len(scores):.1f}")
+    print(engine.job_profiles.get_stats())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.services.inference_backends import load_backend
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def model_memory_bytes(backend: Any) -> int:
+    """Resident size of a loaded backend: weight tensors, or the graph file for ONNX"""
+    model = getattr(backend, "model", None)
+    if model is not None and hasattr(model, "parameters"):
+        return sum(p.numel() * p.element_size() for p in model.parameters()) + sum(
+            b.numel() * b.element_size() for b in model.buffers()
+        )
+
+    directory = getattr(backend, "directory", None)
+    config = getattr(backend, "config", None)
+    if directory and config:
+        return os.path.getsize(os.path.join(directory, config["model_file"]))
+    return 0
+
+class ModelRegistry:
+    """
+    Embedding models loaded on first use under a memory budget.
+
+    Each model's resident size is measured when it is loaded; loading a
+    model that would exceed the budget evicts the least recently used
+    ones first. An evicted model is reloaded on its next use. Models still
+    referenced by in-flight requests are freed when those finish.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        loader: Callable[[str], Any] = load_backend
+    ):
+        self.max_bytes = settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.loader = loader
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        # Counters
+        self.loads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def allowed_models() -> List[str]:
+        return [settings.MODEL_NAME] + [name for name in settings.ALLOWED_MODELS if name != settings.MODEL_NAME]
+
+    def is_allowed(self, model_name: str) -> bool:
+        return model_name in self.allowed_models()
+
+    def get(self, model_name: str) -> Any:
+        if not self.is_allowed(model_name):
+            raise ValueError(f"Model {model_name} is not enabled; allowed models: {self.allowed_models()}")
+
+        with self._lock:
+            if model_name in self._models:
+                self._models.move_to_end(model_name)
+                return self._models[model_name]
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        # One loader per model; other models stay usable meanwhile
+        with load_lock:
+            with self._lock:
+                if model_name in self._models:
+                    self._models.move_to_end(model_name)
+                    return self._models[model_name]
+
+            started = time.perf_counter()
+            rss_before = _rss_bytes()
+            backend = self.loader(model_name)
+            size = model_memory_bytes(backend) or max(0, _rss_bytes() - rss_before)
+
+            with self._lock:
+                self._models[model_name] = backend
+                self._sizes[model_name] = size
+                self._load_ms[model_name] = round((time.perf_counter() - started) * 1000.0, 3)
+                self.loads += 1
+                self._evict(keep=model_name)
+            print(f"Loaded embedding model {model_name} ({size / 1024 / 1024:.1f}MB); resident: {list(self._models)}")
+            return backend
+
+    def _evict(self, keep: str) -> None:
+        while self.resident_bytes() > self.max_bytes and len(self._models) > 1:
+            model_name = next(name for name in self._models if name != keep)
+            del self._models[model_name]
+            size = self._sizes.pop(model_name, 0)
+            self.evictions += 1
+            print(f"Evicted embedding model {model_name} ({size / 1024 / 1024:.1f}MB) to stay under the memory budget")
+
+    def resident_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def loaded(self, model_name: str) -> bool:
+        with self._lock:
+            return model_name in self._models
+
+    def peek(self, model_name: str) -> Optional[Any]:
+        """A resident model without loading it or touching its recency"""
+        with self._lock:
+            return self._models.get(model_name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget_bytes": self.max_bytes,
+                "resident_bytes": self.resident_bytes(),
+                "resident": [
+                    {
+                        "model_name": name,
+                        "backend": getattr(backend, "name", None),
+                        "bytes": self._sizes.get(name, 0),
+                        "load_ms": self._load_ms.get(name)
+                    }
+                    for name, backend in reversed(self._models.items())
+                ],
+                "allowed": self.allowed_models(),
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
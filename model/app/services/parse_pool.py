@@ -0,0 +1,165 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+class ParseTimeout(RuntimeError):
+    """A parse job exceeded PARSE_TIMEOUT_S and its worker was killed"""
+
+# Per worker process
+_worker_parser = None
+
+def _init_worker() -> None:
+    global _worker_parser
+    from app.services.parser_service import ParserService
+    from app.services.skill_matcher import get_skill_matcher
+
+    _worker_parser = ParserService(use_pool=False, use_cache=False)
+    _worker_parser.load_nlp()
+    get_skill_matcher()
+
+def _run_parse(method: str, *args: Any) -> Any:
+    return getattr(_worker_parser, method)(*args)
+
+def _ping() -> int:
+    return os.getpid()
+
+class ParsePool:
+    """
+    Process pool for CPU-bound document parsing.
+
+    Workers are spawned with the spaCy pipeline preloaded and replaced
+    after max_tasks_per_child jobs, which bounds leaks in the PDF
+    libraries. At most max_workers jobs are submitted at once, so the
+    timeout covers execution rather than queueing. A job that exceeds it
+    takes the whole pool down (a stuck worker cannot be killed on its own);
+    jobs that were running alongside it are retried once on the new pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.max_workers = max(1, max_workers or settings.PARSE_WORKERS)
+        self.max_tasks_per_child = max_tasks_per_child or settings.PARSE_MAX_TASKS_PER_WORKER
+        self.timeout = timeout or settings.PARSE_TIMEOUT_S
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+
+        # Counters
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.total_run_time = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            # A pool inherited across fork has no management thread; start a new one
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    max_tasks_per_child=self.max_tasks_per_child
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._slots_loop = loop
+        return self._slots
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.restarts += 1
+
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self) -> None:
+        """Start every worker and load its spaCy pipeline"""
+        executor = self._get_executor()
+        done, _ = wait([executor.submit(_ping) for _ in range(self.max_workers)], timeout=max(60.0, self.timeout))
+        for future in done:
+            future.result()
+        print(f"Parse pool ready: {self.max_workers} workers")
+
+    async def run(self, method: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Call ParserService.<method>(*args) in a worker process; timeout
+        overrides the per-document one for batch jobs
+        """
+        async with self._get_slots():
+            self.in_flight += 1
+            try:
+                return await self._run(method, *args, timeout=timeout or self.timeout)
+            finally:
+                self.in_flight -= 1
+
+    async def _run(self, method: str, *args: Any, timeout: float) -> Any:
+        for attempt in range(2):
+            executor = self._get_executor()
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.wrap_future(executor.submit(_run_parse, method, *args)),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._restart(executor)
+                raise ParseTimeout(f"Parsing did not finish within {timeout:g}s")
+            except BrokenProcessPool:
+                # Killed with a timed-out job or crashed in native code
+                self._restart(executor)
+                if attempt:
+                    self.failed += 1
+                    raise
+                continue
+            except Exception:
+                self.failed += 1
+                raise
+
+            self.completed += 1
+            self.total_run_time += time.perf_counter() - started
+            return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "max_tasks_per_worker": self.max_tasks_per_child,
+            "timeout_s": self.timeout,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "avg_run_ms": round(self.total_run_time * 1000.0 / self.completed, 3) if self.completed else 0.0
+        }
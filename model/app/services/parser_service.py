@@ -1,115 +1,314 @@
 import asyncio
-import io
 import re
-from typing import Dict, List, Any, Optional
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional, Tuple
 from fastapi import UploadFile
-import PyPDF2
-import pdfplumber
-from docx import Document
-import spacy
 from datetime import datetime
 from dateutil import parser as date_parser
+from app.core.config import settings
+from app.core.startup import startup_report
 from app.schemas.scoring import ParsedResume, ParsedJD
+from app.services.docx_extractor import DocxExtractor
+from app.services.entity_extractor import DocumentEntities, EntityExtractor, load_pipeline
+from app.services.parse_pool import ParseTimeout
+from app.services.pdf_extractor import PdfExtractor
+from app.services.skill_matcher import get_skill_matcher
+from app.services import text_scanner
+from app.services.text_scanner import Budget, BudgetTracker, ScanResult
+from app.services.section_index import SectionIndex
+from app.services.upload_intake import Upload, UploadRejected, receive_upload
+
+# Text cleaning keeps line breaks, which section headings and bullets are found by
+_UNWANTED_CHARS_RE = re.compile(r'[^\w\s\.\,\-\+\&\@\:\/\#\(\)•]')
+_SPACES_RE = re.compile(r'[^\S\n]+')
+_LINE_BREAKS_RE = re.compile(r' ?\n[ \n]*')
+_SENTENCE_BREAK_RE = re.compile(r'[.\n]')
 
 class ParserService:
     
-    def __init__(self):
-        # Load spaCy model for NLP processing
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            # Fallback to basic processing if spaCy model not available
-            self.nlp = None
-            print("Warning: spaCy model not available, using basic text processing")
+    def __init__(self, use_pool: Optional[bool] = None, use_cache: Optional[bool] = None):
+        # spaCy and its model are loaded on first use or by the startup warm-up
+        self._nlp = None
+        self._nlp_loaded = False
+        self._nlp_lock = threading.Lock()
+        self.entities = EntityExtractor()
+        
+        # With a pool, parsing (and spaCy) live in the worker processes
+        if use_pool is None:
+            use_pool = settings.PARSE_WORKERS > 0
+        self.pool = None
+        self._pool_started = False
+        self._pool_lock = threading.Lock()
+        
+        # The serving process consults the cache before dispatching to the pool
+        if use_cache is None:
+            use_cache = settings.PARSE_CACHE_ENABLED
+        self.cache = None
+        if use_cache:
+            from app.services.document_cache import ParsedDocumentCache
+            self.cache = ParsedDocumentCache()
+        
+        if use_pool:
+            from app.services.parse_pool import ParsePool
+            self.pool = ParsePool()
+            startup_report.register("parse_pool", self._warm_up_pool, per_process=True)
+        else:
+            startup_report.register("spacy", self.load_nlp)
+    
+    def _warm_up_pool(self) -> None:
+        with self._pool_lock:
+            if self._pool_started:
+                return
+            with startup_report.track("parse_pool"):
+                self.pool.warm_up()
+            self._pool_started = True
+    
+    @property
+    def nlp(self):
+        if not self._nlp_loaded:
+            self.load_nlp()
+        return self._nlp
+    
+    def load_nlp(self):
+        with self._nlp_lock:
+            if self._nlp_loaded:
+                return self._nlp
+            
+            if not settings.NER_ENABLED:
+                self._nlp_loaded = True
+                return None
+            
+            try:
+                with startup_report.track("spacy"):
+                    # Only the components NER needs
+                    self._nlp = load_pipeline()
+            except Exception:
+                # Fallback to basic processing if spaCy model not available
+                self._nlp = None
+                print("Warning: spaCy model not available, using basic text processing")
+            
+            self._nlp_loaded = True
+            return self._nlp
     
     async def parse_resume(self, file: UploadFile) -> ParsedResume:
 
         try:
-            # Extract text from file
-            text = await self._extract_text(file)
-            
-            # Parse the extracted text
-            return self._parse_resume_text(text)
+            upload = await receive_upload(file)
+            try:
+                # Extract and parse the text off the event loop
+                return await self._parse_document("resume", upload)
+            finally:
+                upload.close()
             
+        except (UploadRejected, ParseTimeout, BrokenProcessPool):
+            raise
         except Exception as e:
             raise Exception(f"Error parsing resume: {str(e)}")
     
+    async def parse_resumes(self, files: List[UploadFile]) -> List[ParsedResume]:
+        """
+        Bulk mode: resumes missing from the cache are parsed in batches,
+        each with a single NER pass over all of its documents
+        """
+        uploads: List[Upload] = []
+        try:
+            for file in files:
+                uploads.append(await receive_upload(file))
+            return await self._parse_documents("resume", uploads)
+        except (UploadRejected, ParseTimeout, BrokenProcessPool):
+            raise
+        except Exception as e:
+            raise Exception(f"Error parsing resumes: {str(e)}")
+        finally:
+            for upload in uploads:
+                upload.close()
+    
     async def parse_jd_file(self, file: UploadFile) -> ParsedJD:
 
         try:
-            text = await self._extract_text(file)
-            return self._parse_jd_text(text)
+            upload = await receive_upload(file)
+            try:
+                return await self._parse_document("jd", upload)
+            finally:
+                upload.close()
+        except (UploadRejected, ParseTimeout, BrokenProcessPool):
+            raise
         except Exception as e:
             raise Exception(f"Error parsing JD file: {str(e)}")
     
     async def parse_jd_text(self, text: str) -> ParsedJD:
         try:
-            return self._parse_jd_text(text)
+            return await self._run("_parse_jd_text", text)
+        except (ParseTimeout, BrokenProcessPool):
+            raise
         except Exception as e:
             raise Exception(f"Error parsing JD text: {str(e)}")
     
-    async def _extract_text(self, file: UploadFile) -> str:
-        content = await file.read()
-        
-        if file.filename.lower().endswith('.pdf'):
-            return self._extract_pdf_text(content)
-        elif file.filename.lower().endswith('.docx'):
-            return self._extract_docx_text(content)
-        elif file.filename.lower().endswith('.txt'):
-            return content.decode('utf-8')
+    async def _parse_document(self, kind: str, upload: Upload):
+        return (await self._parse_documents(kind, [upload]))[0]
+    
+    async def _parse_documents(self, kind: str, uploads: List[Upload]) -> List[Any]:
+        schema = ParsedResume if kind == "resume" else ParsedJD
+        results: List[Any] = [None] * len(uploads)
+        keys: List[Optional[str]] = [None] * len(uploads)
+        pending = []
+        for index, upload in enumerate(uploads):
+            if self.cache is not None:
+                # Repeat uploads skip extraction and the worker round trip
+                keys[index] = self.cache.key(kind, upload)
+                cached = self.cache.get(keys[index], schema)
+                if cached is not None:
+                    results[index] = cached[1]
+                    continue
+            pending.append(index)
+        
+        # Enough batches to keep every worker busy, none larger than NER_BATCH_SIZE
+        workers = self.pool.max_workers if self.pool is not None else 1
+        size = max(1, min(settings.NER_BATCH_SIZE, -(-len(pending) // workers)))
+        batches = [pending[start:start + size] for start in range(0, len(pending), size)]
+        parsed_batches = await asyncio.gather(*(
+            self._run(
+                "parse_uploads", kind, [uploads[index] for index in batch],
+                timeout=settings.PARSE_TIMEOUT_S * len(batch)
+            )
+            for batch in batches
+        ))
+        
+        for batch, parsed_batch in zip(batches, parsed_batches):
+            for index, (text, parsed, partial) in zip(batch, parsed_batch):
+                results[index] = parsed
+                # A parse cut short by an extractor budget reflects a slow moment,
+                # not the file, so it is not kept for later uploads of the same bytes
+                if keys[index] is not None and not partial:
+                    self.cache.put(keys[index], text, parsed)
+        return results
+    
+    async def _run(self, method: str, *args, timeout: Optional[float] = None):
+        if self.pool is not None:
+            if not self._pool_started:
+                await asyncio.to_thread(self._warm_up_pool)
+            return await self.pool.run(method, *args, timeout=timeout)
+        return await asyncio.to_thread(getattr(self, method), *args)
+    
+    def parse_content(self, kind: str, filename: str, content: bytes) -> Tuple[str, Any]:
+        """Extracted text and the ParsedResume / ParsedJD for an uploaded file"""
+        text, parsed, _ = self.parse_uploads(kind, [Upload.from_bytes(filename, content)])[0]
+        return text, parsed
+    
+    def parse_uploads(self, kind: str, uploads: List[Upload]) -> List[Tuple[str, Any, bool]]:
+        """
+        parse_content for a batch of received uploads, each with whether an
+        extractor ran out of its time budget (the parse is partial)
+        """
+        texts = [self._extract_text(upload) for upload in uploads]
+        trackers = [BudgetTracker() for _ in texts]
+        if kind == "resume":
+            parsed = self._parse_resume_texts(texts, trackers)
         else:
-            raise ValueError(f"Unsupported file format: {file.filename}")
+            parsed = []
+            for text, tracker in zip(texts, trackers):
+                with tracker:
+                    parsed.append(self._parse_jd_text(text))
+        return [(text, document, tracker.exceeded) for text, document, tracker in zip(texts, parsed, trackers)]
+    
+    def parse_resume_content(self, filename: str, content: bytes) -> ParsedResume:
+        return self.parse_content("resume", filename, content)[1]
+    
+    def parse_jd_content(self, filename: str, content: bytes) -> ParsedJD:
+        return self.parse_content("jd", filename, content)[1]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pool": self.pool.get_stats() if self.pool is not None else None,
+            "cache": self.cache.stats() if self.cache is not None else None
+        }
+    
+    def _extract_text(self, upload: Upload) -> str:
+        # Dispatch on the format detected at intake; spooled uploads are memory-mapped
+        with upload.buffer() as content:
+            if upload.format == '.pdf':
+                return self._extract_pdf_text(content)
+            elif upload.format == '.docx':
+                return self._extract_docx_text(content)
+            elif upload.format == '.txt':
+                return bytes(content).decode('utf-8')
+            else:
+                raise ValueError(f"Unsupported file format: {upload.filename}")
     
     def _extract_pdf_text(self, content: bytes) -> str:
         try:
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-                return text
-        except Exception:
-            try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
-            except Exception as e:
-                raise Exception(f"Failed to extract text from PDF: {str(e)}")
+            extraction = PdfExtractor().extract(content)
+        except Exception as e:
+            raise Exception(f"Failed to extract text from PDF: {str(e)}")
+        
+        if extraction.truncated:
+            print(
+                f"PDF truncated to {extraction.pages_read}/{extraction.pages_total} pages, "
+                f"{len(extraction.text)} chars ({extraction.engine}, {extraction.total_ms:.0f}ms)"
+            )
+        return extraction.text
     
     def _extract_docx_text(self, content: bytes) -> str:
         try:
-            doc = Document(io.BytesIO(content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            extraction = DocxExtractor().extract(content)
         except Exception as e:
             raise Exception(f"Failed to extract text from DOCX: {str(e)}")
+        
+        if extraction.truncated:
+            print(f"DOCX truncated to {len(extraction.text)} chars ({extraction.ms:.0f}ms)")
+        return extraction.text
     
     def _parse_resume_text(self, text: str) -> ParsedResume:
-        # Basic text cleaning
-        text = self._clean_text(text)
-        
+        return self._parse_resume_texts([text])[0]
+    
+    def _parse_resume_texts(self, texts: List[str], trackers: Optional[List[BudgetTracker]] = None) -> List[ParsedResume]:
+        # Budget overruns are recorded per document
+        trackers = trackers or [BudgetTracker() for _ in texts]
+        documents = []
+        for text, tracker in zip(texts, trackers):
+            # Basic text cleaning
+            text = self._clean_text(text)
+            
+            # One pass for contact details, dates, degrees and certifications,
+            # and one for section headings; extractors then read their own spans
+            with tracker:
+                documents.append((text, text_scanner.scan(text), SectionIndex(text, "resume")))
+        
+        # Names, employers and titles of the whole batch in one NER pass
+        entities = self.entities.extract(self.nlp, documents)
+        resumes = []
+        for (text, markers, sections), document_entities, tracker in zip(documents, entities, trackers):
+            with tracker:
+                resumes.append(self._build_resume(text, markers, sections, document_entities))
+        return resumes
+    
+    def _build_resume(
+        self,
+        text: str,
+        markers: ScanResult,
+        sections: SectionIndex,
+        entities: DocumentEntities
+    ) -> ParsedResume:
         # Extract contact information
-        contact_info = self._extract_contact_info(text)
+        contact_info = self._extract_contact_info(text, markers, sections, entities)
         
-        # Extract skills
+        # Extract skills (mentioned anywhere, not only under a skills heading)
         skills = self._extract_skills(text)
         
         # Extract experience
-        experience = self._extract_experience(text)
+        experience = self._extract_experience(text, markers, sections, entities)
         
         # Calculate total years of experience
         total_years = sum(exp.get('years', 0) for exp in experience)
         
         # Extract education
-        education = self._extract_education(text)
+        education = self._extract_education(text, markers, sections)
         
         # Extract other sections
-        certifications = self._extract_certifications(text)
-        projects = self._extract_projects(text)
-        summary = self._extract_summary(text)
+        certifications = self._extract_certifications(text, markers, sections)
+        projects = self._extract_projects(text, sections)
+        summary = self._extract_summary(text, sections)
         
         return ParsedResume(
             contact_info=contact_info,
@@ -125,13 +324,15 @@ class ParserService:
     
     def _parse_jd_text(self, text: str) -> ParsedJD:
         text = self._clean_text(text)
+        markers = text_scanner.scan(text)
+        sections = SectionIndex(text, "jd")
         
         skills = self._extract_skills(text)
-        required_years = self._extract_required_experience(text)
+        required_years = self._extract_required_experience(text, markers, sections)
         role_keywords = self._extract_role_keywords(text)
         required_tech = self._extract_required_technologies(text)
-        seniority = self._extract_seniority(text)
-        responsibilities = self._extract_responsibilities(text)
+        seniority = self._extract_seniority(text, markers)
+        responsibilities = self._extract_responsibilities(text, sections)
         
         return ParsedJD(
             skills=skills,
@@ -144,13 +345,20 @@ class ParserService:
         )
     
     def _clean_text(self, text: str) -> str:
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.\,\-\+\&\@]', ' ', text)
+        # Remove special characters but keep basic punctuation and bullets
+        text = _UNWANTED_CHARS_RE.sub(' ', text)
+        # Collapse spaces within lines, and runs of blank lines to one paragraph break
+        text = _SPACES_RE.sub(' ', text)
+        text = _LINE_BREAKS_RE.sub(lambda match: '\n\n' if match.group().count('\n') > 1 else '\n', text)
         return text.strip()
     
-    def _extract_contact_info(self, text: str) -> Dict[str, Optional[str]]:
+    def _extract_contact_info(
+        self,
+        text: str,
+        markers: Optional[ScanResult] = None,
+        sections: Optional[SectionIndex] = None,
+        entities: Optional[DocumentEntities] = None
+    ) -> Dict[str, Optional[str]]:
         contact_info = {
             'name': None,
             'email': None,
@@ -158,61 +366,56 @@ class ParserService:
             'location': None
         }
         
-        # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        markers = markers or text_scanner.scan(text)
+        sections = sections or SectionIndex(text, "resume")
+        header = markers.within(sections.spans('header'))
+        
+        # Extract email and phone, preferring the header over a footer or references
+        email_match = header.first('email') or markers.first('email')
         if email_match:
-            contact_info['email'] = email_match.group()
+            contact_info['email'] = email_match.text
         
-        # Extract phone
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, text)
+        phone_match = header.first('phone') or markers.first('phone')
         if phone_match:
-            contact_info['phone'] = phone_match.group()
+            contact_info['phone'] = phone_match.text
+        
+        # A PERSON entity from the header, else the first header line that looks like a name
+        if entities is not None and entities.name:
+            contact_info['name'] = entities.name
+            return contact_info
         
-        # Basic name extraction (first line that looks like a name)
-        lines = text.split('\n')
+        lines = sections.section_text('header').split('\n')
         for line in lines[:5]:  # Check first 5 lines
             line = line.strip()
             if len(line) > 2 and len(line) < 50 and not line.lower().startswith(('email', 'phone', 'address')):
-                if not contact_info['name']:
+                if '@' not in line and not any(char.isdigit() for char in line):
                     contact_info['name'] = line
                 break
         
         return contact_info
     
     def _extract_skills(self, text: str) -> List[str]:
-        # Common technical skills
-        skill_keywords = [
-            'python', 'javascript', 'java', 'react', 'node.js', 'sql', 'aws',
-            'docker', 'kubernetes', 'git', 'html', 'css', 'typescript',
-            'angular', 'vue', 'mongodb', 'postgresql', 'mysql', 'redis',
-            'elasticsearch', 'kafka', 'rabbitmq', 'jenkins', 'gitlab',
-            'agile', 'scrum', 'kanban', 'jira', 'confluence'
-        ]
-        
-        found_skills = []
-        text_lower = text.lower()
-        
-        for skill in skill_keywords:
-            if skill in text_lower:
-                found_skills.append(skill.title())
-        
-        return found_skills
+        # One pass over the text against the whole skill taxonomy
+        return get_skill_matcher().extract(text)
     
-    def _extract_experience(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_experience(
+        self,
+        text: str,
+        markers: Optional[ScanResult] = None,
+        sections: Optional[SectionIndex] = None,
+        entities: Optional[DocumentEntities] = None
+    ) -> List[Dict[str, Any]]:
         experience = []
-        
-        # Simple pattern matching for experience sections
-        # This is a basic implementation - in production, you'd want more sophisticated parsing
-        
-        # Look for date patterns
-        date_pattern = r'(\d{4})\s*[-–]\s*(\d{4}|\bpresent\b|\bcurrent\b)'
-        date_matches = re.finditer(date_pattern, text, re.IGNORECASE)
-        
-        for match in date_matches:
-            start_year = int(match.group(1))
-            end_year = match.group(2)
+        markers = markers or text_scanner.scan(text)
+        sections = sections or SectionIndex(text, "resume")
+        if entities is None:
+            entities = self.entities.extract(self.nlp, [(text, markers, sections)])[0]
+        
+        # Look for date ranges in the experience section (education dates are not experience)
+        spans = sections.spans('experience')
+        for match in markers.within(spans).all('date_range'):
+            start_year = int(match.groups[0])
+            end_year = match.groups[1]
             
             if end_year.lower() in ['present', 'current']:
                 end_year = datetime.now().year
@@ -221,14 +424,18 @@ class ParserService:
             
             years = end_year - start_year
             
-            # Extract surrounding text as description
-            start_pos = max(0, match.start() - 100)
-            end_pos = min(len(text), match.end() + 100)
+            # Extract surrounding text within the section as description
+            span_start, span_end = next(span for span in spans if span[0] <= match.start < span[1])
+            start_pos = max(span_start, match.start - 100)
+            end_pos = min(span_end, match.end + 100)
             description = text[start_pos:end_pos].strip()
             
+            # Employer and title from the entry's lines; empty when not found
+            company, title = entities.jobs.get(match.start, ('', ''))
+            
             experience.append({
-                'company': 'Company Name',  # Would need more sophisticated extraction
-                'title': 'Job Title',       # Would need more sophisticated extraction
+                'company': company,
+                'title': title,
                 'start_date': str(start_year),
                 'end_date': str(end_year),
                 'years': years,
@@ -237,67 +444,78 @@ class ParserService:
         
         return experience
     
-    def _extract_education(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_education(
+        self,
+        text: str,
+        markers: Optional[ScanResult] = None,
+        sections: Optional[SectionIndex] = None
+    ) -> List[Dict[str, Any]]:
         education = []
-        
-        # Look for degree patterns
-        degree_patterns = [
-            r'\b(bachelor|master|phd|b\.s\.|m\.s\.|ph\.d\.)\b',
-            r'\b(computer science|engineering|mathematics|physics)\b'
-        ]
-        
-        for pattern in degree_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Extract year
-                year_pattern = r'\b(19|20)\d{2}\b'
-                year_match = re.search(year_pattern, text[match.end():match.end()+50])
-                year = int(year_match.group()) if year_match else 0
-                
-                education.append({
-                    'degree': match.group().title(),
-                    'institution': 'Institution Name',  # Would need more sophisticated extraction
-                    'year': year
-                })
+        markers = markers or text_scanner.scan(text)
+        sections = sections or SectionIndex(text, "resume")
+        section = markers.within(sections.spans('education'))
+        
+        # Degrees, then fields of study, each with the first year that follows it
+        for match in section.all('degree') + section.all('field'):
+            education.append({
+                'degree': match.text.title(),
+                'institution': 'Institution Name',  # Would need more sophisticated extraction
+                'year': markers.year_after(match.end, 50) or 0
+            })
         
         return education
     
-    def _extract_certifications(self, text: str) -> List[str]:
-        cert_patterns = [
-            r'\b(aws|azure|gcp|cisco|microsoft|oracle|ibm)\s+(certified|professional|associate|expert)\b',
-            r'\b(pmp|scrum|agile|six\s+sigma|lean)\b'
-        ]
-        
-        certifications = []
-        for pattern in cert_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                certifications.append(match.group().title())
-        
-        return certifications
+    def _extract_certifications(
+        self,
+        text: str,
+        markers: Optional[ScanResult] = None,
+        sections: Optional[SectionIndex] = None
+    ) -> List[str]:
+        markers = markers or text_scanner.scan(text)
+        sections = sections or SectionIndex(text, "resume")
+        # Certifications are often listed under experience too, so without a section look everywhere
+        section = markers.within(sections.spans('certifications', fallback='all'))
+        return [match.text.title() for match in section.all('certification')]
     
-    def _extract_projects(self, text: str) -> List[str]:
+    def _extract_projects(self, text: str, sections: Optional[SectionIndex] = None) -> List[str]:
         # Look for project-related keywords
         project_keywords = ['project', 'developed', 'built', 'created', 'implemented']
         projects = []
+        budget = Budget()
+        sections = sections or SectionIndex(text, "resume")
         
-        sentences = text.split('.')
-        for sentence in sentences:
+        for sentence in _SENTENCE_BREAK_RE.split(sections.section_text('projects', fallback='all')):
             if any(keyword in sentence.lower() for keyword in project_keywords):
                 if len(sentence.strip()) > 20:  # Only include substantial descriptions
                     projects.append(sentence.strip())
+                    if len(projects) == 5:
+                        break
+            if budget.expired():
+                print(f"Project extraction stopped after {budget.elapsed_ms:.0f}ms")
+                break
         
-        return projects[:5]  # Limit to 5 projects
+        return projects  # Limit to 5 projects
     
-    def _extract_summary(self, text: str) -> str:
-        # Look for summary section
-        summary_patterns = [
-            r'\b(summary|objective|profile|about)\b.*?\.',
-            r'^[^.]{50,200}\.'
-        ]
-        
-        for pattern in summary_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+    def _extract_summary(self, text: str, sections: Optional[SectionIndex] = None) -> str:
+        sections = sections or SectionIndex(text, "resume")
+        
+        # The summary section's first paragraph
+        if sections.has('summary'):
+            for para in sections.section_text('summary').split('\n\n'):
+                if para.strip():
+                    return ' '.join(para.split())[:1000]
+        
+        # A document with headings but no summary one may open with an unlabelled
+        # summary below the contact lines
+        if len(sections.sections) > 1:
+            for line in sections.section_text('header').split('\n'):
+                if len(line) >= 80 and '@' not in line:
+                    return line.strip()[:1000]
+            return ""
+        
+        # Without headings, a summary-like sentence anywhere
+        for pattern in (text_scanner.SUMMARY_RE, text_scanner.LEAD_SENTENCE_RE):
+            match = pattern.search(text)
             if match:
                 return match.group().strip()
         
@@ -309,17 +527,20 @@ class ParserService:
         
         return ""
     
-    def _extract_required_experience(self, text: str) -> float:
-        patterns = [
-            r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s+)?experience',
-            r'experience:\s*(\d+)\+?\s*(?:years?|yrs?)',
-            r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:in\s+)?(?:the\s+)?field'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return float(match.group(1))
+    def _extract_required_experience(
+        self,
+        text: str,
+        markers: Optional[ScanResult] = None,
+        sections: Optional[SectionIndex] = None
+    ) -> float:
+        markers = markers or text_scanner.scan(text)
+        sections = sections or SectionIndex(text, "jd")
+        tags = ('years_experience', 'experience_years', 'years_field')
+        
+        # Requirements first; the role summary often states it too
+        match = markers.within(sections.spans('requirements')).first(*tags) or markers.first(*tags)
+        if match:
+            return float(match.groups[0])
         
         return 0.0
     
@@ -341,38 +562,34 @@ class ParserService:
     def _extract_required_technologies(self, text: str) -> List[str]:
         return self._extract_skills(text)  # Reuse skills extraction
     
-    def _extract_seniority(self, text: str) -> str:
-        seniority_patterns = [
-            (r'\b(junior|entry\s+level|junior\s+level)\b', 'junior'),
-            (r'\b(mid\s+level|intermediate)\b', 'mid-level'),
-            (r'\b(senior|senior\s+level)\b', 'senior'),
-            (r'\b(lead|principal|staff)\b', 'lead'),
-            (r'\b(architect|director|vp|cto)\b', 'executive')
-        ]
-        
-        text_lower = text.lower()
-        for pattern, level in seniority_patterns:
-            if re.search(pattern, text_lower):
-                return level
-        
-        return 'mid-level'  # Default
+    def _extract_seniority(self, text: str, markers: Optional[ScanResult] = None) -> str:
+        markers = markers or text_scanner.scan(text)
+        return markers.seniority() or 'mid-level'  # Default
     
-    def _extract_responsibilities(self, text: str) -> List[str]:
+    def _extract_responsibilities(self, text: str, sections: Optional[SectionIndex] = None) -> List[str]:
         responsibilities = []
+        budget = Budget()
+        sections = sections or SectionIndex(text, "jd")
+        
+        # Under a responsibilities heading every line is one, bullet or not
+        if sections.has('responsibilities'):
+            for line in sections.section_text('responsibilities').split('\n'):
+                line = line.strip().lstrip('•-* ').strip()
+                if len(line) > 3:
+                    responsibilities.append(line)
+                    if len(responsibilities) == 10:
+                        break
+            return responsibilities
+        
+        # Text blocks introducing responsibilities, then bullet points
+        for match in text_scanner.RESPONSIBILITY_RE.finditer(text):
+            responsibilities.append(match.group().strip())
+            if len(responsibilities) == 10 or budget.expired():
+                return responsibilities
+        
+        for match in text_scanner.BULLET_RE.finditer(text):
+            responsibilities.append(match.group(1).strip())
+            if len(responsibilities) == 10 or budget.expired():
+                break
         
-        # Look for responsibility patterns
-        resp_patterns = [
-            r'\b(responsible\s+for|duties|responsibilities?|key\s+responsibilities?)\b.*?\.',
-            r'•\s*(.*?)(?=\n|$)',
-            r'-\s*(.*?)(?=\n|$)'
-        ]
-        
-        for pattern in resp_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                if pattern in resp_patterns[1:]:  # Bullet points
-                    responsibilities.append(match.group(1).strip())
-                else:  # Text blocks
-                    responsibilities.append(match.group().strip())
-        
-        return responsibilities[:10]  # Limit to 10 responsibilities
+        return responsibilities  # Limit to 10 responsibilities
@@ -1,8 +1,10 @@
 import numpy as np
-from typing import Dict, List, Any, Tuple
-from fuzzywuzzy import fuzz
+from typing import Dict, List, Any, Optional, Tuple
 from app.schemas.scoring import ParsedResume, ParsedJD
 from app.core.config import settings
+from app.services.skill_matcher import get_skill_matcher
+from app.services.fuzzy_matcher import FuzzyIndex
+from app.services.job_profile import CompiledJobProfile, JobProfileCache
 import re
 
 class ScoringEngine:
@@ -15,24 +17,11 @@ class ScoringEngine:
             'formatting': settings.FORMATTING_WEIGHT
         }
         
-        # dictionary for skills
-        self.skill_synonyms = {
-            'aws': ['amazon web services', 'amazon', 'ec2', 's3', 'lambda'],
-            'javascript': ['js', 'ecmascript'],
-            'python': ['py'],
-            'react': ['reactjs', 'react.js'],
-            'node.js': ['nodejs', 'node'],
-            'typescript': ['ts'],
-            'html': ['html5'],
-            'css': ['css3'],
-            'sql': ['mysql', 'postgresql', 'postgres', 'oracle', 'sql server'],
-            'docker': ['containerization'],
-            'kubernetes': ['k8s', 'kube'],
-            'git': ['version control', 'github', 'gitlab'],
-            'agile': ['scrum', 'kanban', 'lean'],
-            'machine learning': ['ml', 'ai', 'artificial intelligence'],
-            'data science': ['data analytics', 'data analysis']
-        }
+        # Skill names, aliases and implied skills come from the taxonomy
+        self.skill_matcher = get_skill_matcher()
+        
+        # JD-side work (keywords, importance, expanded skills) is compiled once per JD
+        self.job_profiles = JobProfileCache(self.skill_matcher)
     
     async def score_resume(
         self,
@@ -43,10 +32,12 @@ class ScoringEngine:
     ) -> Dict[str, Any]:
         
         try:
+            profile = self.job_profiles.get(parsed_jd)
+            
             # Compute sub-scores
-            keyword_score = await self._compute_keyword_match_score(parsed_resume, parsed_jd)
-            skills_score = await self._compute_skills_score(parsed_resume, parsed_jd)
-            experience_score = await self._compute_experience_score(parsed_resume, parsed_jd)
+            keyword_score = await self._compute_keyword_match_score(parsed_resume, profile)
+            skills_score = await self._compute_skills_score(parsed_resume, profile)
+            experience_score = await self._compute_experience_score(parsed_resume, profile)
             education_score = await self._compute_education_score(parsed_resume, parsed_jd)
             formatting_score = await self._compute_formatting_score(parsed_resume)
             
@@ -95,21 +86,17 @@ class ScoringEngine:
     async def _compute_keyword_match_score(
         self, 
         parsed_resume: ParsedResume, 
-        parsed_jd: ParsedJD
+        profile: CompiledJobProfile
     ) -> Dict[str, Any]:
         
-        # Extract keywords from JD
-        jd_keywords = self._extract_jd_keywords(parsed_jd)
-        
-        # Match keywords against resume
+        # Match the JD's keywords against resume
+        resume_skills = self._expand_skills_with_synonyms(set(parsed_resume.skills))
+        text_matches = FuzzyIndex(parsed_resume.raw_text).match(keyword for keyword, _ in profile.keywords)
         matched_keywords = []
         missing_keywords = []
         
-        for keyword_info in jd_keywords:
-            keyword = keyword_info['keyword']
-            importance = keyword_info['importance']
-            
-            if self._keyword_exists_in_resume(keyword, parsed_resume):
+        for keyword, importance in profile.keywords:
+            if self._keyword_exists_in_resume(keyword, parsed_resume, resume_skills, text_matches, profile):
                 matched_keywords.append(keyword)
             else:
                 missing_keywords.append({
@@ -117,30 +104,9 @@ class ScoringEngine:
                     'importance': importance
                 })
         
-        # Calculate score
-        total_keywords = len(jd_keywords)
-        if total_keywords == 0:
-            score = 100
-        else:
-            # Weight by importance
-            required_matches = sum(1 for k in matched_keywords if k in [kw['keyword'] for kw in jd_keywords if kw['importance'] == 'required'])
-            preferred_matches = sum(1 for k in matched_keywords if k in [kw['keyword'] for kw in jd_keywords if kw['importance'] == 'preferred'])
-            nice_matches = sum(1 for k in matched_keywords if k in [kw['keyword'] for kw in jd_keywords if kw['importance'] == 'nice-to-have'])
-            
-            required_total = sum(1 for kw in jd_keywords if kw['importance'] == 'required')
-            preferred_total = sum(1 for kw in jd_keywords if kw['importance'] == 'preferred')
-            nice_total = sum(1 for kw in jd_keywords if kw['importance'] == 'nice-to-have')
-            
-            score = 0
-            if required_total > 0:
-                score += (required_matches / required_total) * 50
-            if preferred_total > 0:
-                score += (preferred_matches / preferred_total) * 30
-            if nice_total > 0:
-                score += (nice_matches / nice_total) * 20
-        
+        # Calculate score, weighted by importance
         return {
-            'score': int(score),
+            'score': profile.keyword_score(matched_keywords),
             'matched_keywords': matched_keywords,
             'missing_keywords': missing_keywords
         }
@@ -148,15 +114,14 @@ class ScoringEngine:
     async def _compute_skills_score(
         self, 
         parsed_resume: ParsedResume, 
-        parsed_jd: ParsedJD
+        profile: CompiledJobProfile
     ) -> Dict[str, Any]:
         
         resume_skills = set(skill.lower() for skill in parsed_resume.skills)
-        jd_skills = set(skill.lower() for skill in parsed_jd.skills)
         
-        # Expand skills using synonyms
+        # Expand skills using synonyms (the JD's are expanded in its profile)
         expanded_resume_skills = self._expand_skills_with_synonyms(resume_skills)
-        expanded_jd_skills = self._expand_skills_with_synonyms(jd_skills)
+        expanded_jd_skills = profile.expanded_skills
         
         # Find matches
         matched_skills = []
@@ -181,11 +146,11 @@ class ScoringEngine:
     async def _compute_experience_score(
         self, 
         parsed_resume: ParsedResume, 
-        parsed_jd: ParsedJD
+        profile: CompiledJobProfile
     ) -> Dict[str, Any]:
         
         resume_years = parsed_resume.total_years_experience
-        required_years = parsed_jd.required_years_experience
+        required_years = profile.required_years
         
         # Calculate experience score
         if required_years == 0:
@@ -195,11 +160,13 @@ class ScoringEngine:
         else:
             score = max(0, int((resume_years / required_years) * 100))
         
-        # Check role-specific experience
+        # Check role-specific experience (role keywords are lowercased in the profile)
+        roles = profile.roles
         experience_matches = []
         for exp in parsed_resume.experience:
             # Simple role matching
-            if any(role in exp['title'].lower() for role in parsed_jd.role_keywords):
+            title = (exp.get('title') or '').lower()
+            if title and any(role in title for role in roles):
                 experience_matches.append({
                     'req': f"{required_years}+ yrs experience",
                     'candidate': f"{exp['years']} yrs",
@@ -298,71 +265,38 @@ class ScoringEngine:
         
         return int(overall_score)
     
-    def _extract_jd_keywords(self, parsed_jd: ParsedJD) -> List[Dict[str, str]]:
-        keywords = []
-        text = parsed_jd.raw_text.lower()
-        
-        # Extract skills and technologies
-        for skill in parsed_jd.skills:
-            importance = self._determine_keyword_importance(skill, text)
-            keywords.append({
-                'keyword': skill,
-                'importance': importance
-            })
-        
-        # Extract role keywords
-        for role in parsed_jd.role_keywords:
-            importance = self._determine_keyword_importance(role, text)
-            keywords.append({
-                'keyword': role,
-                'importance': importance
-            })
-        
-        return keywords
-    
-    def _determine_keyword_importance(self, keyword: str, text: str) -> str:
-        text_lower = text.lower()
-        
-        # Look for importance indicators around the keyword
-        context_start = max(0, text_lower.find(keyword.lower()) - 50)
-        context_end = min(len(text_lower), text_lower.find(keyword.lower()) + len(keyword) + 50)
-        context = text_lower[context_start:context_end]
-        
-        if any(word in context for word in ['required', 'must', 'essential', 'mandatory']):
-            return 'required'
-        elif any(word in context for word in ['preferred', 'desired', 'nice to have', 'bonus']):
-            return 'preferred'
-        else:
-            return 'nice-to-have'
-    
-    def _keyword_exists_in_resume(self, keyword: str, parsed_resume: ParsedResume) -> bool:
-        text = parsed_resume.raw_text.lower()
+    def _keyword_exists_in_resume(
+        self,
+        keyword: str,
+        parsed_resume: ParsedResume,
+        resume_skills: Optional[set] = None,
+        text_matches: Optional[Dict[str, bool]] = None,
+        profile: Optional[CompiledJobProfile] = None
+    ) -> bool:
         keyword_lower = keyword.lower()
         
-        # Exact match
-        if keyword_lower in text:
-            return True
-        
-        # Fuzzy match
-        if fuzz.partial_ratio(keyword_lower, text) > 80:
+        # Exact or fuzzy match in the text, resolved for all JD keywords at once when given
+        if text_matches is None:
+            text_matches = FuzzyIndex(parsed_resume.raw_text).match([keyword_lower])
+        if text_matches.get(keyword_lower):
             return True
         
         # Check synonyms
-        if keyword_lower in self.skill_synonyms:
-            for synonym in self.skill_synonyms[keyword_lower]:
-                if synonym in text:
-                    return True
+        if resume_skills is None:
+            resume_skills = self._expand_skills_with_synonyms(set(parsed_resume.skills))
+        if profile is not None and keyword_lower in profile.canonical:
+            canonical = profile.canonical[keyword_lower]
+        else:
+            canonical = self.skill_matcher.canonical(keyword_lower)
+            canonical = canonical.lower() if canonical is not None else None
+        if canonical is not None and canonical in resume_skills:
+            return True
         
         return False
     
     def _expand_skills_with_synonyms(self, skills: set) -> set:
-        expanded = skills.copy()
-        
-        for skill in skills:
-            if skill in self.skill_synonyms:
-                expanded.update(self.skill_synonyms[skill])
-        
-        return expanded
+        # Canonical names plus implied skills, so "postgres" satisfies "SQL"
+        return self.skill_matcher.expand(skills)
     
     async def _generate_suggestions(
         self,
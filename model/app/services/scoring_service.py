@@ -1,18 +1,30 @@
 import asyncio
+import time
+import numpy as np
 from typing import Dict, List, Any, Optional
 from fastapi import UploadFile
 import uuid
-from app.schemas.scoring import ScoringResponse, ParsedResume, ParsedJD
+from concurrent.futures.process import BrokenProcessPool
+from app.schemas.scoring import ScoringResponse, ParsedResume, ParsedJD, PrescreenMatch, PrescreenResponse
+from app.schemas.search import CandidateSearchResponse
 from app.services.parser_service import ParserService
+from app.services.parse_pool import ParseTimeout
+from app.services.upload_intake import UploadRejected
 from app.services.embedding_service import EmbeddingService
+from app.services.inference_executor import InferenceQueueFull
+from app.services.embedding_batcher import EmbeddingBatcher
 from app.services.scoring_engine import ScoringEngine
+from app.services.candidate_search_service import CandidateSearchService, JD_STORE, RESUME_STORE
 from app.core.config import settings
+from app.core.cache import content_key
 
 class ScoringService:
     def __init__(self):
         self.parser_service = ParserService()
         self.embedding_service = EmbeddingService()
+        self.embedding_batcher = EmbeddingBatcher(self.embedding_service)
         self.scoring_engine = ScoringEngine()
+        self.candidate_search = CandidateSearchService(self.embedding_service, self.scoring_engine)
     
     async def analyze_resume(
         self,
@@ -20,7 +32,8 @@ class ScoringService:
         resume_file: UploadFile,
         jd_file: Optional[UploadFile] = None,
         jd_text: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        model_name: Optional[str] = None
     ) -> ScoringResponse:
         """
         Asynchronous resume analysis
@@ -35,9 +48,19 @@ class ScoringService:
             else:
                 parsed_jd = await self.parser_service.parse_jd_text(jd_text or "")
             
-            # Generate embeddings
-            resume_embeddings = await self.embedding_service.get_embeddings([parsed_resume.raw_text])
-            jd_embeddings = await self.embedding_service.get_embeddings([parsed_jd.raw_text])
+            # Generate embeddings (batched with concurrent requests)
+            model_name = self.embedding_service.resolve_model_name(model_name)
+            resume_embeddings, jd_embeddings = await asyncio.gather(
+                self.embedding_batcher.embed([parsed_resume.raw_text], model_name),
+                self.embedding_batcher.embed([parsed_jd.raw_text], model_name)
+            )
+            
+            # Persist embeddings so they outlive the request (file writes, and
+            # shard round trips when sharded, so off the event loop)
+            await asyncio.to_thread(
+                self._persist_embeddings,
+                parsed_resume, parsed_jd, resume_embeddings[0], jd_embeddings[0], model_name, metadata
+            )
             
             # Score the resume
             scoring_result = await self.scoring_engine.score_resume(
@@ -61,19 +84,40 @@ class ScoringService:
                 explanations=scoring_result["explanations"],
                 confidence=scoring_result["confidence"],
                 raw_parsed_resume=parsed_resume.raw_text,
-                raw_parsed_jd=parsed_jd.raw_text
+                raw_parsed_jd=parsed_jd.raw_text,
+                embedding_model=model_name
             )
             
+        except (UploadRejected, InferenceQueueFull, ParseTimeout, BrokenProcessPool):
+            raise
         except Exception as e:
             raise Exception(f"Error in resume analysis: {str(e)}")
     
+    def _persist_embeddings(
+        self,
+        parsed_resume: ParsedResume,
+        parsed_jd: ParsedJD,
+        resume_vector: np.ndarray,
+        jd_vector: np.ndarray,
+        model_name: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        # Only the default model's resume vectors join the search corpus
+        resume_id = content_key(parsed_resume.raw_text)
+        if model_name == self.embedding_service.model_name:
+            self.candidate_search.index_resume(resume_id, parsed_resume, resume_vector, metadata)
+        else:
+            self.embedding_service.store_embedding(RESUME_STORE, resume_id, resume_vector, model_name)
+        self.embedding_service.store_embedding(JD_STORE, content_key(parsed_jd.raw_text), jd_vector, model_name)
+    
     async def analyze_resume_sync(
         self,
         request_id: str,
         resume_file: UploadFile,
         jd_file: Optional[UploadFile] = None,
         jd_text: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        model_name: Optional[str] = None
     ) -> ScoringResponse:
         """
         Synchronous resume analysis for small inputs
@@ -83,5 +127,95 @@ class ScoringService:
             resume_file=resume_file,
             jd_file=jd_file,
             jd_text=jd_text,
-            metadata=metadata
+            metadata=metadata,
+            model_name=model_name
         )
+    
+    async def search_candidates(
+        self,
+        request_id: str,
+        jd_file: Optional[UploadFile] = None,
+        jd_text: Optional[str] = None,
+        top_k: int = 50,
+        shortlist_size: Optional[int] = None,
+        nprobe: Optional[int] = None
+    ) -> CandidateSearchResponse:
+        """
+        Rank the stored resume corpus against a JD
+        """
+        try:
+            if jd_file:
+                parsed_jd = await self.parser_service.parse_jd_file(jd_file)
+            else:
+                parsed_jd = await self.parser_service.parse_jd_text(jd_text or "")
+            
+            jd_embeddings = await self.embedding_batcher.embed([parsed_jd.raw_text])
+            
+            return await self.candidate_search.search(
+                request_id=request_id,
+                parsed_jd=parsed_jd,
+                jd_vector=jd_embeddings[0],
+                top_k=top_k,
+                shortlist_size=shortlist_size,
+                nprobe=nprobe
+            )
+            
+        except (UploadRejected, InferenceQueueFull, ParseTimeout, BrokenProcessPool):
+            raise
+        except Exception as e:
+            raise Exception(f"Error in candidate search: {str(e)}")
+    
+    async def prescreen_resumes(
+        self,
+        request_id: str,
+        resume_files: List[UploadFile],
+        jd_file: Optional[UploadFile] = None,
+        jd_text: Optional[str] = None,
+        top_k: Optional[int] = None
+    ) -> PrescreenResponse:
+        """
+        Bulk pre-screening of many resumes with the fast hashed TF-IDF tier
+        """
+        try:
+            started = time.perf_counter()
+            
+            if jd_file:
+                parsed_jd = await self.parser_service.parse_jd_file(jd_file)
+            else:
+                parsed_jd = await self.parser_service.parse_jd_text(jd_text or "")
+            
+            parsed_resumes = await self.parser_service.parse_resumes(resume_files)
+            
+            indices, scores = await self.embedding_service.prescreen(
+                parsed_jd.raw_text,
+                [parsed_resume.raw_text for parsed_resume in parsed_resumes],
+                top_k
+            )
+            
+            return PrescreenResponse(
+                request_id=request_id,
+                method="hashing-tfidf",
+                results=[
+                    PrescreenMatch(filename=resume_files[i].filename, rank=rank + 1, score=float(score))
+                    for rank, (i, score) in enumerate(zip(indices, scores))
+                ],
+                elapsed_ms=round((time.perf_counter() - started) * 1000.0, 3)
+            )
+            
+        except (UploadRejected, InferenceQueueFull, ParseTimeout, BrokenProcessPool):
+            raise
+        except Exception as e:
+            raise Exception(f"Error in resume prescreening: {str(e)}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Runtime statistics for the scoring pipeline
+        """
+        return {
+            "embedding": self.embedding_service.get_model_info(),
+            "batching": self.embedding_batcher.get_stats(),
+            "inference": self.embedding_service.executor.get_stats(),
+            "parsing": self.parser_service.get_stats(),
+            "search": self.candidate_search.get_stats(),
+            "job_profiles": self.scoring_engine.job_profiles.get_stats()
+        }
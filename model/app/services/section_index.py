@@ -0,0 +1,122 @@
+import re
+from typing import Dict, List, Tuple
+
+# Heading titles per section; matched case-insensitively against whole lines
+RESUME_SECTIONS: Dict[str, List[str]] = {
+    "summary": [
+        "summary", "professional summary", "career summary", "profile", "professional profile",
+        "objective", "career objective", "about", "about me",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history", "internships", "internship",
+    ],
+    "education": [
+        "education", "academic background", "academics", "educational qualifications", "qualifications",
+    ],
+    "skills": [
+        "skills", "technical skills", "key skills", "core skills", "core competencies", "technologies",
+        "tech stack", "tools",
+    ],
+    "projects": ["projects", "personal projects", "academic projects", "key projects", "selected projects"],
+    "certifications": ["certifications", "certificates", "certification", "licenses", "courses", "awards"],
+}
+
+JD_SECTIONS: Dict[str, List[str]] = {
+    "summary": ["about the role", "about us", "overview", "summary", "the role", "job summary", "description"],
+    "responsibilities": [
+        "responsibilities", "key responsibilities", "duties", "what you will do", "what you ll do",
+        "your role", "the job",
+    ],
+    "requirements": [
+        "requirements", "qualifications", "minimum qualifications", "preferred qualifications",
+        "what we are looking for", "what we re looking for", "must have", "nice to have", "skills",
+        "required skills", "who you are",
+    ],
+    "benefits": ["benefits", "perks", "what we offer"],
+}
+
+# A heading is a short line: the title, optionally "& <a few words>", and an optional colon
+_MAX_HEADING_CHARS = 48
+
+def _heading_re(sections: Dict[str, List[str]]) -> "re.Pattern":
+    titles = sorted({title for names in sections.values() for title in names}, key=len, reverse=True)
+    alternatives = "|".join(r"[ \t]+".join(re.escape(word) for word in title.split()) for title in titles)
+    return re.compile(
+        rf"^[ \t]*(?:[#•\-*][ \t]*)?(?P<title>{alternatives})"
+        rf"(?P<suffix>[ \t]*(?:&|and)[ \t]*[A-Za-z][A-Za-z \t]{{0,24}})?[ \t]*(?P<colon>:?)[ \t]*(?P<rest>[^\n]*)$",
+        re.IGNORECASE | re.MULTILINE
+    )
+
+_HEADING_RES = {"resume": _heading_re(RESUME_SECTIONS), "jd": _heading_re(JD_SECTIONS)}
+_TITLES = {
+    kind: {title: name for name, titles in sections.items() for title in titles}
+    for kind, sections in (("resume", RESUME_SECTIONS), ("jd", JD_SECTIONS))
+}
+
+Span = Tuple[int, int]
+
+class SectionIndex:
+    """
+    Character spans of a document's sections, built once per document.
+
+    Headings are recognised on whole lines ("EXPERIENCE", "Work History:")
+    and, when a colon follows the title, at the start of a line that
+    carries content ("Skills: Python, SQL"). Everything before the first
+    heading is the header; a section runs until the next heading.
+    """
+
+    def __init__(self, text: str, kind: str = "resume"):
+        self.text = text
+        self.kind = kind
+        self.sections: List[Tuple[str, int, int]] = []  # (name, start, end), in text order
+        self.headings: List[Tuple[str, int, int]] = []  # (title, start, end) of the heading itself
+        self._build()
+
+    def _build(self) -> None:
+        titles = _TITLES[self.kind]
+        starts: List[Tuple[str, int, int]] = []
+        for match in _HEADING_RES[self.kind].finditer(self.text):
+            rest = match.group("rest")
+            # Content after the title only counts with a colon ("Skills: ...")
+            if rest and not match.group("colon"):
+                continue
+            if len(match.group()) - len(rest) > _MAX_HEADING_CHARS:
+                continue
+            name = titles.get(" ".join(match.group("title").lower().split()))
+            if name is None:
+                continue
+            content_start = match.start("rest") if rest else min(match.end() + 1, len(self.text))
+            starts.append((name, match.start(), content_start))
+            self.headings.append((match.group("title"), match.start(), content_start))
+
+        header_end = starts[0][1] if starts else len(self.text)
+        self.sections.append(("header", 0, header_end))
+        for index, (name, _, content_start) in enumerate(starts):
+            end = starts[index + 1][1] if index + 1 < len(starts) else len(self.text)
+            self.sections.append((name, content_start, end))
+
+    def has(self, name: str) -> bool:
+        return any(section == name for section, _, _ in self.sections)
+
+    def spans(self, name: str, fallback: str = "unclaimed") -> List[Span]:
+        """
+        Spans of a section. When the document has none, fallback "unclaimed"
+        gives the parts no other recognised section covers (the header, or
+        the whole text without headings) and "all" gives the whole text.
+        """
+        spans = [(start, end) for section, start, end in self.sections if section == name and end > start]
+        if spans or self.has(name):
+            return spans
+        if fallback == "all" or len(self.sections) == 1:
+            return [(0, len(self.text))]
+        return [(start, end) for section, start, end in self.sections if section == "header" and end > start]
+
+    def section_text(self, name: str, fallback: str = "unclaimed") -> str:
+        return "\n".join(self.text[start:end].strip() for start, end in self.spans(name, fallback))
+
+    def get_stats(self) -> Dict[str, int]:
+        stats: Dict[str, int] = {}
+        for name, start, end in self.sections:
+            stats[name] = stats.get(name, 0) + end - start
+        return stats
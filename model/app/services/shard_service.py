@@ -0,0 +1,351 @@
+import argparse
+import hashlib
+import multiprocessing
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
+from multiprocessing.connection import Connection, Listener, answer_challenge, deliver_challenge
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services import vector_ops
+from app.services.ann_index import StoreIndex
+from app.services.dimension_reduction import EmbeddingProjector
+from app.services.vector_store import VectorStore
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+# Shards exchange pickles, so only authenticated peers may send anything
+MIN_AUTHKEY_LENGTH = 16
+
+def shard_authkey(authkey: Optional[str] = None) -> bytes:
+    """The shared shard secret; there is no default, so a missing or short one is refused"""
+    authkey = authkey or settings.SHARD_AUTHKEY
+    if len(authkey) < MIN_AUTHKEY_LENGTH:
+        raise ValueError(f"SHARD_AUTHKEY must be set to a secret of at least {MIN_AUTHKEY_LENGTH} characters to use shards")
+    return authkey.encode("utf-8")
+
+def _set_receive_timeout(connection: Connection, timeout: Optional[float]) -> None:
+    # Bounds blocking reads (the auth handshake) on the connection's socket; None clears it
+    seconds = timeout or 0.0
+    with socket.socket(fileno=os.dup(connection.fileno())) as sock:
+        sock.setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVTIMEO,
+            struct.pack("ll", int(seconds), int((seconds - int(seconds)) * 1000000))
+        )
+
+def connect(address: str, authkey: bytes, timeout: float) -> Connection:
+    """Authenticated connection to a shard, giving up after timeout instead of hanging on a dead host"""
+    sock = socket.create_connection(parse_address(address), timeout=timeout)
+    sock.settimeout(None)
+    connection = Connection(sock.detach())
+    try:
+        _set_receive_timeout(connection, timeout)
+        answer_challenge(connection, authkey)
+        deliver_challenge(connection, authkey)
+        _set_receive_timeout(connection, None)
+    except BaseException:
+        connection.close()
+        raise
+    return connection
+
+def shard_for(vector_id: str, num_shards: int) -> int:
+    # Stable across processes and restarts, unlike hash()
+    return int(hashlib.md5(vector_id.encode("utf-8")).hexdigest()[:8], 16) % num_shards
+
+class ShardServer:
+    """
+    Serves one partition of the vector corpus to ShardClients.
+
+    Each connection is handled on its own thread; requests are pickled
+    dicts with an "op" key and replies carry either "result" or "error".
+    Nothing is unpickled before the peer has passed the authkey handshake,
+    which runs on the connection's thread with a deadline so a stalled
+    peer cannot hold up accept().
+    """
+
+    def __init__(self, directory: str, dimension: int, dtype: str = "float16", authkey: Optional[bytes] = None):
+        self.authkey = authkey or shard_authkey()
+        self.index = StoreIndex(
+            VectorStore(
+                directory=directory,
+                dimension=dimension,
+                dtype=dtype,
+                compact_ratio=settings.VECTOR_STORE_COMPACT_RATIO
+            ),
+            min_index_size=settings.ANN_MIN_INDEX_SIZE,
+            n_lists=settings.ANN_NLIST,
+            projector=EmbeddingProjector.load_configured(dimension)
+        )
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op == "add":
+            return [self.index.add(vector_id, vector) for vector_id, vector in zip(request["ids"], request["vectors"])]
+        if op == "delete":
+            return self.index.delete(request["id"])
+        if op == "get":
+            return self.index.get_vectors(request["ids"])
+        if op == "search":
+            results, method = self.index.search(request["query"], request["k"], nprobe=request.get("nprobe") or settings.ANN_NPROBE)
+            return {"results": results, "index": method, "live": len(self.index.store)}
+        if op == "stats":
+            return self.index.get_stats()
+        raise ValueError(f"Unknown shard op: {op}")
+
+    def _serve_connection(self, connection: Connection) -> None:
+        with connection:
+            try:
+                _set_receive_timeout(connection, settings.SHARD_CONNECT_TIMEOUT_MS / 1000.0)
+                deliver_challenge(connection, self.authkey)
+                answer_challenge(connection, self.authkey)
+                _set_receive_timeout(connection, None)
+            except Exception as e:
+                print(f"Rejected shard connection: {e!r}")
+                return
+
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    reply = {"result": self.handle(request)}
+                except Exception as e:
+                    reply = {"error": str(e)}
+
+                try:
+                    connection.send(reply)
+                except (OSError, ValueError):
+                    return
+
+    def serve(self, listener: Listener) -> None:
+        while True:
+            try:
+                connection = listener.accept()
+            except Exception as e:
+                print(f"Error accepting shard connection: {e}")
+                continue
+            threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+def serve_shard(
+    directory: str,
+    host: str,
+    port: int,
+    dimension: int,
+    dtype: str = "float16",
+    authkey: Optional[str] = None,
+    ready: Optional[Any] = None
+) -> None:
+    # Refuse to start without a secret, before opening the port
+    key = shard_authkey(authkey)
+    server = ShardServer(directory, dimension, dtype, key)
+    # The handshake runs per connection thread (ShardServer), not in accept()
+    listener = Listener((host, port))
+    address = "%s:%d" % listener.address
+    print(f"Shard {directory} serving on {address}")
+    if ready is not None:
+        ready.put(address)
+    server.serve(listener)
+
+def spawn_local_shards(
+    num_shards: int,
+    base_directory: str,
+    dimension: int,
+    dtype: str = "float16",
+    host: str = "127.0.0.1",
+    authkey: Optional[str] = None
+) -> Tuple[List[multiprocessing.Process], List[str]]:
+    """
+    Start shard servers as local worker processes on free ports.
+
+    Returns the processes and their "host:port" addresses, ready to be used
+    as VECTOR_SHARDS.
+    """
+    authkey = shard_authkey(authkey).decode("utf-8")
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    processes = []
+    for i in range(num_shards):
+        process = context.Process(
+            target=serve_shard,
+            args=(f"{base_directory}/shard-{i}", host, 0, dimension, dtype, authkey, ready),
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+
+    addresses = [ready.get(timeout=60) for _ in processes]
+    return processes, addresses
+
+class ShardClient:
+    """
+    Pooled connections to one shard server with connect and per-request
+    timeouts. A shard that cannot be reached is not retried for
+    SHARD_RETRY_S, so requests to it fail at once instead of each waiting
+    out the connect timeout.
+    """
+
+    def __init__(self, address: str, authkey: Optional[str] = None, pool_size: int = 4):
+        self.address = address
+        self._authkey = shard_authkey(authkey)
+        self._pool: "queue.LifoQueue[Connection]" = queue.LifoQueue(maxsize=pool_size)
+        self._down_until = 0.0
+
+    def _connect(self) -> Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        if time.monotonic() < self._down_until:
+            raise ConnectionError(f"Shard {self.address} is down; retrying in {self._down_until - time.monotonic():.1f}s")
+        try:
+            return connect(self.address, self._authkey, settings.SHARD_CONNECT_TIMEOUT_MS / 1000.0)
+        except (OSError, EOFError) as e:
+            self._down_until = time.monotonic() + settings.SHARD_RETRY_S
+            raise ConnectionError(f"Shard {self.address} unreachable: {e!r}") from e
+
+    def request(self, payload: Dict[str, Any], timeout: float) -> Any:
+        connection = self._connect()
+        try:
+            connection.send(payload)
+            if not connection.poll(timeout):
+                raise TimeoutError(f"Shard {self.address} timed out after {timeout * 1000.0:.0f}ms")
+            reply = connection.recv()
+        except BaseException:
+            # The late reply would desynchronise this connection, so drop it
+            connection.close()
+            raise
+
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+        if "error" in reply:
+            raise RuntimeError(f"Shard {self.address}: {reply['error']}")
+        return reply["result"]
+
+class ShardedVectorIndex:
+    """
+    Scatter-gather client over a set of shard servers.
+
+    Writes are routed to one shard by a stable hash of the id. Searches go
+    to every shard in parallel, the per-shard top-k lists are merged, and
+    shards that fail or miss the deadline are reported instead of failing
+    the query.
+    """
+
+    def __init__(self, addresses: List[str], timeout_ms: Optional[int] = None):
+        if not addresses:
+            raise ValueError("At least one shard address is required")
+        self.shards = [ShardClient(address) for address in addresses]
+        self.timeout = (timeout_ms or settings.SHARD_TIMEOUT_MS) / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards) * 2, thread_name_prefix="shard")
+
+        # Live vectors per shard, as of its last search reply
+        self._live: Dict[int, int] = {}
+
+        # Counters
+        self.queries = 0
+        self.partial_queries = 0
+
+    def _shard(self, vector_id: str) -> ShardClient:
+        return self.shards[shard_for(vector_id, len(self.shards))]
+
+    def add(self, vector_id: str, vector: np.ndarray) -> bool:
+        return self._shard(vector_id).request(
+            {"op": "add", "ids": [vector_id], "vectors": np.atleast_2d(vector)},
+            self.timeout
+        )[0]
+
+    def delete(self, vector_id: str) -> bool:
+        return self._shard(vector_id).request({"op": "delete", "id": vector_id}, self.timeout)
+
+    def get_vectors(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        grouped: Dict[int, List[str]] = {}
+        for vector_id in ids:
+            grouped.setdefault(shard_for(vector_id, len(self.shards)), []).append(vector_id)
+
+        vectors: Dict[str, np.ndarray] = {}
+        for shard, result in self._scatter({
+            shard: {"op": "get", "ids": shard_ids} for shard, shard_ids in grouped.items()
+        })[0].items():
+            vectors.update(result)
+        return vectors
+
+    def _scatter(self, requests: Dict[int, Dict[str, Any]]) -> Tuple[Dict[int, Any], List[str]]:
+        futures = {
+            self._executor.submit(self.shards[shard].request, payload, self.timeout): shard
+            for shard, payload in requests.items()
+        }
+        done, _ = wait(futures, timeout=self.timeout * 1.5)
+
+        results: Dict[int, Any] = {}
+        missing: List[str] = []
+        for future, shard in futures.items():
+            if future in done and future.exception() is None:
+                results[shard] = future.result()
+            else:
+                error = future.exception() if future in done else "no reply"
+                print(f"Shard {self.shards[shard].address} unavailable: {error!r}")
+                missing.append(self.shards[shard].address)
+        return results, missing
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[List[Tuple[str, float]], str, List[str]]:
+        query = vector_ops.normalize(query)
+        replies, missing = self._scatter({
+            shard: {"op": "search", "query": query, "k": k, "nprobe": nprobe}
+            for shard in range(len(self.shards))
+        })
+
+        # Merge the per-shard top-k lists
+        ids: List[str] = []
+        scores: List[float] = []
+        for shard, reply in replies.items():
+            self._live[shard] = reply["live"]
+            for vector_id, score in reply["results"]:
+                ids.append(vector_id)
+                scores.append(score)
+
+        indices, top_scores = vector_ops.top_k(np.array(scores, dtype=np.float32), k)
+
+        self.queries += 1
+        if missing:
+            self.partial_queries += 1
+
+        return [(ids[i], float(score)) for i, score in zip(indices, top_scores)], "sharded", missing
+
+    def live_count(self) -> int:
+        """Corpus size from the counts shards return with search results, without another round trip"""
+        return sum(self._live.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        replies, missing = self._scatter({shard: {"op": "stats"} for shard in range(len(self.shards))})
+        return {
+            "shards": {self.shards[shard].address: stats for shard, stats in replies.items()},
+            "unavailable": missing,
+            "queries": self.queries,
+            "partial_queries": self.partial_queries
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve one shard of the resume vector corpus")
+    parser.add_argument("--directory", required=True)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind; other hosts need an explicit address (and SHARD_AUTHKEY set)")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--dimension", type=int, default=settings.EMBEDDING_DIMENSION)
+    parser.add_argument("--dtype", default=settings.VECTOR_STORE_DTYPE)
+    args = parser.parse_args()
+
+    serve_shard(args.directory, args.host, args.port, args.dimension, args.dtype)
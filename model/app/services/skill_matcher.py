@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.startup import startup_report
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skill_taxonomy.json")
+
+# Words of a skill name: keeps "c++", "c#", "node.js" and ".net" whole, splits on spaces, "/" and "-"
+TOKEN_RE = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+class SkillMatch(NamedTuple):
+    skill: str
+    start: int  # Character offsets in the matched text
+    end: int
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over the words of every skill name and alias.
+
+    Matching walks the text's words once, whatever the taxonomy size, and
+    only whole words match, so "java" is not found in "javascript" nor
+    "git" in "digital". Where terms overlap the leftmost, then longest,
+    one wins ("sql server" over "sql").
+    """
+
+    def __init__(self, skills: List[Dict[str, Any]]):
+        self.names: List[str] = []
+        self.categories: List[Optional[str]] = []
+        self.implies: List[Tuple[int, ...]] = []
+        self.aliases: List[Tuple[str, ...]] = []
+        self._ids: Dict[str, int] = {}
+
+        for entry in skills:
+            self._ids[entry["name"].lower()] = len(self.names)
+            self.names.append(entry["name"])
+            self.categories.append(entry.get("category"))
+        for entry in skills:
+            self.implies.append(tuple(
+                self._ids[name.lower()] for name in entry.get("implies", []) if name.lower() in self._ids
+            ))
+            self.aliases.append(tuple(alias.lower() for alias in entry.get("aliases", [])))
+
+        # Trie over words; node 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Optional[Tuple[int, int]]] = [None]  # (skill id, term length in words)
+        self.terms = 0
+        for skill_id, entry in enumerate(skills):
+            terms = list(entry.get("aliases", []))
+            if entry.get("match_name", True):
+                terms.insert(0, entry["name"])
+            for term in terms:
+                self._add(tokenize(term), skill_id)
+
+        self._fail: List[int] = [0] * len(self._goto)
+        self._dict_link: List[int] = [0] * len(self._goto)
+        self._link()
+
+    def _add(self, words: List[str], skill_id: int) -> None:
+        if not words:
+            return
+        node = 0
+        for word in words:
+            next_node = self._goto[node].get(word)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][word] = next_node
+                self._goto.append({})
+                self._output.append(None)
+            node = next_node
+        # The first skill claiming a term keeps it
+        if self._output[node] is None:
+            self._output[node] = (skill_id, len(words))
+            self.terms += 1
+
+    def _link(self) -> None:
+        # Breadth-first, so every failure target is linked before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                # Nearest proper suffix that ends a term
+                self._dict_link[child] = self._fail[child] if self._output[self._fail[child]] else self._dict_link[self._fail[child]]
+                queue.append(child)
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """Non-overlapping skill mentions in text order"""
+        spans = [(m.group(), m.start(), m.end()) for m in TOKEN_RE.finditer(text.lower())]
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+
+        # Leftmost-longest term starting at each word
+        best: Dict[int, Tuple[int, int]] = {}
+        node = 0
+        for index, (word, _, _) in enumerate(spans):
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+
+            hit = node if output[node] else dict_link[node]
+            while hit:
+                skill_id, length = output[hit]
+                start = index - length + 1
+                if start not in best or best[start][1] < length:
+                    best[start] = (skill_id, length)
+                hit = dict_link[hit]
+
+        matches = []
+        next_free = 0
+        for start in sorted(best):
+            if start < next_free:
+                continue
+            skill_id, length = best[start]
+            matches.append(SkillMatch(self.names[skill_id], spans[start][1], spans[start + length - 1][2]))
+            next_free = start + length
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct canonical skill names in order of first mention"""
+        return list(dict.fromkeys(match.skill for match in self.find(text)))
+
+    def canonical(self, term: str) -> Optional[str]:
+        """Canonical name when the whole term is a known skill or alias"""
+        skill_id = self._ids.get(term.strip().lower())
+        if skill_id is not None:
+            return self.names[skill_id]
+
+        words = tokenize(term)
+        node = 0
+        for word in words:
+            node = self._goto[node].get(word)
+            if node is None:
+                return None
+        return self.names[self._output[node][0]] if words and self._output[node] else None
+
+    def expand(self, skills: Iterable[str]) -> Set[str]:
+        """
+        Lowercase canonical names of the skills and of every skill they
+        imply (PostgreSQL implies SQL); unknown skills are kept as given
+        """
+        expanded: Set[str] = set()
+        pending = []
+        for skill in skills:
+            name = self.canonical(skill)
+            if name is None:
+                expanded.add(skill.lower())
+            else:
+                pending.append(self._ids[name.lower()])
+
+        seen: Set[int] = set()
+        while pending:
+            skill_id = pending.pop()
+            if skill_id in seen:
+                continue
+            seen.add(skill_id)
+            expanded.add(self.names[skill_id].lower())
+            pending.extend(self.implies[skill_id])
+        return expanded
+
+    def synonyms(self, skill: str) -> Tuple[str, ...]:
+        """Lowercase name and aliases of a known skill"""
+        name = self.canonical(skill)
+        if name is None:
+            return ()
+
+        skill_id = self._ids[name.lower()]
+        return (name.lower(),) + self.aliases[skill_id]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"skills": len(self.names), "terms": self.terms, "nodes": len(self._goto)}
+
+def taxonomy_path() -> str:
+    return settings.SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH
+
+def load_taxonomy(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["skills"] if isinstance(data, dict) else data
+
+_matcher: Optional[SkillMatcher] = None
+_matcher_lock = threading.Lock()
+
+def get_skill_matcher() -> SkillMatcher:
+    """The taxonomy automaton, compiled once per process"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                with startup_report.track("skill_taxonomy"):
+                    path = taxonomy_path()
+                    _matcher = SkillMatcher(load_taxonomy(path))
+                print(f"Compiled skill taxonomy {path}: {_matcher.get_stats()}")
+    return _matcher
+
+startup_report.register("skill_taxonomy", get_skill_matcher)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile a skill taxonomy and time matching against a document")
+    parser.add_argument("path", nargs="?", help="Text file to match; a synthetic resume when omitted")
+    parser.add_argument("--taxonomy", default=taxonomy_path())
+    parser.add_argument("--synthetic-skills", type=int, default=0, help="Add this many generated skills to the taxonomy")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    skills = load_taxonomy(args.taxonomy)
+    skills += [
+        {"name": f"skill {i // 1000} tool{i}", "aliases": [f"tool{i}", f"tool {i} suite"]}
+        for i in range(args.synthetic_skills)
+    ]
+
+    started = time.perf_counter()
+    matcher = SkillMatcher(skills)
+    print(f"Compiled {matcher.get_stats()} in {(time.perf_counter() - started) * 1000.0:.1f}ms")
+
+    if args.path:
+        with open(args.path, encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    else:
+        text = (
+            "Senior engineer: Python, Django, PostgreSQL and JavaScript (React, Node.js). "
+            "Deployed microservices with Docker and Kubernetes on Amazon Web Services; "
+            "CI/CD with GitHub Actions. Digital marketing background. "
+        ) * 40
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        found = matcher.extract(text)
+    elapsed = (time.perf_counter() - started) / args.repeat
+    print(f"{len(text)} chars in {elapsed * 1000.0:.2f}ms ({len(text) / elapsed / 1e6:.2f}M chars/s)")
+    print(f"Skills: {found}")
+
+if __name__ == "__main__":
+    main()
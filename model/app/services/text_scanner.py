@@ -0,0 +1,240 @@
+import argparse
+import bisect
+import random
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.core.config import settings
+
+# Short markers fused into one alternation, tried in this order at each position.
+# Every repetition is bounded or anchored on a boundary, so a failed attempt
+# cannot rescan an unbounded stretch of text. Each group sits behind a
+# zero-width trigger that rejects most positions (inside words, between
+# digits) before any of its patterns is tried.
+MARKER_GROUPS: List[Tuple[str, List[Tuple[str, str]]]] = [
+    (r"(?<![A-Za-z0-9._%+-])(?=[A-Za-z0-9._%+-]{1,64}@)", [
+        ("email", r"[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){0,8}\.[A-Za-z]{2,24}\b"),
+    ]),
+    (r"(?<!\d)(?=[\d+(])", [
+        ("date_range", r"(\d{4})\s{0,3}[-–]\s{0,3}(\d{4}(?!\d)|present\b|current\b)"),
+        ("phone", r"(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\d)"),
+        ("year", r"\b(?:19|20)\d{2}\b"),
+        ("years_experience", r"(\d{1,2})\+?\s{0,3}(?:years?|yrs?)\s{0,3}(?:of\s{1,3})?experience\b"),
+        ("years_field", r"(\d{1,2})\+?\s{0,3}(?:years?|yrs?)\s{0,3}(?:in\s{1,3})?(?:the\s{1,3})?field\b"),
+    ]),
+    (r"\b(?=[a-z])", [
+        ("degree", r"(?:bachelor|master|phd)\b|(?:b\.s\.|m\.s\.|ph\.d\.)"),
+        ("field", r"(?:computer science|engineering|mathematics|physics)\b"),
+        ("certification", r"(?:aws|azure|gcp|cisco|microsoft|oracle|ibm)\s{1,3}(?:certified|professional|associate|expert)\b|(?:pmp|scrum|agile|six\s{1,3}sigma|lean)\b"),
+        # Only the label is consumed, so the scan still sees "N years ... experience" starting at the number
+        ("experience_years", r"experience:\s{0,3}(?=(\d{1,2})\+?\s{0,3}(?:years?|yrs?)\b)"),
+        ("seniority", r"(?:junior(?:\s{1,3}level)?|entry\s{1,3}level|mid\s{1,3}level|intermediate|senior(?:\s{1,3}level)?|lead|principal|staff|architect|director|vp|cto)\b"),
+    ]),
+]
+
+MARKER_RE = re.compile(
+    "|".join(
+        trigger + "(?:" + "|".join(f"(?P<{tag}>{pattern})" for tag, pattern in patterns) + ")"
+        for trigger, patterns in MARKER_GROUPS
+    ),
+    re.IGNORECASE
+)
+
+# Capture groups of each tag inside the fused pattern
+_GROUPS: Dict[str, range] = {}
+for _, _patterns in MARKER_GROUPS:
+    for _tag, _pattern in _patterns:
+        _first = MARKER_RE.groupindex[_tag] + 1
+        _GROUPS[_tag] = range(_first, _first + re.compile(_pattern).groups)
+
+# Span patterns cover sentences rather than words, so they would swallow
+# the markers above if fused with them; they run on their own, bounded
+SUMMARY_RE = re.compile(r"\b(?:summary|objective|profile|about)\b[^.]{0,1000}\.", re.IGNORECASE)
+LEAD_SENTENCE_RE = re.compile(r"^[^.]{50,200}\.")
+RESPONSIBILITY_RE = re.compile(r"\b(?:responsible\s{1,3}for|duties|responsibilities?|key\s{1,3}responsibilities?)\b[^.]{0,500}\.", re.IGNORECASE)
+BULLET_RE = re.compile(r"^[ \t]*[•\-*][ \t]*([^\n]{1,300})", re.MULTILINE)
+
+SENIORITY_LEVELS = [
+    ("junior", ("junior", "entry level", "junior level")),
+    ("mid-level", ("mid level", "intermediate")),
+    ("senior", ("senior", "senior level")),
+    ("lead", ("lead", "principal", "staff")),
+    ("executive", ("architect", "director", "vp", "cto")),
+]
+
+_trackers = threading.local()
+
+class BudgetTracker:
+    """
+    Records whether any Budget expired while it was entered on this
+    thread, i.e. whether a parse is partial. Re-entrant, so one tracker
+    can cover a document's work in several steps.
+    """
+
+    def __init__(self):
+        self.exceeded = False
+
+    def __enter__(self) -> "BudgetTracker":
+        if not hasattr(_trackers, "stack"):
+            _trackers.stack = []
+        _trackers.stack.append(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _trackers.stack.pop()
+
+class Budget:
+    """Wall-clock allowance for one extractor; 0 means unlimited"""
+
+    def __init__(self, ms: Optional[float] = None):
+        ms = settings.PARSE_EXTRACTOR_BUDGET_MS if ms is None else ms
+        self.ms = ms
+        self.started = time.perf_counter()
+        self.deadline = self.started + ms / 1000.0 if ms > 0 else None
+        self.exceeded = False
+
+    def expired(self) -> bool:
+        if not self.exceeded and self.deadline is not None and time.perf_counter() > self.deadline:
+            self.exceeded = True
+            stack = getattr(_trackers, "stack", None)
+            if stack:
+                stack[-1].exceeded = True
+        return self.exceeded
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+class Marker(NamedTuple):
+    tag: str
+    start: int
+    end: int
+    text: str
+    groups: Tuple[Optional[str], ...]
+
+class ScanResult:
+    """Markers of one document grouped by tag, in text order"""
+
+    def __init__(self, markers: List[Marker], truncated: bool = False):
+        self.markers = markers
+        self.truncated = truncated
+        self.by_tag: Dict[str, List[Marker]] = {}
+        self._years: Optional[List[Tuple[int, int]]] = None
+        self._starts: Optional[List[int]] = None
+        for marker in markers:
+            self.by_tag.setdefault(marker.tag, []).append(marker)
+
+    def all(self, tag: str) -> List[Marker]:
+        return self.by_tag.get(tag, [])
+
+    def first(self, *tags: str) -> Optional[Marker]:
+        """First marker of the first tag that has any"""
+        for tag in tags:
+            markers = self.by_tag.get(tag)
+            if markers:
+                return markers[0]
+        return None
+
+    def within(self, spans: List[Tuple[int, int]]) -> "ScanResult":
+        """Markers starting inside any of the (start, end) spans"""
+        if self._starts is None:
+            self._starts = [marker.start for marker in self.markers]
+        markers: List[Marker] = []
+        for start, end in sorted(spans):
+            markers.extend(self.markers[bisect.bisect_left(self._starts, start):bisect.bisect_left(self._starts, end)])
+        return ScanResult(markers, self.truncated)
+
+    def year_after(self, position: int, window: int) -> Optional[int]:
+        """First four-digit year lying wholly within window chars after position"""
+        if self._years is None:
+            self._years = sorted(
+                [(marker.start, int(marker.text)) for marker in self.all("year")]
+                + [(marker.start, int(marker.groups[0])) for marker in self.all("date_range")]
+            )
+        index = bisect.bisect_left(self._years, (position, -1))
+        if index < len(self._years) and self._years[index][0] + 4 <= position + window:
+            return self._years[index][1]
+        return None
+
+    def seniority(self) -> Optional[str]:
+        found = {re.sub(r"\s+", " ", marker.text.lower()) for marker in self.all("seniority")}
+        for level, words in SENIORITY_LEVELS:
+            if found.intersection(words):
+                return level
+        return None
+
+def scan(text: str, budget: Optional[Budget] = None) -> ScanResult:
+    """One pass over the text for every marker pattern"""
+    budget = budget or Budget()
+    markers = []
+    for match in MARKER_RE.finditer(text):
+        tag = match.lastgroup
+        markers.append(Marker(tag, match.start(), match.end(), match.group(), tuple(match.group(i) for i in _GROUPS[tag])))
+        if budget.expired():
+            print(f"Marker scan stopped at {match.end()}/{len(text)} chars after {budget.elapsed_ms:.0f}ms")
+            return ScanResult(markers, truncated=True)
+    return ScanResult(markers)
+
+def _adversarial_inputs(size: int) -> Dict[str, str]:
+    """Inputs that make naive patterns backtrack or rescan"""
+    return {
+        "word_run": "a" * size,
+        "email_local": "a." * (size // 2),
+        "email_domain": "a@" + "b-" * (size // 2),
+        "digits": "1" * size,
+        "year_spaces": ("2019" + " " * 50) * (size // 54),
+        "unterminated_sentence": "responsible for " + "x " * (size // 2),
+        "dashes": "- " * (size // 2),
+        "summary_words": "summary " * (size // 8),
+        "experience_words": ("10 years " * (size // 9)),
+        "mixed": ("John john@x.io +1 (555) 123-4567 2019 - present Senior B.S. engineering " * (size // 70)),
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fuzz the parser's extractors with worst-case and random inputs")
+    parser.add_argument("--sizes", default="10000,20000,40000,80000")
+    parser.add_argument("--random", type=int, default=200, help="Random documents to parse")
+    parser.add_argument("--max-growth", type=float, default=2.0, help="Allowed rise in time per char from the smallest to the largest size")
+    args = parser.parse_args(argv)
+
+    from app.services.parser_service import ParserService
+
+    # Time the patterns themselves rather than the budget cut-off
+    settings.PARSE_EXTRACTOR_BUDGET_MS = 0
+    parser_service = ParserService(use_pool=False, use_cache=False)
+    failures = []
+
+    # Linear extractors take about the same time per char at every size
+    per_kchar: Dict[str, List[float]] = {}
+    for size in (int(size) for size in args.sizes.split(",")):
+        for name, text in _adversarial_inputs(size).items():
+            started = time.perf_counter()
+            parser_service._parse_resume_text(text)
+            parser_service._parse_jd_text(text)
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            per_kchar.setdefault(name, []).append(elapsed_ms / (len(text) / 1000.0))
+            print(f"{name:>22} {len(text):>7} chars {elapsed_ms:9.1f}ms {per_kchar[name][-1]:6.2f}ms/kchar")
+
+    for name, timings in per_kchar.items():
+        growth = timings[-1] / max(timings[0], 1e-6)
+        if growth > args.max_growth:
+            failures.append(f"{name}: time per char grew {growth:.1f}x with input size")
+
+    rng = random.Random(0)
+    alphabet = "aA1@.-–+ \n\t•:()#/,present senior 2019 b.s. experience years responsible for"
+    for _ in range(args.random):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 5000)))
+        try:
+            parser_service._parse_resume_text(text)
+            parser_service._parse_jd_text(text)
+        except Exception as e:
+            failures.append(f"random input raised {e!r}: {text[:80]!r}")
+
+    if failures:
+        print("\n".join(["FAILED:"] + failures))
+        raise SystemExit(1)
+    print(f"OK: no superlinear inputs, {args.random} random documents parsed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import codecs
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple
+import aiofiles
+from fastapi import UploadFile
+from app.core.config import settings
+
+# Leading bytes of each binary format; DOCX is a zip, legacy DOC an OLE2 compound file
+# (recognised so it is refused as unsupported rather than sniffed as text)
+MAGIC_BYTES = [
+    (b"%PDF-", ".pdf"),
+    (b"PK\x03\x04", ".docx"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".doc"),
+]
+
+class UploadRejected(ValueError):
+    """An upload refused at intake; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def detect_format(head: bytes) -> Optional[str]:
+    """Format of a document from its first bytes; None when it is neither a known binary format nor UTF-8 text"""
+    for magic, extension in MAGIC_BYTES:
+        if head.startswith(magic):
+            return extension
+    if b"\x00" in head:
+        return None
+    try:
+        # The head may end inside a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return None
+    return ".txt"
+
+def _check_format(filename: str, head: bytes) -> str:
+    extension = detect_format(head)
+    if extension is None or extension not in settings.SUPPORTED_FORMATS:
+        raise UploadRejected(
+            f"Unsupported file format: {filename} (supported: {', '.join(settings.SUPPORTED_FORMATS)})",
+            status_code=415
+        )
+    return extension
+
+def _check_text(filename: str, decoder: Any, chunk: bytes, final: bool = False) -> None:
+    """Feed the next chunk of a .txt upload to its incremental UTF-8 decoder; the head alone proves nothing"""
+    try:
+        decoder.decode(chunk, final)
+    except UnicodeDecodeError:
+        raise UploadRejected(f"Unsupported file format: {filename} is not valid UTF-8 text", status_code=415)
+
+# Any zip starts like a DOCX; only the central directory, at the end, tells them apart
+DOCX_MAIN_PART = "word/document.xml"
+
+def _check_docx(filename: str, source: Any) -> None:
+    """Refuse a zip (xlsx, jar, epub...) that is not a Word document; source is bytes or a path"""
+    try:
+        with zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source) as archive:
+            archive.getinfo(DOCX_MAIN_PART)
+    except (zipfile.BadZipFile, KeyError, OSError):
+        raise UploadRejected(f"Unsupported file format: {filename} is a zip archive but not a DOCX document", status_code=415)
+
+def _check_size(filename: str, size: int, max_bytes: int) -> None:
+    if size > max_bytes:
+        raise UploadRejected(f"{filename} exceeds the {max_bytes / (1024 * 1024):g}MB upload limit", status_code=413)
+
+class BufferStream(io.RawIOBase):
+    """Read-only stream over a bytes-like buffer (an mmap), with its own position and no copy of the buffer"""
+
+    def __init__(self, buffer: Any):
+        self._buffer = buffer
+        self._size = len(buffer)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target: Any) -> int:
+        count = max(0, min(len(target), self._size - self._position))
+        target[:count] = self._buffer[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+def open_stream(content: Any) -> io.BufferedIOBase:
+    """A fresh binary stream over bytes or a memory-mapped upload"""
+    if isinstance(content, bytes):
+        return io.BytesIO(content)
+    return io.BufferedReader(BufferStream(content))
+
+@dataclass
+class Upload:
+    """
+    A received document: detected format, size and SHA-256, with the
+    bytes either in memory or spooled to a temporary file. Only the path
+    of a spooled upload is pickled, so parse workers map the file
+    themselves instead of receiving a copy.
+    """
+    filename: str
+    format: str
+    size: int
+    sha256: str
+    content: Optional[bytes] = None
+    path: Optional[str] = None
+
+    @classmethod
+    def from_bytes(cls, filename: str, content: bytes, max_bytes: Optional[int] = None) -> "Upload":
+        _check_size(filename, len(content), max_bytes or settings.MAX_FILE_SIZE)
+        if not content:
+            raise UploadRejected(f"{filename} is empty")
+        extension = _check_format(filename, content[:settings.UPLOAD_CHUNK_BYTES])
+        if extension == ".docx":
+            _check_docx(filename, content)
+        elif extension == ".txt":
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            view = memoryview(content)
+            for start in range(0, len(content), settings.UPLOAD_CHUNK_BYTES):
+                _check_text(filename, decoder, view[start:start + settings.UPLOAD_CHUNK_BYTES])
+            _check_text(filename, decoder, b"", final=True)
+        return cls(filename, extension, len(content), hashlib.sha256(content).hexdigest(), content=content)
+
+    @contextmanager
+    def buffer(self) -> Iterator[Any]:
+        """The upload's bytes: the in-memory copy, or a read-only map of the spooled file"""
+        if self.content is not None:
+            yield self.content
+            return
+
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+    def close(self) -> None:
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+async def receive_upload(
+    file: UploadFile,
+    max_bytes: Optional[int] = None,
+    spool_bytes: Optional[int] = None,
+    chunk_bytes: Optional[int] = None
+) -> Upload:
+    """
+    Read an upload chunk by chunk: the format is checked on the first
+    chunk and the size (and, for text, UTF-8 validity) on every one, so a
+    bad upload is refused before the rest is read. Bytes are hashed as
+    they arrive and, once past spool_bytes, written to a temporary file
+    instead of held in memory.
+    """
+    max_bytes = max_bytes or settings.MAX_FILE_SIZE
+    spool_bytes = settings.UPLOAD_SPOOL_BYTES if spool_bytes is None else spool_bytes
+    chunk_bytes = chunk_bytes or settings.UPLOAD_CHUNK_BYTES
+    filename = file.filename or "upload"
+
+    digest = hashlib.sha256()
+    chunks: List[bytes] = []
+    size = 0
+    extension = None
+    decoder = None
+    path = None
+    spool = None
+
+    try:
+        while True:
+            chunk = await file.read(chunk_bytes)
+            if not chunk:
+                break
+            size += len(chunk)
+            _check_size(filename, size, max_bytes)
+            if extension is None:
+                extension = _check_format(filename, chunk)
+                if extension == ".txt":
+                    decoder = codecs.getincrementaldecoder("utf-8")()
+            if decoder is not None:
+                _check_text(filename, decoder, chunk)
+            digest.update(chunk)
+
+            if spool is None and size > spool_bytes:
+                descriptor, path = tempfile.mkstemp(prefix="upload-", suffix=extension, dir=settings.UPLOAD_SPOOL_DIR or None)
+                os.close(descriptor)
+                spool = await aiofiles.open(path, "wb")
+                for buffered in chunks:
+                    await spool.write(buffered)
+                chunks = []
+            if spool is not None:
+                await spool.write(chunk)
+            else:
+                chunks.append(chunk)
+
+        if decoder is not None:
+            # A file cut off inside a multi-byte character
+            _check_text(filename, decoder, b"", final=True)
+        if spool is not None:
+            await spool.close()
+            spool = None
+    except BaseException:
+        if spool is not None:
+            await spool.close()
+        if path is not None:
+            os.unlink(path)
+        raise
+
+    if size == 0:
+        raise UploadRejected(f"{filename} is empty")
+    if path is not None:
+        upload = Upload(filename, extension, size, digest.hexdigest(), path=path)
+    else:
+        upload = Upload(filename, extension, size, digest.hexdigest(), content=b"".join(chunks))
+
+    if extension == ".docx":
+        try:
+            _check_docx(filename, upload.content if upload.content is not None else upload.path)
+        except UploadRejected:
+            upload.close()
+            raise
+    return upload
+
+async def _measure(path: str, streaming: bool) -> Tuple[float, float, bool]:
+    with open(path, "rb") as f:
+        file = UploadFile(file=f, filename=os.path.basename(path))
+        tracemalloc.start()
+        started = time.perf_counter()
+        if streaming:
+            upload = await receive_upload(file, max_bytes=10 ** 12)
+            with upload.buffer() as content:
+                checksum = hashlib.sha256(content).hexdigest() == upload.sha256
+            upload.close()
+        else:
+            content = await file.read()
+            checksum = len(content) > 0
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed_ms, peak / (1024 * 1024), checksum
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Receive a file through the upload intake and compare with reading it whole")
+    parser.add_argument("path", nargs="?", help="Document to receive; a generated PDF-like file when omitted")
+    parser.add_argument("--megabytes", type=int, default=20, help="Size of the generated file")
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        descriptor, path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(b"%PDF-1.4\n" + os.urandom(args.megabytes * 1024 * 1024))
+
+    with open(path, "rb") as f:
+        head = f.read(settings.UPLOAD_CHUNK_BYTES)
+    print(f"{path}: {os.path.getsize(path) / (1024 * 1024):.1f}MB, detected {detect_format(head)}")
+    for name, streaming in (("read whole", False), ("intake", True)):
+        elapsed_ms, peak_mb, ok = asyncio.run(_measure(path, streaming))
+        print(f"{name:>10}: {elapsed_ms:8.1f}ms, peak Python memory {peak_mb:6.1f}MB, ok={ok}")
+
+    with open(path, "rb") as f:
+        try:
+            asyncio.run(receive_upload(UploadFile(file=f, filename="big.pdf"), max_bytes=1024 * 1024))
+        except UploadRejected as e:
+            print(f"Rejected with {e.status_code} after {f.tell() / 1024:.0f}KB: {e}")
+    if args.path is None:
+        os.unlink(path)
@@ -0,0 +1,72 @@
+import numpy as np
+from typing import Tuple
+
+# Candidates are scored in blocks so float16 inputs never materialise a full float32 copy
+BLOCK_SIZE = 65536
+
+def normalize(vectors: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """L2-normalise rows (or a single vector); zero vectors stay zero"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(dtype, copy=False)
+
+def similarity_matrix(
+    queries: np.ndarray,
+    candidates: np.ndarray,
+    normalized: bool = False,
+    dtype=np.float32
+) -> np.ndarray:
+    """
+    Cosine similarities between queries and candidates.
+
+    A 1-D query returns shape (N,), a (M, D) query matrix returns (M, N).
+    Pass normalized=True when both sides are already unit length to skip
+    the norm computation entirely.
+    """
+    single = np.ndim(queries) == 1
+    queries = np.atleast_2d(queries)
+    candidates = np.atleast_2d(candidates)
+
+    if not normalized:
+        queries = normalize(queries)
+        candidates = normalize(candidates, dtype=dtype)
+    else:
+        queries = np.asarray(queries, dtype=np.float32)
+        candidates = np.asarray(candidates, dtype=dtype)
+
+    if candidates.dtype == np.float32:
+        scores = queries @ candidates.T
+    else:
+        # NumPy has no fast half-precision GEMM; upcast one block at a time
+        scores = np.empty((queries.shape[0], candidates.shape[0]), dtype=np.float32)
+        for start in range(0, candidates.shape[0], BLOCK_SIZE):
+            block = candidates[start:start + BLOCK_SIZE].astype(np.float32)
+            scores[:, start:start + BLOCK_SIZE] = queries @ block.T
+
+    np.clip(scores, -1.0, 1.0, out=scores)
+    return scores[0] if single else scores
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and values of the k highest scores, best first.
+
+    Uses argpartition so only the k winners are sorted. Works row-wise
+    on 2-D score matrices.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = max(0, min(k, n))
+    if k == 0:
+        empty_shape = scores.shape[:-1] + (0,)
+        return np.empty(empty_shape, dtype=np.int64), np.empty(empty_shape, dtype=scores.dtype)
+
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-candidate_scores, axis=-1, kind='stable')
+    indices = np.take_along_axis(candidates, order, axis=-1)
+    return indices, np.take_along_axis(candidate_scores, order, axis=-1)
@@ -0,0 +1,544 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.services import vector_ops
+
+try:
+    import fcntl
+except ImportError:  # No fork (and so no pre-fork workers) on this platform either
+    fcntl = None
+
+class VectorStore:
+    """
+    Persistent, append-only embedding store backed by memory-mapped files.
+
+    Layout under `directory`:
+        header.json       model, dimension, storage dtype, capacity and generation
+        vectors-<gen>.bin (capacity, dimension) matrix in the storage dtype
+        scales-<gen>.bin  per-row float32 scale (int8 storage only)
+        ids-<gen>.log     append-only "+<TAB>row<TAB>id" / "-<TAB>id" records
+        store.lock        flock held by the one process writing at a time
+        compact.lock      flock held by the one process compacting
+
+    Vectors are L2-normalised on insert so a dot product is cosine
+    similarity. Deletes only tombstone the row; compaction rewrites the live
+    rows into a new generation in a background thread.
+
+    Several processes (pre-fork workers) may open the same directory.
+    Writes take store.lock and first replay what other processes appended,
+    so rows are never handed out twice; every access replays the log tail
+    and follows their growth or compaction through header.json.
+    """
+
+    DTYPES = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+    INITIAL_CAPACITY = 1024
+    BLOCK_SIZE = 65536
+
+    def __init__(
+        self,
+        directory: str,
+        dimension: int,
+        dtype: str = 'float16',
+        compact_ratio: float = 0.25,
+        model: Optional[str] = None
+    ):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported vector store dtype: {dtype}")
+
+        self.directory = directory
+        self.dimension = dimension
+        self.dtype_name = dtype
+        self.compact_ratio = compact_ratio
+        self.model = model
+
+        self._lock = threading.RLock()
+        self._compacting = False
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        self.generation = 0
+        self.capacity = 0
+        self.count = 0
+        self._row_ids: List[Optional[str]] = []
+        self._id_rows: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._log = None
+        self._log_offset = 0  # Bytes of the ids log replayed
+        self._header_stamp: Optional[Tuple[int, int, int]] = None
+        self._pid = os.getpid()
+        self._lock_file = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_file = open(os.path.join(self.directory, 'store.lock'), 'a')
+        with self._exclusive(sync=False):
+            self._open()
+
+    @property
+    def dtype(self):
+        return self.DTYPES[self.dtype_name]
+
+    # Files
+
+    def _path(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.directory, f"{name}-{generation}.{'log' if name == 'ids' else 'bin'}")
+
+    def _header_path(self) -> str:
+        return os.path.join(self.directory, 'header.json')
+
+    def _write_header(self) -> None:
+        header = {
+            'model': self.model,
+            'dimension': self.dimension,
+            'dtype': self.dtype_name,
+            'capacity': self.capacity,
+            'generation': self.generation
+        }
+        tmp_path = self._header_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(header, f)
+        os.replace(tmp_path, self._header_path())
+
+    def _read_header(self) -> Dict[str, Any]:
+        stat = os.stat(self._header_path())
+        with open(self._header_path()) as f:
+            header = json.load(f)
+        self._header_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return header
+
+    def _open(self) -> None:
+        if os.path.exists(self._header_path()):
+            header = self._read_header()
+            if header['dimension'] != self.dimension or header['dtype'] != self.dtype_name:
+                raise ValueError(
+                    f"Vector store at {self.directory} holds {header['dimension']}-d "
+                    f"{header['dtype']} vectors, expected {self.dimension}-d {self.dtype_name}"
+                )
+            # Vectors from different models are not comparable
+            if self.model is not None and header.get('model') not in (None, self.model):
+                raise ValueError(
+                    f"Vector store at {self.directory} holds {header['model']} vectors, expected {self.model}"
+                )
+            self.model = self.model or header.get('model')
+            self.generation = header['generation']
+            self.capacity = header['capacity']
+            if header.get('model') != self.model:
+                self._write_header()
+        else:
+            self.capacity = self.INITIAL_CAPACITY
+            self._allocate(self.generation, self.capacity)
+            self._write_header()
+
+        self._map(self.capacity)
+        self._replay_log()
+        self._log = open(self._path('ids'), 'a', encoding='utf-8')
+
+    def _allocate(self, generation: int, capacity: int) -> None:
+        for name, row_bytes in self._file_row_bytes():
+            with open(self._path(name, generation), 'ab') as f:
+                f.truncate(capacity * row_bytes)
+
+    def _file_row_bytes(self) -> List[Tuple[str, int]]:
+        files = [('vectors', self.dimension * np.dtype(self.dtype).itemsize)]
+        if self.dtype_name == 'int8':
+            files.append(('scales', np.dtype(np.float32).itemsize))
+        return files
+
+    def _map(self, capacity: int) -> None:
+        self._vectors = np.memmap(
+            self._path('vectors'), dtype=self.dtype, mode='r+', shape=(capacity, self.dimension)
+        )
+        if self.dtype_name == 'int8':
+            self._scales = np.memmap(self._path('scales'), dtype=np.float32, mode='r+', shape=(capacity,))
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive[:capacity]
+        self._alive = alive
+
+    def _replay_log(self) -> None:
+        """Apply the ids log from where the last replay stopped"""
+        path = self._path('ids')
+        try:
+            if os.path.getsize(path) <= self._log_offset:
+                return
+            with open(path, 'rb') as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except OSError:
+            return
+
+        position = 0
+        # Another process may be mid-record, so stop at the last complete line
+        while True:
+            end = data.find(b'\n', position)
+            if end < 0:
+                break
+            parts = data[position:end].decode('utf-8').split('\t')
+            if parts[0] == '+' and len(parts) == 3:
+                row = int(parts[1])
+                if row >= self.capacity:
+                    break  # Record written without its vector (interrupted growth)
+                self._set_row(row, parts[2])
+            elif parts[0] == '-' and len(parts) == 2:
+                self._tombstone(parts[1])
+            position = end + 1
+        self._log_offset += position
+
+    # Other processes
+
+    @contextmanager
+    def _exclusive(self, sync: bool = True) -> Iterator[None]:
+        """This thread and process alone may write; with sync, after catching up with the others"""
+        with self._lock:
+            self._after_fork()
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                if sync:
+                    self._sync()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _after_fork(self) -> None:
+        # An flock is shared by every process holding the same open file, so each process opens its own
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._lock_file = open(os.path.join(self.directory, 'store.lock'), 'a')
+        if self._log is not None:
+            self._log = open(self._path('ids'), 'a', encoding='utf-8')
+
+    def _sync(self) -> None:
+        """Follow other processes' growth, compaction and log records"""
+        try:
+            stat = os.stat(self._header_path())
+        except OSError:
+            return
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) != self._header_stamp:
+            header = self._read_header()
+            if header['generation'] != self.generation:
+                self._reset(header['generation'], header['capacity'])
+                return
+            if header['capacity'] > self.capacity:
+                self._remap(header['capacity'])
+        self._replay_log()
+
+    def _refresh(self) -> None:
+        with self._lock:
+            self._after_fork()
+            self._sync()
+
+    def _reset(self, generation: int, capacity: int) -> None:
+        """Drop the in-memory state and load one generation from its files"""
+        if self._log is not None:
+            self._log.close()
+        self.generation = generation
+        self.capacity = capacity
+        self.count = 0
+        self._row_ids = []
+        self._id_rows = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors = None
+        self._scales = None
+        self._log_offset = 0
+        self._map(capacity)
+        self._replay_log()
+        self._log = open(self._path('ids'), 'a', encoding='utf-8')
+
+    def _remap(self, capacity: int) -> None:
+        self._vectors.flush()
+        self._vectors = None
+        if self._scales is not None:
+            self._scales.flush()
+            self._scales = None
+        self.capacity = capacity
+        self._map(capacity)
+
+    def _set_row(self, row: int, vector_id: str) -> None:
+        self._tombstone(vector_id)
+        while len(self._row_ids) <= row:
+            self._row_ids.append(None)
+        self._row_ids[row] = vector_id
+        self._id_rows[vector_id] = row
+        self._alive[row] = True
+        self.count = max(self.count, row + 1)
+
+    def _tombstone(self, vector_id: str) -> bool:
+        row = self._id_rows.pop(vector_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        return True
+
+    def _grow(self, required: int) -> None:
+        capacity = self.capacity
+        while capacity < required:
+            capacity *= 2
+
+        self._allocate(self.generation, capacity)
+        self._remap(capacity)
+        self._write_header()
+
+    # Encoding
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        vectors = vector_ops.normalize(np.atleast_2d(vectors))
+        if self.dtype_name != 'int8':
+            return vectors.astype(self.dtype), None
+
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, np.newaxis]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _dequantize(self, start: int, end: int) -> np.ndarray:
+        block = np.asarray(self._vectors[start:end], dtype=np.float32)
+        if self._scales is not None:
+            block *= np.asarray(self._scales[start:end])[:, np.newaxis]
+        return block
+
+    # Public API
+
+    def add(self, vector_id: str, vector: np.ndarray) -> None:
+        self.add_many([vector_id], np.atleast_2d(vector))
+
+    def add_many(self, ids: List[str], vectors: np.ndarray) -> None:
+        vectors = np.atleast_2d(vectors)
+        if vectors.shape != (len(ids), self.dimension):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dimension}, got {vectors.shape}")
+
+        quantized, scales = self._quantize(vectors)
+
+        with self._exclusive():
+            start = self.count
+            if start + len(ids) > self.capacity:
+                self._grow(start + len(ids))
+
+            # Vectors land before their log records so a crash never maps an id to garbage
+            self._vectors[start:start + len(ids)] = quantized
+            if scales is not None:
+                self._scales[start:start + len(ids)] = scales
+
+            for offset, vector_id in enumerate(ids):
+                self._set_row(start + offset, vector_id)
+                self._log.write(f"+\t{start + offset}\t{vector_id}\n")
+            self._log.flush()
+
+    def delete(self, vector_id: str) -> bool:
+        with self._exclusive():
+            if not self._tombstone(vector_id):
+                return False
+            self._log.write(f"-\t{vector_id}\n")
+            self._log.flush()
+
+        self.maybe_compact()
+        return True
+
+    def get(self, vector_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            self._refresh()
+            row = self._id_rows.get(vector_id)
+            if row is None:
+                return None
+            return self._dequantize(row, row + 1)[0]
+
+    def __contains__(self, vector_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return vector_id in self._id_rows
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._id_rows)
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return list(self._id_rows)
+
+    def ids_from(self, row: int) -> Tuple[int, int, List[str]]:
+        """Generation, row count and the live ids at rows from row on, for following appends"""
+        with self._lock:
+            self._refresh()
+            ids = [self._row_ids[i] for i in range(row, self.count) if self._alive[i]]
+            return self.generation, self.count, ids
+
+    def iter_blocks(self, block_size: Optional[int] = None) -> Iterator[Tuple[List[Optional[str]], np.ndarray, np.ndarray]]:
+        """Yield (row ids, float32 vectors, alive mask) in row order without loading the whole file"""
+        block_size = block_size or self.BLOCK_SIZE
+        with self._lock:
+            self._refresh()
+            count = self.count
+
+        for start in range(0, count, block_size):
+            end = min(start + block_size, count)
+            with self._lock:
+                block = (self._row_ids[start:end], self._dequantize(start, end), self._alive[start:end].copy())
+            yield block
+
+    def search(self, query: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """Exact top-k by cosine similarity, scanning the memory map block by block"""
+        query = vector_ops.normalize(query)
+        best_ids: List[str] = []
+        best_scores = np.empty(0, dtype=np.float32)
+
+        for row_ids, block, alive in self.iter_blocks():
+            scores = block @ query
+            scores[~alive] = -np.inf
+            indices, top_scores = vector_ops.top_k(scores, k)
+
+            # Merge the block winners with the running top-k
+            merged_ids = best_ids + [row_ids[i] for i in indices]
+            merged_scores = np.concatenate([best_scores, top_scores])
+            order, best_scores = vector_ops.top_k(merged_scores, k)
+            best_ids = [merged_ids[i] for i in order]
+
+        return [
+            (vector_id, float(score))
+            for vector_id, score in zip(best_ids, best_scores)
+            if np.isfinite(score)
+        ]
+
+    def flush(self) -> None:
+        with self._lock:
+            self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+            self._log.flush()
+
+    def close(self) -> None:
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+        with self._lock:
+            self.flush()
+            self._log.close()
+
+    # Compaction
+
+    def dead_rows(self) -> int:
+        return self.count - len(self._id_rows)
+
+    def _compaction_due(self) -> bool:
+        return self.count > 0 and self.dead_rows() / self.count >= self.compact_ratio
+
+    def maybe_compact(self) -> bool:
+        """Start a background compaction when the tombstoned fraction passes compact_ratio"""
+        with self._lock:
+            self._refresh()
+            if self._compacting or not self._compaction_due():
+                return False
+            self._compacting = True
+
+        self._compaction_thread = threading.Thread(target=self._compact_worker, daemon=True)
+        self._compaction_thread.start()
+        return True
+
+    def compact(self) -> None:
+        with self._lock:
+            if self._compacting:
+                raise RuntimeError("Compaction already in progress")
+            self._compacting = True
+        self._compact_worker(force=True)
+
+    def _compact_worker(self, force: bool = False) -> None:
+        try:
+            with open(os.path.join(self.directory, 'compact.lock'), 'a') as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return  # Another process is compacting this store
+                self._compact(force)
+        except Exception as e:
+            print(f"Error compacting vector store {self.directory}: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _compact(self, force: bool = False) -> None:
+        with self._exclusive():
+            # Another process may have compacted since this one decided to
+            if not force and not self._compaction_due():
+                return
+            old_generation = self.generation
+            snapshot_count = self.count
+            vectors = self._vectors
+            scales = self._scales
+            snapshot_alive = self._alive[:snapshot_count].copy()
+
+        new_generation = old_generation + 1
+        capacity = max(self.INITIAL_CAPACITY, int(snapshot_alive.sum()) * 2)
+        self._allocate(new_generation, capacity)
+
+        new_vectors = np.memmap(
+            self._path('vectors', new_generation), dtype=self.dtype, mode='r+', shape=(capacity, self.dimension)
+        )
+        new_scales = None
+        if scales is not None:
+            new_scales = np.memmap(self._path('scales', new_generation), dtype=np.float32, mode='r+', shape=(capacity,))
+
+        # Bulk copy of rows live at the snapshot; rows are immutable once written
+        old_rows = np.flatnonzero(snapshot_alive)
+        for start in range(0, len(old_rows), self.BLOCK_SIZE):
+            rows = old_rows[start:start + self.BLOCK_SIZE]
+            new_vectors[start:start + len(rows)] = vectors[rows]
+            if new_scales is not None:
+                new_scales[start:start + len(rows)] = scales[rows]
+
+        with self._exclusive():
+            # Catch up with rows appended while copying (here or in other processes), then drop rows deleted meanwhile
+            appended = np.arange(snapshot_count, self.count)
+            if len(appended):
+                needed = len(old_rows) + len(appended)
+                if needed > capacity:
+                    raise RuntimeError("Vector store grew too fast during compaction")
+                new_vectors[len(old_rows):needed] = self._vectors[appended]
+                if new_scales is not None:
+                    new_scales[len(old_rows):needed] = self._scales[appended]
+                old_rows = np.concatenate([old_rows, appended])
+
+            keep = self._alive[old_rows]
+            row_ids = [self._row_ids[row] if alive else None for row, alive in zip(old_rows, keep)]
+
+            with open(self._path('ids', new_generation), 'w', encoding='utf-8') as f:
+                for row, vector_id in enumerate(row_ids):
+                    if vector_id is not None:
+                        f.write(f"+\t{row}\t{vector_id}\n")
+
+            new_vectors.flush()
+            if new_scales is not None:
+                new_scales.flush()
+            del new_vectors, new_scales
+
+            # Swap to the new generation; other processes follow once they see the header
+            self._reset(new_generation, capacity)
+            self._write_header()
+
+        for name in ('vectors', 'scales', 'ids'):
+            try:
+                os.remove(self._path(name, old_generation))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                'model': self.model,
+                'dimension': self.dimension,
+                'dtype': self.dtype_name,
+                'live': len(self._id_rows),
+                'rows': self.count,
+                'dead': self.dead_rows(),
+                'capacity': self.capacity,
+                'generation': self.generation,
+                'compacting': self._compacting,
+                'bytes': sum(self.capacity * row_bytes for _, row_bytes in self._file_row_bytes())
+            }
@@ -0,0 +1,33 @@
+import numpy as np
+from app.services.ann_index import StoreIndex
+from app.services.vector_store import VectorStore
+
+def _store_index(tmp_path, size=200, dimension=16):
+    rng = np.random.default_rng(0)
+    store = VectorStore(directory=str(tmp_path / "store"), dimension=dimension, dtype="float32")
+    vectors = rng.standard_normal((size, dimension)).astype(np.float32)
+    store.add_many([f"id-{i}" for i in range(size)], vectors)
+    index = StoreIndex(store, min_index_size=50, n_lists=8)
+    assert index.ensure_index(wait=True) is not None
+    return index, vectors
+
+def test_deleted_ids_leave_the_ivf_index(tmp_path):
+    index, vectors = _store_index(tmp_path)
+    results, method = index.search(vectors[7], k=5, nprobe=8)
+    assert method == "ivf" and results[0][0] == "id-7"
+
+    assert index.delete("id-7")
+    assert "id-7" not in index.store and "id-7" not in index.index
+    results, _ = index.search(vectors[7], k=5, nprobe=8)
+    assert "id-7" not in [vector_id for vector_id, _ in results]
+    assert not index.delete("id-7")
+
+def test_rebuild_drops_ids_deleted_during_the_build(tmp_path):
+    index, vectors = _store_index(tmp_path)
+    snapshot = index._build_index()
+    index.delete("id-3")
+    # A build that started before the delete still holds the id until the swap
+    index._build_index = lambda: snapshot
+    index._rebuild()
+    assert "id-3" not in index.index
+    assert len(index.index) == len(index.store)
@@ -0,0 +1,20 @@
+import os
+from app.core.cache import DiskCache, content_key
+
+def _entry_bytes(directory) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory) if root != str(directory)
+        for name in names
+    )
+
+def test_disk_cap_holds_across_instances_sharing_a_directory(tmp_path):
+    caches = [DiskCache(str(tmp_path), 10000, lambda value: value, lambda data: data) for _ in range(3)]
+    for i in range(60):
+        caches[i % 3].put(content_key(str(i)), b"x" * 1000)
+
+    assert _entry_bytes(tmp_path) <= 10000
+    assert caches[0].get(content_key("59")) == b"x" * 1000
+    assert caches[0].get(content_key("0")) is None
+    # A fresh instance starts from what is on disk
+    assert DiskCache(str(tmp_path), 10000, lambda value: value, lambda data: data).stats()["bytes"] == _entry_bytes(tmp_path)
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+import numpy as np
+from app.schemas.scoring import ParsedJD, ParsedResume
+from app.services.candidate_search_service import CandidateSearchService
+from app.services.scoring_engine import ScoringEngine
+from app.services.vector_store import VectorStore
+
+def _resume(i: int) -> ParsedResume:
+    return ParsedResume(
+        contact_info={"name": f"Candidate {i}", "email": None},
+        skills=["python", "docker"],
+        experience=[],
+        total_years_experience=3.0,
+        education=[],
+        certifications=[],
+        projects=[],
+        summary="",
+        raw_text=f"Candidate {i}. Built services with Python and Docker."
+    )
+
+def test_rerank_runs_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.VECTOR_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr("app.core.config.settings.VECTOR_SHARDS", [])
+    store = VectorStore(directory=str(tmp_path / "resumes"), dimension=8, dtype="float32")
+    embedding_service = SimpleNamespace(model=object(), get_vector_store=lambda name: store)
+
+    engine = ScoringEngine()
+    scoring_threads = set()
+    score_resume = engine.score_resume
+
+    async def recording_score_resume(**kwargs):
+        scoring_threads.add(threading.get_ident())
+        return await score_resume(**kwargs)
+
+    engine.score_resume = recording_score_resume
+    service = CandidateSearchService(embedding_service, engine)
+
+    rng = np.random.default_rng(0)
+    for i in range(5):
+        assert service.index_resume(f"resume-{i:02d}", _resume(i), rng.standard_normal(8).astype(np.float32))
+
+    jd = ParsedJD(
+        skills=["Python", "Docker"],
+        required_years_experience=2.0,
+        role_keywords=["Engineer"],
+        required_technologies=["Python"],
+        seniority="mid-level",
+        responsibilities=[],
+        raw_text="Engineer. Must have Python and Docker."
+    )
+
+    async def run():
+        loop_thread = threading.get_ident()
+        response = await service.search("request", jd, rng.standard_normal(8).astype(np.float32), top_k=3)
+        return loop_thread, response
+
+    loop_thread, response = asyncio.run(run())
+    assert response.total_indexed == 5
+    assert len(response.results) == 3
+    assert scoring_threads and loop_thread not in scoring_threads
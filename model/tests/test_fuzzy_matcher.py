@@ -0,0 +1,37 @@
+import random
+import pytest
+from fuzzywuzzy import fuzz
+from app.core.config import settings
+from app.services.fuzzy_matcher import FuzzyIndex, _KEYWORDS, _synthetic_resume
+
+def _expected(text: str, keywords):
+    text = text.lower()
+    return {keyword: keyword in text or fuzz.partial_ratio(keyword, text) > 80 for keyword in keywords}
+
+@pytest.mark.parametrize("pages", [1, 7])
+@pytest.mark.parametrize("min_chars", [0, None])
+def test_match_equals_partial_ratio(pages, min_chars, monkeypatch):
+    # min_chars 0 forces the n-gram index on every text; None keeps the configured cutoff
+    if min_chars is not None:
+        monkeypatch.setattr(settings, "FUZZY_INDEX_MIN_CHARS", min_chars)
+    rng = random.Random(pages)
+    keywords = [keyword.lower() for keyword in _KEYWORDS]
+
+    for _ in range(3):
+        text = _synthetic_resume(pages, rng)
+        index = FuzzyIndex(text, threshold=80)
+        assert index.match(keywords) == _expected(text, keywords)
+
+def test_short_text_skips_the_index():
+    text = _synthetic_resume(1, random.Random(0))
+    assert len(text) < settings.FUZZY_INDEX_MIN_CHARS
+    index = FuzzyIndex(text, threshold=80)
+    index.match(_KEYWORDS)
+    assert index._codes is None
+
+def test_keyword_at_the_end_of_the_text(monkeypatch):
+    # partial_ratio also scores the shorter windows that run off the end of the text
+    monkeypatch.setattr(settings, "FUZZY_INDEX_MIN_CHARS", 0)
+    keywords = ["kubernetes", "terraform", "distributed systems"]
+    for text in ("deployed on kubernete", "x" * 500 + " terrafo", "built distributed sys"):
+        assert FuzzyIndex(text, threshold=80).match(keywords) == _expected(text, keywords)
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pytest
+import torch
+from sentence_transformers import SentenceTransformer, models
+from transformers import BertConfig, BertModel, BertTokenizerFast
+from app.services.inference_backends import (
+    OnnxBackend, PARITY_TEXTS, TorchBackend, check_parity, load_backend, parity_passed
+)
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """A tiny random BERT saved as a SentenceTransformer (mean pooling, normalized), so export runs offline"""
+    directory = tmp_path_factory.mktemp("model")
+    words = sorted({word.strip(".,:;/()").lower() for text in PARITY_TEXTS for word in text.split()} - {""})
+    vocab_path = directory / "vocab.txt"
+    vocab_path.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+
+    torch.manual_seed(0)
+    bert = BertModel(BertConfig(
+        vocab_size=len(words) + 5,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=128
+    ))
+    bert.save_pretrained(directory / "hf")
+    BertTokenizerFast(str(vocab_path)).save_pretrained(directory / "hf")
+
+    model = SentenceTransformer(modules=[
+        models.Transformer(str(directory / "hf"), max_seq_length=64),
+        models.Pooling(32, "mean"),
+        models.Normalize()
+    ], device="cpu")
+    model.save(str(directory / "st"))
+    return str(directory / "st")
+
+def _texts():
+    # Mixed lengths, so batches are padded and the pooling has to honour the mask
+    rng = np.random.default_rng(0)
+    return [" ".join(rng.choice(PARITY_TEXTS, rng.integers(1, 4))) for _ in range(20)]
+
+def test_onnx_export_matches_sentence_transformer(model_dir, tmp_path):
+    backend = OnnxBackend.export(model_dir, str(tmp_path / "onnx"), quantize=False)
+    reference = SentenceTransformer(model_dir, device="cpu").encode(_texts(), convert_to_numpy=True)
+    vectors = backend.encode(_texts(), batch_size=8)
+
+    assert vectors.shape == reference.shape
+    np.testing.assert_allclose(vectors, reference, atol=1e-4)
+    assert backend.config["parity"]["passed"]
+
+def test_quantized_export_is_within_the_parity_thresholds(model_dir, tmp_path):
+    backend = OnnxBackend.export(model_dir, str(tmp_path / "onnx"), quantize=True)
+    reference = SentenceTransformer(model_dir, device="cpu").encode(_texts(), convert_to_numpy=True)
+
+    report = check_parity(reference, backend.encode(_texts(), batch_size=8))
+    assert report["passed"], report
+    assert backend.config["model_file"] == "model-int8.onnx"
+
+def test_load_backend_uses_onnx_only_within_the_thresholds(model_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ONNX_MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr("app.core.config.settings.ONNX_QUANTIZE", True)
+    assert isinstance(load_backend(model_dir, "onnx"), OnnxBackend)
+
+    # The export is reused, but its stored parity is checked against the current thresholds
+    monkeypatch.setattr("app.core.config.settings.ONNX_PARITY_MIN_COSINE", 1.01)
+    assert isinstance(load_backend(model_dir, "onnx"), TorchBackend)
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_parity_passed_ignores_the_stored_flag(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ONNX_PARITY_MIN_COSINE", 0.98)
+    monkeypatch.setattr("app.core.config.settings.ONNX_PARITY_MAX_SCORE_DELTA", 0.02)
+
+    assert parity_passed({"min_cosine": 0.99, "max_score_delta": 0.01})
+    assert not parity_passed({"min_cosine": 0.97, "max_score_delta": 0.01, "passed": True})
+    assert not parity_passed({"min_cosine": 0.99, "max_score_delta": 0.05, "passed": True})
+    assert not parity_passed({"passed": True})
+    assert not parity_passed({"min_cosine": None, "max_score_delta": 0.0})
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import pytest
+from app.services.inference_executor import InferenceExecutor, InferenceQueueFull
+
+def test_cancelled_job_leaves_the_queue():
+    executor = InferenceExecutor(max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    async def scenario():
+        # Hold the only thread so the next job waits in the queue
+        blocker = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.create_task(executor.run(lambda: "never"))
+        await asyncio.sleep(0.05)
+        assert executor.queued == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        await blocker
+
+        assert executor.queued == 0
+        assert executor.get_stats()["queue_depth"] == 0
+        # The freed slots take new work again
+        assert await asyncio.gather(*(executor.run(lambda: 1) for _ in range(2))) == [1, 1]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+def test_full_queue_rejects():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocker = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(executor.run(lambda: None))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.gather(blocker, queued)
+        assert executor.rejected == 1
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+def test_failures_are_not_counted_as_completed():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        assert await executor.run(lambda: 2) == 2
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    stats = executor.get_stats()
+    assert (stats["completed"], stats["failed"], stats["running"], stats["queue_depth"]) == (1, 1, 0, 0)
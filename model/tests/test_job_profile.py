@@ -0,0 +1,124 @@
+import asyncio
+import random
+import numpy as np
+from app.schemas.scoring import ParsedJD, ParsedResume
+from app.services.job_profile import _synthetic_jd, _synthetic_resume, profile_key
+from app.services.scoring_engine import ScoringEngine
+
+IMPORTANCE_WORDS = ["Required:", "Must have", "Preferred:", "Nice to have", "Bonus:", "Familiar with", "Experience with"]
+ROLES = ["Senior", "Engineer", "Developer", "Lead", "Architect", "Manager"]
+
+def _old_keywords(parsed_jd: ParsedJD):
+    """Keywords and importance as the engine derived them per resume before job profiles"""
+    text = parsed_jd.raw_text.lower()
+    keywords = []
+    for keyword in list(parsed_jd.skills) + list(parsed_jd.role_keywords):
+        position = text.find(keyword.lower())
+        context = text[max(0, position - 50):min(len(text), position + len(keyword) + 50)]
+        if any(word in context for word in ['required', 'must', 'essential', 'mandatory']):
+            importance = 'required'
+        elif any(word in context for word in ['preferred', 'desired', 'nice to have', 'bonus']):
+            importance = 'preferred'
+        else:
+            importance = 'nice-to-have'
+        keywords.append({'keyword': keyword, 'importance': importance})
+    return keywords
+
+def _old_scores(engine: ScoringEngine, parsed_resume: ParsedResume, parsed_jd: ParsedJD):
+    jd_keywords = _old_keywords(parsed_jd)
+    resume_skills = engine._expand_skills_with_synonyms(set(parsed_resume.skills))
+    matched = [kw['keyword'] for kw in jd_keywords if engine._keyword_exists_in_resume(kw['keyword'], parsed_resume, resume_skills)]
+    missing = [kw for kw in jd_keywords if kw['keyword'] not in matched]
+
+    keyword_score = 100 if not jd_keywords else 0
+    for importance, weight in (('required', 50), ('preferred', 30), ('nice-to-have', 20)):
+        total = sum(1 for kw in jd_keywords if kw['importance'] == importance)
+        if total:
+            matches = sum(1 for k in matched if k in [kw['keyword'] for kw in jd_keywords if kw['importance'] == importance])
+            keyword_score += (matches / total) * weight
+
+    jd_skills = engine._expand_skills_with_synonyms(set(skill.lower() for skill in parsed_jd.skills))
+    resume_expanded = engine._expand_skills_with_synonyms(set(skill.lower() for skill in parsed_resume.skills))
+    skills_score = 100 if not jd_skills else int(len(jd_skills & resume_expanded) / len(jd_skills) * 100)
+
+    required = parsed_jd.required_years_experience
+    years = parsed_resume.total_years_experience
+    experience_score = 100 if required == 0 or years >= required else max(0, int(years / required * 100))
+    return int(keyword_score), skills_score, experience_score, matched, missing
+
+def _pair(engine: ScoringEngine, rng: random.Random):
+    names = sorted(engine.skill_matcher.names)
+    skills = rng.sample(names, rng.randint(0, 15))
+    roles = rng.sample(ROLES, rng.randint(0, 3))
+    lines = [f"{rng.choice(IMPORTANCE_WORDS)} {keyword} " + "and more " * rng.randint(0, 8) for keyword in skills + roles]
+    rng.shuffle(lines)
+    jd = ParsedJD(
+        skills=skills,
+        required_years_experience=float(rng.choice([0, 2, 5, 8])),
+        role_keywords=roles,
+        required_technologies=skills,
+        seniority="senior",
+        responsibilities=[],
+        raw_text="\n".join(lines)
+    )
+
+    mine = rng.sample(names, rng.randint(0, 12)) + rng.sample(skills, len(skills) // 2)
+    # Misspelled JD skills exercise the fuzzy path
+    typos = [skill[:-1] for skill in rng.sample(skills, len(skills) // 4) if len(skill) > 4]
+    resume = ParsedResume(
+        contact_info={"name": "Candidate"},
+        skills=mine,
+        experience=[{"title": f"{rng.choice(ROLES)} Software Engineer", "company": "Acme", "years": float(rng.randint(1, 6))}],
+        total_years_experience=float(rng.randint(0, 10)),
+        education=[],
+        certifications=[],
+        projects=[],
+        summary="",
+        raw_text=f"{rng.choice(ROLES)} engineer. Worked with " + ", ".join(mine + typos) + "."
+    )
+    return resume, jd
+
+def _score(engine: ScoringEngine, resume: ParsedResume, jd: ParsedJD):
+    vector = np.ones((1, 8), dtype=np.float32)
+    return asyncio.run(engine.score_resume(resume, jd, vector, vector))
+
+def test_profile_scores_match_the_per_resume_derivation():
+    engine = ScoringEngine()
+    uncached = ScoringEngine()
+    uncached.job_profiles.memory.max_items = 0
+    rng = random.Random(0)
+
+    for _ in range(150):
+        resume, jd = _pair(engine, rng)
+        keyword_score, skills_score, experience_score, matched, missing = _old_scores(engine, resume, jd)
+        # Twice with the cache, so the second run uses the stored profile
+        for result in (_score(uncached, resume, jd), _score(engine, resume, jd), _score(engine, resume, jd)):
+            assert result["scores"]["keyword_match"] == keyword_score
+            assert result["scores"]["skills"] == skills_score
+            assert result["scores"]["experience"] == experience_score
+            assert result["matched_keywords"] == matched
+            assert result["missing_keywords"] == missing
+    assert engine.job_profiles.get_stats()["hits"] >= 150
+
+def test_cached_and_uncached_results_are_identical():
+    engine = ScoringEngine()
+    uncached = ScoringEngine()
+    uncached.job_profiles.memory.max_items = 0
+    skills = sorted(engine.skill_matcher.names)[:40]
+    jd = _synthetic_jd(skills)
+
+    for i in range(20):
+        resume = _synthetic_resume(skills, i)
+        assert _score(engine, resume, jd) == _score(uncached, resume, jd)
+
+def test_profile_key_covers_every_field_the_profile_is_built_from():
+    jd = _synthetic_jd(["Python", "Docker"])
+    variants = [
+        jd.model_copy(update={"skills": ["Python"]}),
+        jd.model_copy(update={"role_keywords": ["Senior"]}),
+        jd.model_copy(update={"required_years_experience": 3.0}),
+        jd.model_copy(update={"raw_text": jd.raw_text + " Must have Docker."}),
+    ]
+    keys = {profile_key(jd)} | {profile_key(variant) for variant in variants}
+    assert len(keys) == 1 + len(variants)
+    assert profile_key(jd.model_copy()) == profile_key(jd)
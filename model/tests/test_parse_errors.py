@@ -0,0 +1,28 @@
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.v1.endpoints import search
+from app.services.parse_pool import ParseTimeout
+
+def _client(monkeypatch, error: Exception) -> TestClient:
+    async def failing_run(method, *args, timeout=None):
+        raise error
+
+    monkeypatch.setattr(search.scoring_service.parser_service, "_run", failing_run)
+    app = FastAPI()
+    app.include_router(search.router, prefix="/search")
+    return TestClient(app)
+
+def test_parse_timeout_is_a_gateway_timeout(monkeypatch):
+    client = _client(monkeypatch, ParseTimeout("Parsing did not finish within 30s"))
+    response = client.post("/search/candidates", data={"jd_text": "Python developer"})
+
+    assert response.status_code == 504
+    assert "30s" in response.json()["detail"]
+
+def test_broken_parse_pool_is_retryable(monkeypatch):
+    client = _client(monkeypatch, BrokenProcessPool("A process in the process pool was terminated abruptly"))
+    response = client.post("/search/candidates", data={"jd_text": "Python developer"})
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
@@ -0,0 +1,26 @@
+import numpy as np
+from app.services.shard_service import ShardServer, ShardedVectorIndex
+
+def test_shard_delete_removes_from_index_and_search_reports_live(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ANN_MIN_INDEX_SIZE", 50)
+    monkeypatch.setattr("app.core.config.settings.ANN_NLIST", 8)
+    server = ShardServer(str(tmp_path / "shard-0"), dimension=16, dtype="float32", authkey=b"0123456789abcdef")
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100, 16)).astype(np.float32)
+    assert all(server.handle({"op": "add", "ids": [f"id-{i}" for i in range(100)], "vectors": vectors}))
+    server.index.ensure_index(wait=True)
+
+    assert server.handle({"op": "delete", "id": "id-5"})
+    assert "id-5" not in server.index.index
+    reply = server.handle({"op": "search", "query": vectors[5], "k": 5, "nprobe": 8})
+    assert reply["index"] == "ivf" and reply["live"] == 99
+    assert "id-5" not in [vector_id for vector_id, _ in reply["results"]]
+
+def test_live_count_comes_from_search_replies(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.SHARD_AUTHKEY", "0123456789abcdef")
+    index = ShardedVectorIndex(["127.0.0.1:1", "127.0.0.1:2"])
+    replies = {0: {"results": [("a", 0.9)], "index": "ivf", "live": 10}, 1: {"results": [("b", 0.8)], "index": "exact", "live": 3}}
+    monkeypatch.setattr(index, "_scatter", lambda requests: (replies, []))
+    results, method, missing = index.search(np.ones(4, dtype=np.float32), k=2)
+    assert [vector_id for vector_id, _ in results] == ["a", "b"]
+    assert index.live_count() == 13
@@ -0,0 +1,138 @@
+import random
+import re
+import time
+import pytest
+from app.services import text_scanner
+from app.services.parser_service import ParserService
+from app.services.text_scanner import Budget, BudgetTracker, RESPONSIBILITY_RE, SUMMARY_RE, scan
+from app.services.upload_intake import Upload
+
+# The patterns the extractors ran one by one before the fused scan
+OLD_EMAIL = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+OLD_PHONE = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
+OLD_DATE_RANGE = r'(\d{4})\s*[-–]\s*(\d{4}|\bpresent\b|\bcurrent\b)'
+OLD_DEGREES = [r'\b(bachelor|master|phd|b\.s\.|m\.s\.|ph\.d\.)\b', r'\b(computer science|engineering|mathematics|physics)\b']
+OLD_YEAR = r'\b(19|20)\d{2}\b'
+OLD_CERTIFICATIONS = [
+    r'\b(aws|azure|gcp|cisco|microsoft|oracle|ibm)\s+(certified|professional|associate|expert)\b',
+    r'\b(pmp|scrum|agile|six\s+sigma|lean)\b'
+]
+OLD_REQUIRED_EXPERIENCE = [
+    r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s+)?experience',
+    r'experience:\s*(\d+)\+?\s*(?:years?|yrs?)',
+    r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:in\s+)?(?:the\s+)?field'
+]
+OLD_SENIORITY = [
+    (r'\b(junior|entry\s+level|junior\s+level)\b', 'junior'),
+    (r'\b(mid\s+level|intermediate)\b', 'mid-level'),
+    (r'\b(senior|senior\s+level)\b', 'senior'),
+    (r'\b(lead|principal|staff)\b', 'lead'),
+    (r'\b(architect|director|vp|cto)\b', 'executive')
+]
+OLD_SUMMARY = r'\b(summary|objective|profile|about)\b.*?\.'
+OLD_RESPONSIBILITY = r'\b(responsible\s+for|duties|responsibilities?|key\s+responsibilities?)\b.*?\.'
+
+# Not generated: "B.S. in ..." and other dotted degrees followed by a space, which the
+# old pattern missed (its trailing \b needs a word character after the final dot)
+_LINES = [
+    "Jane Doe", "jane.doe{n}@example.com", "Contact: j_smith{n}@mail.co.uk", "+1 (555) 123-45{n:02d}",
+    "555.867.53{n:02d}", "Senior Software Engineer, Acme Corp, 20{n:02d} - 2021", "Lead Developer 2015 – present",
+    "Data Analyst 2012-current", "Bachelor of Science in Computer Science, State University, 2014",
+    "Master in Mathematics 2017", "PhD physics, 2019", "AWS Certified Solutions Architect", "Microsoft  professional",
+    "Scrum Master and Agile coach, PMP, Six Sigma", "{n} years of experience with Python",
+    "Experience: {n}+ yrs", "{n}+ years in the field", "Summary: engineer who ships reliable services.",
+    "Profile of an intermediate engineer with mid level ownership.",
+    "Responsible for the billing platform and its on-call rotation.", "Key responsibilities: design reviews.",
+    "Principal staff director vp cto", "junior entry level", "Built a search pipeline with Kafka.",
+    "Worked across teams on latency and reliability", "Duties included mentoring and hiring.",
+]
+
+def _document(rng: random.Random) -> str:
+    return "\n".join(rng.choice(_LINES).format(n=rng.randint(0, 20)) for _ in range(rng.randint(5, 40)))
+
+def _old_education(text: str):
+    education = []
+    for pattern in OLD_DEGREES:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            year = re.search(OLD_YEAR, text[match.end():match.end() + 50])
+            education.append((match.group().title(), int(year.group()) if year else 0))
+    return education
+
+def _old_required_experience(text: str) -> float:
+    for pattern in OLD_REQUIRED_EXPERIENCE:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return float(match.group(1))
+    return 0.0
+
+def _old_seniority(text: str):
+    for pattern, level in OLD_SENIORITY:
+        if re.search(pattern, text.lower()):
+            return level
+    return None
+
+@pytest.mark.parametrize("seed", range(200))
+def test_scan_matches_the_original_patterns(seed):
+    text = _document(random.Random(seed))
+    markers = scan(text, Budget(0))
+
+    email = re.search(OLD_EMAIL, text)
+    assert (markers.first("email").text if markers.first("email") else None) == (email.group() if email else None)
+    phone = re.search(OLD_PHONE, text)
+    assert (markers.first("phone").text if markers.first("phone") else None) == (phone.group() if phone else None)
+
+    assert [marker.groups for marker in markers.all("date_range")] == [
+        match.groups() for match in re.finditer(OLD_DATE_RANGE, text, re.IGNORECASE)
+    ]
+    assert [
+        (marker.text.title(), markers.year_after(marker.end, 50) or 0)
+        for marker in markers.all("degree") + markers.all("field")
+    ] == _old_education(text)
+    # Certifications now come out in text order rather than grouped by pattern
+    assert sorted(marker.text.title() for marker in markers.all("certification")) == sorted(
+        match.group().title() for pattern in OLD_CERTIFICATIONS for match in re.finditer(pattern, text, re.IGNORECASE)
+    )
+
+    required = markers.first("years_experience", "experience_years", "years_field")
+    assert (float(required.groups[0]) if required else 0.0) == _old_required_experience(text)
+    assert markers.seniority() == _old_seniority(text)
+
+    summary = re.search(OLD_SUMMARY, text, re.IGNORECASE | re.DOTALL)
+    assert (SUMMARY_RE.search(text).group() if SUMMARY_RE.search(text) else None) == (summary.group() if summary else None)
+    assert [match.group() for match in RESPONSIBILITY_RE.finditer(text)] == [
+        match.group() for match in re.finditer(OLD_RESPONSIBILITY, text, re.IGNORECASE | re.DOTALL)
+    ]
+
+@pytest.mark.parametrize("name", sorted(text_scanner._adversarial_inputs(1000)))
+def test_adversarial_input_is_scanned_in_linear_time(name):
+    # The unbounded originals take seconds to minutes on several of these at this size
+    text = text_scanner._adversarial_inputs(80000)[name]
+    started = time.perf_counter()
+    scan(text, Budget(0))
+    SUMMARY_RE.search(text)
+    list(RESPONSIBILITY_RE.finditer(text))
+    assert time.perf_counter() - started < 1.0
+
+def test_expired_budget_truncates_the_scan_and_marks_the_tracker():
+    text = "2019 " * 10000
+    with BudgetTracker() as tracker:
+        result = scan(text, Budget(1e-6))
+    assert result.truncated
+    assert len(result.markers) < 10000
+    assert tracker.exceeded
+
+    with BudgetTracker() as tracker:
+        result = scan(text, Budget(0))
+    assert not result.truncated
+    assert len(result.markers) == 10000
+    assert not tracker.exceeded
+
+def test_partial_parse_is_reported(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.NER_ENABLED", False)
+    parser_service = ParserService(use_pool=False, use_cache=False)
+    upload = Upload.from_bytes("jd.txt", ("Senior engineer 2019 - present, 5 years of experience. " * 2000).encode("utf-8"))
+
+    monkeypatch.setattr("app.core.config.settings.PARSE_EXTRACTOR_BUDGET_MS", 1e-6)
+    assert parser_service.parse_uploads("jd", [upload])[0][2]
+    monkeypatch.setattr("app.core.config.settings.PARSE_EXTRACTOR_BUDGET_MS", 0)
+    assert not parser_service.parse_uploads("jd", [upload])[0][2]
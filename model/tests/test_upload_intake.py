@@ -0,0 +1,42 @@
+import asyncio
+import io
+import pytest
+from fastapi import UploadFile
+from app.services.upload_intake import Upload, UploadRejected, receive_upload
+
+def _receive(content: bytes, **kwargs) -> Upload:
+    return asyncio.run(receive_upload(UploadFile(file=io.BytesIO(content), filename="resume.txt"), **kwargs))
+
+def test_text_split_inside_a_character_is_accepted():
+    # "é" is two bytes; the second chunk starts in the middle of it
+    content = b"a" * 1023 + "é".encode("utf-8") + b" Python developer"
+    upload = _receive(content, chunk_bytes=1024)
+
+    assert upload.format == ".txt"
+    assert upload.size == len(content)
+
+def test_invalid_utf8_past_the_first_chunk_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.UPLOAD_SPOOL_DIR", str(tmp_path))
+    content = b"Python developer\n" * 200 + b"\xff" + b"more text"
+
+    with pytest.raises(UploadRejected) as rejected:
+        _receive(content, chunk_bytes=1024, spool_bytes=1024)
+    assert rejected.value.status_code == 415
+    # The partly spooled upload is removed
+    assert list(tmp_path.iterdir()) == []
+
+def test_text_ending_inside_a_character_is_rejected():
+    content = b"Python developer " + "é".encode("utf-8")[:1]
+
+    with pytest.raises(UploadRejected) as rejected:
+        _receive(content)
+    assert rejected.value.status_code == 415
+
+def test_from_bytes_checks_every_chunk(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.UPLOAD_CHUNK_BYTES", 1024)
+    valid = b"a" * 1023 + "é".encode("utf-8") + b" Python developer"
+    assert Upload.from_bytes("resume.txt", valid).format == ".txt"
+
+    with pytest.raises(UploadRejected) as rejected:
+        Upload.from_bytes("resume.txt", b"Python developer\n" * 200 + b"\xc3(")
+    assert rejected.value.status_code == 415
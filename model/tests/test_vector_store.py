@@ -0,0 +1,64 @@
+import multiprocessing
+import numpy as np
+import pytest
+from app.services.vector_store import VectorStore
+
+def _unit(dimension: int, i: int) -> np.ndarray:
+    vector = np.zeros(dimension, dtype=np.float32)
+    vector[i % dimension] = 1.0
+    vector[(i * 7 + 1) % dimension] += 0.5
+    return vector / np.linalg.norm(vector)
+
+def test_two_stores_on_one_directory_do_not_share_rows(tmp_path):
+    a = VectorStore(directory=str(tmp_path), dimension=8, dtype="float32")
+    b = VectorStore(directory=str(tmp_path), dimension=8, dtype="float32")
+    a.add("A", _unit(8, 0))
+    b.add("B", _unit(8, 1))
+
+    log = (tmp_path / "ids-0.log").read_text().splitlines()
+    assert log == ["+\t0\tA", "+\t1\tB"]
+    for store in (a, b):
+        np.testing.assert_allclose(store.get("A"), _unit(8, 0), atol=1e-6)
+        np.testing.assert_allclose(store.get("B"), _unit(8, 1), atol=1e-6)
+        assert len(store) == 2
+
+def test_stores_follow_growth_and_compaction_by_another_instance(tmp_path):
+    a = VectorStore(directory=str(tmp_path), dimension=8, dtype="float16", compact_ratio=1.0)
+    b = VectorStore(directory=str(tmp_path), dimension=8, dtype="float16", compact_ratio=1.0)
+    count = VectorStore.INITIAL_CAPACITY + 100
+    a.add_many([f"id-{i}" for i in range(count)], np.vstack([_unit(8, i) for i in range(count)]))
+    assert len(b) == count and b.capacity >= count
+
+    for i in range(0, count, 2):
+        b.delete(f"id-{i}")
+    b.compact()
+    assert a.get("id-0") is None
+    np.testing.assert_allclose(a.get("id-1"), _unit(8, 1), atol=1e-3)
+    assert a.generation == b.generation == 1
+
+    a.add("new", _unit(8, 3))
+    np.testing.assert_allclose(b.get("new"), _unit(8, 3), atol=1e-3)
+    assert len(a) == len(b) == count // 2 + 1
+
+def _writer(directory: str, worker: int, per_worker: int) -> None:
+    store = VectorStore(directory=directory, dimension=8, dtype="float32")
+    for i in range(per_worker):
+        store.add(f"w{worker}-{i}", _unit(8, worker * per_worker + i))
+    store.close()
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_writer_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers, per_worker = 4, 300
+    processes = [context.Process(target=_writer, args=(str(tmp_path), worker, per_worker)) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    store = VectorStore(directory=str(tmp_path), dimension=8, dtype="float32")
+    assert len(store) == workers * per_worker == store.count
+    for worker in range(workers):
+        for i in range(per_worker):
+            np.testing.assert_allclose(store.get(f"w{worker}-{i}"), _unit(8, worker * per_worker + i), atol=1e-6)